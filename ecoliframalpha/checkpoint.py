@@ -0,0 +1,105 @@
+import os
+import time
+import pickle
+import tempfile
+from stage_cache import stage_key
+
+
+def run_fingerprint(kind, parameters):
+    """
+    Identifies a run, so a checkpoint is only resumed by the run that wrote it.
+
+    Parameters:
+        kind (str): Type of run, e.g. "streaming" or "sweep".
+        parameters (dict): Every parameter that determines the run's results.
+
+    Returns:
+        str: SHA-256 hex digest.
+    """
+    return stage_key(f"{kind}_checkpoint", parameters)
+
+
+def save_checkpoint(path, payload):
+    """
+    Atomically writes a checkpoint, so an interruption never leaves a partial file behind.
+
+    Parameters:
+        path (str): Checkpoint file.
+        payload (dict): Picklable run state.
+    """
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    descriptor, temporary_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(descriptor, "wb") as file:
+            pickle.dump(payload, file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporary_path, path)
+    except BaseException:
+        os.remove(temporary_path)
+        raise
+
+
+def load_checkpoint(path, fingerprint):
+    """
+    Reads a checkpoint written by the same run.
+
+    Parameters:
+        path (str): Checkpoint file.
+        fingerprint (str): Fingerprint of the run that wants to resume (see `run_fingerprint`).
+
+    Returns:
+        dict: The checkpoint payload, or None if there is no checkpoint.
+
+    Raises:
+        ValueError: If the checkpoint was written by a run with different parameters.
+    """
+    if not os.path.exists(path):
+        return None
+    with open(path, "rb") as file:
+        payload = pickle.load(file)
+    if payload.get("fingerprint") != fingerprint:
+        raise ValueError(f"Checkpoint {path} was written by a run with different parameters.")
+    print(f"Resuming from checkpoint: {path}")
+    return payload
+
+
+def remove_checkpoint(path):
+    """
+    Deletes a checkpoint once its run has completed.
+    """
+    if path and os.path.exists(path):
+        os.remove(path)
+
+
+class Checkpointer:
+    """
+    Writes a run's checkpoint at most once per `interval` seconds.
+
+    Attributes:
+        path (str): Checkpoint file; None disables checkpointing.
+        fingerprint (str): Fingerprint stored with every checkpoint.
+        interval (float): Minimum seconds between checkpoints; 0 checkpoints at every opportunity.
+    """
+
+    def __init__(self, path, fingerprint, interval=300):
+        if interval is not None and interval < 0:
+            raise ValueError("interval must be non-negative.")
+        self.path = path
+        self.fingerprint = fingerprint
+        self.interval = interval
+        self._last_saved = time.monotonic()
+
+    def maybe_save(self, make_payload):
+        """
+        Saves the payload returned by `make_payload()` if the interval has elapsed.
+
+        Returns:
+            bool: True if a checkpoint was written.
+        """
+        if self.path is None or self.interval is None:
+            return False
+        if time.monotonic() - self._last_saved < self.interval:
+            return False
+        save_checkpoint(self.path, {**make_payload(), "fingerprint": self.fingerprint})
+        self._last_saved = time.monotonic()
+        return True
@@ -1,13 +1,263 @@
 import numpy as np
 import pandas as pd
+from simulation_state import CodonType, is_simulation_state
 
-def analyze_variability(rna_results, metrics=["variance", "Fano_factor", "CV", "CRI"]):
+def _efficiency_matrix(rna_results):
+    """
+    Extracts codon names and a (cycles, codons) efficiency array from a DataFrame or SimulationState.
+    """
+    if is_simulation_state(rna_results):
+        return rna_results.codons, rna_results.efficiencies
+    codons = [col.replace("_efficiency", "") for col in rna_results.columns if col.endswith("_efficiency")]
+    if not codons:
+        return codons, np.empty((len(rna_results), 0))
+    return codons, rna_results[[f"{codon}_efficiency" for codon in codons]].to_numpy(dtype=float)
+
+
+def _metrics_from_moments(count, mean_efficiency, variance, min_val, max_val, metrics):
+    """
+    Turns per-codon moments and extremes into the requested variability metrics.
+
+    Returns:
+        dict: Metric name mapped to an array shaped like `count`.
+    """
+    with np.errstate(divide="ignore", invalid="ignore"):
+        std_dev = np.sqrt(variance)  # Sample standard deviation
+        range_val = np.where(max_val > min_val, max_val - min_val, np.nan)
+        positive_mean = mean_efficiency > 0
+
+        results = {}
+        # Store only requested metrics
+        if "variance" in metrics:
+            results["variance"] = variance
+        if "Fano_factor" in metrics:
+            results["Fano_factor"] = np.where(positive_mean, variance / mean_efficiency, np.nan)
+        if "CV" in metrics:
+            results["CV"] = np.where(positive_mean, std_dev / mean_efficiency, np.nan)
+        if "CRI" in metrics:
+            results["CRI"] = np.where(range_val > 0, mean_efficiency / range_val, np.nan)
+
+    # Codons without any values report NaN for every metric
+    return {metric: np.where(count > 0, values, np.nan) for metric, values in results.items()}
+
+
+def _variability_arrays(efficiencies, metrics, axis=0):
+    """
+    Computes the requested variability metrics along the cycle axis, ignoring NaNs.
+
+    Returns:
+        dict: Metric name mapped to an array with `axis` reduced away.
+    """
+    valid = ~np.isnan(efficiencies)
+    count = valid.sum(axis=axis)
+    filled = np.where(valid, efficiencies, 0.0)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean_efficiency = filled.sum(axis=axis) / count
+        deviation = np.where(valid, efficiencies - np.expand_dims(mean_efficiency, axis), 0.0)
+        variance = np.where(count > 1, (deviation ** 2).sum(axis=axis) / (count - 1), np.nan)  # Sample variance
+    max_val = np.where(valid, efficiencies, -np.inf).max(axis=axis, initial=-np.inf)
+    min_val = np.where(valid, efficiencies, np.inf).min(axis=axis, initial=np.inf)
+
+    return _metrics_from_moments(count, mean_efficiency, variance, min_val, max_val, metrics)
+
+
+def _variability_table(codons, efficiencies, metrics):
+    """
+    Computes the requested variability metrics for every codon column at once.
+    """
+    results = {"codon": codons, **_variability_arrays(efficiencies, metrics)}
+    return pd.DataFrame(results, columns=["codon"] + list(metrics))
+
+
+class RunningVariability:
+    """
+    Mergeable per-codon sufficient statistics (count, mean, M2, min, max) for the variability metrics.
+
+    Accumulators built from separate chunks, threads, processes or machines can be combined
+    exactly with `merge`, and the metrics are finalized from the merged state.
+
+    Attributes:
+        codons (list of str): Codon of each accumulator column.
+        count (np.ndarray): Number of non-NaN values seen per codon.
+        mean (np.ndarray): Running mean per codon.
+        m2 (np.ndarray): Running sum of squared deviations from the mean per codon.
+        min (np.ndarray): Running minimum per codon.
+        max (np.ndarray): Running maximum per codon.
+    """
+
+    def __init__(self, codons):
+        self.codons = list(codons)
+        self.count = np.zeros(len(self.codons), dtype=np.int64)
+        self.mean = np.zeros(len(self.codons))
+        self.m2 = np.zeros(len(self.codons))
+        self.min = np.full(len(self.codons), np.inf)
+        self.max = np.full(len(self.codons), -np.inf)
+
+    @classmethod
+    def from_efficiencies(cls, codons, efficiencies):
+        """
+        Builds an accumulator from a (cycles, codons) block of efficiencies, ignoring NaNs.
+
+        Parameters:
+            codons (list of str): Codon of each column.
+            efficiencies (np.ndarray): Block with one column per codon.
+
+        Returns:
+            RunningVariability: Accumulator holding the block's statistics.
+        """
+        efficiencies = np.asarray(efficiencies, dtype=float)
+        accumulator = cls(codons)
+        valid = ~np.isnan(efficiencies)
+        accumulator.count = valid.sum(axis=0).astype(np.int64)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            accumulator.mean = np.where(accumulator.count > 0,
+                                        np.where(valid, efficiencies, 0.0).sum(axis=0) / accumulator.count, 0.0)
+        accumulator.m2 = (np.where(valid, efficiencies - accumulator.mean, 0.0) ** 2).sum(axis=0)
+        accumulator.min = np.where(valid, efficiencies, np.inf).min(axis=0, initial=np.inf)
+        accumulator.max = np.where(valid, efficiencies, -np.inf).max(axis=0, initial=-np.inf)
+        return accumulator
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Rebuilds an accumulator from the output of `to_dict`.
+        """
+        accumulator = cls(data["codons"])
+        accumulator.count = np.asarray(data["count"], dtype=np.int64)
+        accumulator.mean = np.asarray(data["mean"], dtype=float)
+        accumulator.m2 = np.asarray(data["m2"], dtype=float)
+        accumulator.min = np.asarray(data["min"], dtype=float)
+        accumulator.max = np.asarray(data["max"], dtype=float)
+        return accumulator
+
+    def to_dict(self):
+        """
+        Returns the accumulator state as plain lists, e.g. for JSON transport or checkpoints.
+        """
+        return {
+            "codons": list(self.codons),
+            "count": self.count.tolist(),
+            "mean": self.mean.tolist(),
+            "m2": self.m2.tolist(),
+            "min": self.min.tolist(),
+            "max": self.max.tolist(),
+        }
+
+    def codon_statistics(self, codon):
+        """
+        Returns the sufficient statistics of a single codon.
+
+        Raises:
+            KeyError: If the codon has no accumulator.
+        """
+        if codon not in self.codons:
+            raise KeyError(f"Codon '{codon}' has no accumulator.")
+        position = self.codons.index(codon)
+        return {
+            "count": int(self.count[position]),
+            "mean": float(self.mean[position]),
+            "m2": float(self.m2[position]),
+            "min": float(self.min[position]),
+            "max": float(self.max[position]),
+        }
+
+    def merge(self, other):
+        """
+        Merges another accumulator into this one using the pairwise update of Chan et al.
+
+        Codons are matched by name; codons only present in `other` are appended.
+
+        Parameters:
+            other (RunningVariability): Accumulator with statistics from disjoint data.
+
+        Returns:
+            RunningVariability: This accumulator, now covering the data of both.
+        """
+        new_codons = [codon for codon in other.codons if codon not in self.codons]
+        if new_codons:
+            empty = RunningVariability(new_codons)
+            self.codons += new_codons
+            for name in ("count", "mean", "m2", "min", "max"):
+                setattr(self, name, np.concatenate([getattr(self, name), getattr(empty, name)]))
+
+        # Scatter the other accumulator onto this codon order
+        positions = np.array([self.codons.index(codon) for codon in other.codons], dtype=np.intp)
+        other_count = np.zeros_like(self.count)
+        other_mean = np.zeros_like(self.mean)
+        other_m2 = np.zeros_like(self.m2)
+        other_count[positions] = other.count
+        other_mean[positions] = other.mean
+        other_m2[positions] = other.m2
+
+        total = self.count + other_count
+        delta = other_mean - self.mean
+        with np.errstate(divide="ignore", invalid="ignore"):
+            weight = np.where(total > 0, other_count / total, 0.0)
+        self.mean = self.mean + delta * weight
+        self.m2 = self.m2 + other_m2 + delta ** 2 * self.count * weight
+        self.count = total
+        np.minimum.at(self.min, positions, other.min)
+        np.maximum.at(self.max, positions, other.max)
+        return self
+
+    def update(self, efficiencies):
+        """
+        Folds a (cycles, codons) chunk of efficiencies into the accumulators, ignoring NaNs.
+
+        Parameters:
+            efficiencies (np.ndarray): Chunk with one column per codon, in `codons` order.
+        """
+        return self.merge(RunningVariability.from_efficiencies(self.codons, efficiencies))
+
+    def finalize(self, metrics=["variance", "Fano_factor", "CV", "CRI"]):
+        """
+        Computes the variability metrics from the accumulated statistics.
+
+        Parameters:
+            metrics (list): List of metrics to calculate (options: "variance", "Fano_factor", "CV", "CRI").
+
+        Returns:
+            pd.DataFrame: A summary DataFrame with variability metrics for each codon, as `analyze_variability`.
+        """
+        valid_metrics = {"variance", "Fano_factor", "CV", "CRI"}
+        metrics = set(metrics) & valid_metrics
+        if not metrics:
+            raise ValueError(f"Metrics must be chosen from {valid_metrics}")
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            variance = np.where(self.count > 1, self.m2 / (self.count - 1), np.nan)  # Sample variance
+        results = {"codon": self.codons,
+                   **_metrics_from_moments(self.count, self.mean, variance, self.min, self.max, metrics)}
+        return pd.DataFrame(results, columns=["codon"] + list(metrics))
+
+
+def merge_accumulators(accumulators):
+    """
+    Combines partial accumulators (from chunks, workers or machines) into one.
+
+    Parameters:
+        accumulators (iterable of RunningVariability): Accumulators over disjoint data.
+
+    Returns:
+        RunningVariability: A new accumulator covering all of the data.
+    """
+    merged = RunningVariability([])
+    for accumulator in accumulators:
+        merged.merge(accumulator)
+    return merged
+
+
+def analyze_variability(rna_results, metrics=["variance", "Fano_factor", "CV", "CRI"], chunk_size=1_000_000):
     """
     Analyzes codon-specific variability in translation efficiency.
 
+    Memory-mapped states are read lazily, `chunk_size` cycles at a time, through running accumulators.
+
     Parameters:
-        rna_results (pd.DataFrame): DataFrame containing translation efficiencies for each codon across cycles.
+        rna_results (pd.DataFrame or SimulationState): Translation efficiencies for each codon across cycles.
         metrics (list): List of metrics to calculate (options: "variance", "Fano_factor", "CV", "CRI").
+        chunk_size (int): Cycles read per step from a memory-mapped state.
 
     Returns:
         pd.DataFrame: A summary DataFrame with variability metrics for each codon.
@@ -21,51 +271,157 @@ def analyze_variability(rna_results, metrics=["variance", "Fano_factor", "CV", "
         raise ValueError(f"Metrics must be chosen from {valid_metrics}")
 
     # Return empty DataFrame if input is empty
-    if rna_results.empty:
+    if isinstance(rna_results, pd.DataFrame) and rna_results.empty:
         return pd.DataFrame(columns=["codon"] + list(metrics))  
 
-    # Extract codons from DataFrame columns
-    codons = [col.replace("_efficiency", "") for col in rna_results.columns if col.endswith("_efficiency")]
-    if not codons:
+    if is_simulation_state(rna_results) and rna_results.is_memory_mapped and rna_results.num_cycles > chunk_size:
+        accumulator = RunningVariability(rna_results.codons)
+        for chunk in rna_results.iter_chunks(chunk_size):
+            accumulator.update(chunk.efficiencies)
+        return accumulator.finalize(metrics)[["codon"] + list(metrics)]
+
+    # Extract codons and their efficiencies
+    codons, efficiencies = _efficiency_matrix(rna_results)
+    if not codons or efficiencies.shape[0] == 0:
         return pd.DataFrame(columns=["codon"] + list(metrics))  # Return early if no efficiency columns
 
-    # Use a list of dictionaries for efficiency
-    results = []
+    return _variability_table(codons, efficiencies, metrics)
 
-    # Loop through each codon and calculate metrics
-    for codon in codons:
-        efficiencies = rna_results[f"{codon}_efficiency"].dropna()  # Remove NaNs for calculations
+# Inverse link, derivative of the mean with respect to the linear predictor, and variance function
+GLM_FAMILIES = {
+    "gamma": (np.exp, np.exp, lambda mean: mean ** 2),  # Log link
+    "gaussian": (lambda eta: eta, np.ones_like, np.ones_like),  # Identity link
+}
 
-        # Store results for this codon
-        codon_data = {"codon": codon}
 
-        if efficiencies.empty:
-            # Store NaN if all values are missing
-            for metric in metrics:
-                codon_data[metric] = np.nan
+def _level_statistics(rna_results, chunk_size):
+    """
+    Counts, sums and sums of squares of every codon's efficiencies at each nutrient level.
+
+    Returns:
+        tuple: (codons, levels, count, total, squares, minimum), with (levels, codons) arrays and the
+            smallest efficiency per codon.
+    """
+    if is_simulation_state(rna_results):
+        codons, levels = rna_results.codons, rna_results.nutrient_levels
+        chunks = ((chunk.nutrient_codes.astype(np.intp), chunk.efficiencies) for chunk in rna_results.iter_chunks(chunk_size))
+    else:
+        if "nutrient_levels" not in rna_results.columns:
+            raise ValueError("Missing 'nutrient_levels' column in rna_results DataFrame.")
+        codons, efficiencies = _efficiency_matrix(rna_results)
+        values = rna_results["nutrient_levels"].to_numpy(dtype=float)
+        known = ~np.isnan(values)
+        levels, codes = np.unique(values[known], return_inverse=True)
+        efficiencies = efficiencies[known]
+        chunks = ((codes[start:start + chunk_size], efficiencies[start:start + chunk_size])
+                  for start in range(0, len(codes), chunk_size))
+
+    num_levels, num_codons = len(levels), len(codons)
+    count = np.zeros((num_levels, num_codons))
+    total = np.zeros((num_levels, num_codons))
+    squares = np.zeros((num_levels, num_codons))
+    minimum = np.full(num_codons, np.inf)
+    for codes, efficiencies in chunks:
+        efficiencies = np.asarray(efficiencies, dtype=float)
+        # Per-level sums of all codons at once, as (levels, cycles) one-hot products
+        one_hot = (np.arange(num_levels)[:, None] == codes[None, :]).astype(float)
+        missing = np.isnan(efficiencies)
+        if missing.any():
+            values = np.where(missing, 0.0, efficiencies)
+            count += one_hot @ ~missing
+            chunk_minimum = np.where(missing, np.inf, efficiencies).min(axis=0, initial=np.inf)
         else:
-            # Compute required values
-            mean_efficiency = efficiencies.mean()
-            variance = efficiencies.var(ddof=1)  # Sample variance
-            std_dev = efficiencies.std(ddof=1)  # Sample standard deviation
-            max_val = efficiencies.max()
-            min_val = efficiencies.min()
-            range_val = max_val - min_val if max_val > min_val else np.nan
-
-            # Store only requested metrics
-            if "variance" in metrics:
-                codon_data["variance"] = variance
-            if "Fano_factor" in metrics:
-                codon_data["Fano_factor"] = variance / mean_efficiency if mean_efficiency > 0 else np.nan
-            if "CV" in metrics:
-                codon_data["CV"] = std_dev / mean_efficiency if mean_efficiency > 0 else np.nan
-            if "CRI" in metrics:
-                codon_data["CRI"] = mean_efficiency / range_val if range_val > 0 else np.nan
-
-        results.append(codon_data)
-
-    # Convert list of dictionaries to DataFrame
-    return pd.DataFrame(results, columns=["codon"] + list(metrics))
+            values = efficiencies
+            count += np.bincount(codes, minlength=num_levels)[:, None]
+            chunk_minimum = efficiencies.min(axis=0, initial=np.inf)
+        total += one_hot @ values
+        squares += one_hot @ (values * values)
+        minimum = np.minimum(minimum, chunk_minimum)
+    return codons, np.asarray(levels, dtype=float), count, total, squares, minimum
+
+
+def fit_codon_glms(rna_results, family="gamma", max_iterations=25, tolerance=1e-8, chunk_size=1_000_000,
+                   codon_efficiency=None):
+    """
+    Fits a GLM of efficiency on nutrient level for every codon at once with batched IRLS.
+
+    Nutrient levels are discrete, so the trajectory is first reduced to per-level counts and sums of
+    every codon's efficiencies. Each IRLS step then solves all codons' 2x2 weighted normal equations as
+    one stacked (codons, 2, 2) system, at a cost that does not depend on the number of cycles.
+
+    Parameters:
+        rna_results (pd.DataFrame or SimulationState): Efficiencies and nutrient levels of every cycle.
+        family (str): "gamma" (log link, for positive efficiencies) or "gaussian" (identity link).
+        max_iterations (int): Maximum number of IRLS iterations.
+        tolerance (float): Convergence threshold on the relative change of the coefficients.
+        chunk_size (int): Cycles read at a time from a SimulationState.
+        codon_efficiency (dict): Codon types for a DataFrame input; a SimulationState uses its registry.
+
+    Returns:
+        pd.DataFrame: One row per codon with "codon", "codon_type" (when known), "glm_intercept",
+            "glm_nutrient_level" and their standard errors ("_se"), the Pearson dispersion "glm_dispersion"
+            and "glm_converged". Codons observed at fewer than two nutrient levels get NaN coefficients.
+
+    Raises:
+        ValueError: If the family is unknown, or a Gamma fit meets non-positive efficiencies.
+    """
+    if family not in GLM_FAMILIES:
+        raise ValueError(f"Unknown GLM family '{family}'. Choose from: {', '.join(GLM_FAMILIES)}.")
+    inverse_link, mean_derivative, variance_function = GLM_FAMILIES[family]
+
+    codons, levels, count, total, squares, minimum = _level_statistics(rna_results, chunk_size)
+    if family == "gamma" and np.any(minimum <= 0):
+        raise ValueError("Gamma GLMs require positive efficiencies; use family='gaussian'.")
+
+    design = np.column_stack([np.ones(len(levels)), levels])  # (levels, 2)
+    observed = count > 0
+    identifiable = observed.sum(axis=0) >= 2
+    with np.errstate(divide="ignore", invalid="ignore"):
+        level_mean = np.where(observed, total / count, 0.0)
+
+    # Start from the least-squares fit on the link scale
+    start = np.log(np.where(observed, level_mean, 1.0)) if family == "gamma" else level_mean
+    ridge = np.where(identifiable, 0.0, 1.0)[:, None, None] * np.eye(2)  # Keeps unidentifiable systems solvable
+    gram = np.einsum("lp,lc,lq->cpq", design, count, design) + ridge
+    coefficients = np.linalg.solve(gram, np.einsum("lp,lc->cp", design, count * start)[..., None])[..., 0]
+
+    converged = np.zeros(len(codons), dtype=bool)
+    for _ in range(max_iterations):
+        linear_predictor = design @ coefficients.T  # (levels, codons)
+        mean = inverse_link(linear_predictor)
+        derivative = mean_derivative(linear_predictor)
+        weights = count * derivative ** 2 / variance_function(mean)
+        working_response = linear_predictor + (level_mean - mean) / derivative
+        gram = np.einsum("lp,lc,lq->cpq", design, weights, design) + ridge
+        updated = np.linalg.solve(gram, np.einsum("lp,lc->cp", design, weights * working_response)[..., None])[..., 0]
+        converged = np.all(np.abs(updated - coefficients) <= tolerance * (1 + np.abs(coefficients)), axis=1)
+        coefficients = updated
+        if converged.all():
+            break
+
+    # Pearson dispersion from the per-level sums: sum over cycles of (y - mean)^2 / V(mean)
+    mean = inverse_link(design @ coefficients.T)
+    pearson = ((squares - 2 * mean * total + count * mean ** 2) / variance_function(mean)).sum(axis=0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        dispersion = np.where(count.sum(axis=0) > 2, pearson / (count.sum(axis=0) - 2), np.nan)
+    standard_errors = np.sqrt(dispersion[:, None] * np.diagonal(np.linalg.inv(gram), axis1=1, axis2=2))
+
+    coefficients[~identifiable] = np.nan
+    standard_errors[~identifiable] = np.nan
+    results = {"codon": codons}
+    if is_simulation_state(rna_results):
+        results["codon_type"] = [CodonType(code).name.lower() for code in rna_results.registry["type"]]
+    elif codon_efficiency is not None:
+        results["codon_type"] = [codon_efficiency.get(codon, {}).get("type", "other") for codon in codons]
+    results.update({
+        "glm_intercept": coefficients[:, 0],
+        "glm_intercept_se": standard_errors[:, 0],
+        "glm_nutrient_level": coefficients[:, 1],
+        "glm_nutrient_level_se": standard_errors[:, 1],
+        "glm_dispersion": dispersion,
+        "glm_converged": converged & identifiable,
+    })
+    return pd.DataFrame(results)
 
 if __name__ == "__main__":
     from initialization import initialize_simulation
@@ -100,4 +456,5 @@ if __name__ == "__main__":
 
     # Display results
     print(variability_results)
+    print(fit_codon_glms(rna_results, family="gamma", codon_efficiency=initialization_results["codon_efficiency"]))
 
@@ -1,6 +1,11 @@
+import hashlib
+import json
+from collections.abc import Mapping
+from functools import lru_cache
+from types import MappingProxyType
 
 
-def get_config():
+def _default_values():
     """
     Produces a config dictionary contaning all of the relevant parameters to use as input of the package.
 
@@ -13,6 +18,10 @@ def get_config():
     #Establish paths
     config["input_path"] = "" #Path for input data
     config["output_path"] = "results/" # Path for saving output
+    config["output_format"] = "csv" # Table format: "csv", "parquet"/"feather" (need pyarrow), "npz" or "npy" (memory-mappable columns)
+    config["generate_plots"] = True # Draw figures (the --no-plots flag disables them for headless runs)
+    config["save_trajectory"] = False # Also save the per-cycle trajectory (staged and fused modes)
+    config["memmap_trajectory"] = False # Fused mode: keep the trajectory in memory-mapped .npy files under output_path/trajectory_state
 
     #Establish metrics
     config["metrics"] = ["variance", "Fano_factor", "CV", "CRI"]  # Metrics for variability
@@ -24,6 +33,8 @@ def get_config():
     config["sensitive_codons"] = ["CGT", "CTG"]
     config["stress_probability"] = 0.1
     config["recovery_probability"] = 0.05
+    config["nutrient_process"] = "iid" # "iid" draws every cycle independently, "markov" runs a level Markov chain
+    config["transition_matrix"] = None # Markov transition matrix (None builds it from the stress/recovery probabilities)
 
     config["possible_codons"] = [
     "UUU", "UUC",  # Phenylalanine (Phe)
@@ -63,6 +74,9 @@ def get_config():
     #RNA processing data
     config["rnase_activity"] = 0.05
     config["decay_variability"] = 0.1
+    config["rna_decay_mode"] = "deterministic" # "deterministic" exponential decay, or "stochastic" discrete mRNA copies (SSA/tau-leaping; staged mode only)
+    config["initial_mrna_copies"] = 100 # Typical mRNA molecules per codon in stochastic mode
+    config["ssa_threshold"] = 10 # Copy number below which stochastic mode switches to exact SSA
 
     #Constants for translation dynamics
     config["max_efficiency"] = 1.5
@@ -70,5 +84,212 @@ def get_config():
     config["hill_coefficient"] = 2
     config["nutrient_threshold"] = 0.5
 
+    #Pipeline execution
+    config["pipeline_mode"] = "staged" # "staged" runs each stage on a DataFrame, "fused" runs stress/translation/decay in one pass, "streaming" runs the fused pass chunk by chunk
+    config["chunk_size"] = 1_000_000 # Cycles per chunk in streaming mode
+    config["translate_after_stress"] = False # Fused mode only: translate at the post-stress nutrient level
+
+    #Experimental benchmarks
+    config["experimental_data_path"] = None # Benchmark table (CSV/Parquet/...) with codon, optional condition and metric columns (None uses synthetic benchmarks)
+    config["experimental_condition"] = None # Condition of the benchmark table to validate against (None if it holds one condition)
+
+    #Validation uncertainty
+    config["n_bootstrap"] = 0 # Bootstrap resamples for correlation/MSE confidence intervals (0 disables)
+    config["n_permutations"] = 0 # Random pairings for permutation p-values (0 disables)
+    config["confidence_level"] = 0.95 # Coverage of the bootstrap confidence intervals
+
+    #Per-codon GLMs of efficiency on nutrient level, added to the variability table (staged and fused modes)
+    config["fit_glm"] = False
+    config["glm_family"] = "gamma" # "gamma" (log link) or "gaussian" (identity link)
+
+    #Bayesian hierarchical model (staged and fused modes)
+    config["hierarchical_model"] = False # Fit codon-in-category regressions of efficiency on nutrient level
+    config["hierarchical_chains"] = 4 # Gibbs sampling chains, run in parallel processes
+    config["hierarchical_samples"] = 1000 # Draws kept per chain
+    config["hierarchical_warmup"] = 500 # Draws discarded per chain
+
+    #Plotting
+    config["plot_bins"] = 1000 # Cycle buckets of the plot summaries (min/mean/max per bucket)
+    config["histogram_bins"] = 50 # Bins of the per-codon efficiency histograms
+
+    #Stage cache
+    config["cache_dir"] = None # Directory of the on-disk stage cache (None disables caching; requires a seed)
+    config["cache_max_bytes"] = 1_073_741_824 # Least recently used stage outputs are evicted beyond this size
+
+    #Checkpointing
+    config["checkpoint_interval"] = 300 # Seconds between checkpoints of streaming runs and sweeps (None disables checkpoints)
+
+    #Random number generation
+    config["seed"] = None # Root seed for every random stream (None draws fresh entropy from the global numpy state)
+
+    #Parallel execution
+    config["max_workers"] = None # Worker processes for sweeps (None uses all CPUs)
+
+
+    return config
+
+
+def _freeze(value):
+    """
+    Converts lists (including nested ones and numpy arrays) into tuples so config values cannot be mutated.
+    """
+    if hasattr(value, "tolist"):
+        value = value.tolist()
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+def _thaw(value):
+    """
+    Converts frozen tuples back into fresh lists.
+    """
+    if isinstance(value, tuple):
+        return [_thaw(item) for item in value]
+    return value
+
+
+def validate_config(values):
+    """
+    Checks the simulation parameters of a configuration.
+
+    Parameters:
+        values (Mapping): Configuration values.
+
+    Raises:
+        ValueError: If a parameter is invalid.
+    """
+    if not isinstance(values["num_cycles"], int) or values["num_cycles"] <= 0:
+        raise ValueError("num_cycles must be a positive integer.")
+    if not values["nutrient_levels"] or not all(isinstance(n, (int, float)) for n in values["nutrient_levels"]):
+        raise ValueError("nutrient_levels must be a non-empty list of numbers.")
+    for name in ("stress_probability", "recovery_probability", "rnase_activity", "decay_variability"):
+        if not (0 <= values[name] <= 1):
+            raise ValueError(f"{name} must be between 0 and 1.")
+    if values["min_efficiency"] > values["max_efficiency"]:
+        raise ValueError("min_efficiency must not exceed max_efficiency.")
+    if values["nutrient_process"] not in ("iid", "markov"):
+        raise ValueError("nutrient_process must be 'iid' or 'markov'.")
+    if values["rna_decay_mode"] not in ("deterministic", "stochastic"):
+        raise ValueError("rna_decay_mode must be 'deterministic' or 'stochastic'.")
+    if values["pipeline_mode"] not in ("staged", "fused", "streaming"):
+        raise ValueError("pipeline_mode must be 'staged', 'fused' or 'streaming'.")
+    if values["rna_decay_mode"] == "stochastic" and values["pipeline_mode"] != "staged":
+        raise ValueError("rna_decay_mode 'stochastic' is only supported with pipeline_mode 'staged'.")
+    for name in ("chunk_size", "initial_mrna_copies", "plot_bins", "histogram_bins", "hierarchical_chains"):
+        if not isinstance(values[name], int) or values[name] <= 0:
+            raise ValueError(f"{name} must be a positive integer.")
+    if values["max_workers"] is not None and (not isinstance(values["max_workers"], int) or values["max_workers"] <= 0):
+        raise ValueError("max_workers must be a positive integer or None.")
+    if values["cache_max_bytes"] is not None and (not isinstance(values["cache_max_bytes"], int) or values["cache_max_bytes"] <= 0):
+        raise ValueError("cache_max_bytes must be a positive integer or None.")
+    if values["glm_family"] not in ("gamma", "gaussian"):
+        raise ValueError("glm_family must be 'gamma' or 'gaussian'.")
+    if values["output_format"] not in ("csv", "parquet", "feather", "npz", "npy"):
+        raise ValueError("output_format must be 'csv', 'parquet', 'feather', 'npz' or 'npy'.")
+    if values["checkpoint_interval"] is not None and values["checkpoint_interval"] < 0:
+        raise ValueError("checkpoint_interval must be non-negative or None.")
+    for name in ("n_bootstrap", "n_permutations", "hierarchical_warmup"):
+        if not isinstance(values[name], int) or values[name] < 0:
+            raise ValueError(f"{name} must be a non-negative integer.")
+    if not isinstance(values["hierarchical_samples"], int) or values["hierarchical_samples"] < 4:
+        raise ValueError("hierarchical_samples must be an integer of at least 4.")
+    if not (0 < values["confidence_level"] < 1):
+        raise ValueError("confidence_level must be between 0 and 1.")
+    if values["seed"] is not None and (not isinstance(values["seed"], int) or values["seed"] < 0):
+        raise ValueError("seed must be a non-negative integer or None.")
+
 
-    return config
\ No newline at end of file
+class SimulationConfig(Mapping):
+    """
+    Immutable, validated simulation configuration.
+
+    Values are read like a dictionary (`config["rnase_activity"]`) or as attributes (`config.rnase_activity`).
+    List values are stored as tuples and returned as fresh lists, so callers may modify what they get
+    without affecting the shared configuration. Use `with_` to derive a modified copy.
+
+    Attributes:
+        fingerprint (str): SHA-256 hex digest of the canonical JSON form of the values.
+    """
+
+    __slots__ = ("_values", "_fingerprint")
+
+    def __init__(self, values):
+        values = {key: _freeze(value) for key, value in dict(values).items()}
+        validate_config(values)
+        object.__setattr__(self, "_values", MappingProxyType(values))
+        object.__setattr__(self, "_fingerprint", None)
+
+    def __getitem__(self, key):
+        return _thaw(self._values[key])
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        try:
+            return self[name]
+        except KeyError:
+            raise AttributeError(f"SimulationConfig has no parameter '{name}'") from None
+
+    def __setattr__(self, name, value):
+        raise AttributeError("SimulationConfig is immutable; use with_() to derive a modified copy.")
+
+    def __setitem__(self, key, value):
+        raise TypeError("SimulationConfig is immutable; use with_() to derive a modified copy.")
+
+    def __iter__(self):
+        return iter(self._values)
+
+    def __len__(self):
+        return len(self._values)
+
+    def __eq__(self, other):
+        if isinstance(other, SimulationConfig):
+            return self.fingerprint == other.fingerprint
+        return Mapping.__eq__(self, other)
+
+    def __hash__(self):
+        return hash(self.fingerprint)
+
+    def __reduce__(self):
+        return (SimulationConfig, (self.to_dict(),))
+
+    def __repr__(self):
+        return f"SimulationConfig(fingerprint={self.fingerprint[:12]!r})"
+
+    def with_(self, **changes):
+        """
+        Returns a validated copy with some parameters replaced.
+
+        Raises:
+            KeyError: If a parameter name is unknown.
+            ValueError: If the resulting configuration is invalid.
+        """
+        unknown = [key for key in changes if key not in self._values]
+        if unknown:
+            raise KeyError(f"Unknown configuration parameters: {', '.join(unknown)}")
+        return SimulationConfig({**self._values, **changes})
+
+    def to_dict(self):
+        """
+        Returns the values as a plain, mutable dictionary.
+        """
+        return {key: self[key] for key in self._values}
+
+    @property
+    def fingerprint(self):
+        if self._fingerprint is None:
+            canonical = json.dumps(self.to_dict(), sort_keys=True, separators=(",", ":"))
+            object.__setattr__(self, "_fingerprint", hashlib.sha256(canonical.encode("utf-8")).hexdigest())
+        return self._fingerprint
+
+
+@lru_cache(maxsize=None)
+def get_config():
+    """
+    Returns the package configuration, built and validated once per process.
+
+    Returns:
+        SimulationConfig: config
+    """
+    return SimulationConfig(_default_values())
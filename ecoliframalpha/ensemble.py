@@ -0,0 +1,200 @@
+import warnings
+import numpy as np
+import pandas as pd
+from scipy import stats
+from config.config import get_config
+from initialization import _validate_initialization_inputs, _build_codon_efficiency, _sample_nutrient_codes
+from translation_dynamics import hill_response_table
+from nutrient_stress import stress_level_codes
+from rna_processing import decay_factors, decay_rates, mrna_copy_scale
+from codon_variability import _variability_arrays
+from utils import spawn_rngs
+
+# Configuration parameters that affect ensemble results; the others (paths, pipeline mode, plotting, ...) do not
+ENSEMBLE_CONFIG_KEYS = ["base_efficiency_robust", "base_efficiency_sensitive", "nutrient_process", "transition_matrix",
+                        "max_efficiency", "min_efficiency", "hill_coefficient", "nutrient_threshold",
+                        "translate_after_stress", "rna_decay_mode", "initial_mrna_copies", "ssa_threshold"]
+
+
+def simulate_ensemble(num_replicates, num_cycles, nutrient_levels, codon_efficiency, stress_probability=0.1,
+                      recovery_probability=0.05, rnase_activity=0.05, decay_variability=0.1, rng=None,
+                      config=None):
+    """
+    Simulates a batch of independent replicates as one (replicates, cycles, codons) array.
+
+    The stages follow `main.main`: nutrient levels are drawn by `config["nutrient_process"]`, translation
+    is driven by the initial levels (the stressed ones with `config["translate_after_stress"]`), then
+    nutrient stress is applied and RNA decay, deterministic or stochastic by `config["rna_decay_mode"]`,
+    uses the stressed levels.
+
+    Parameters:
+        num_replicates (int): Number of independent replicates.
+        num_cycles (int): Number of translation cycles per replicate.
+        nutrient_levels (list of float): List of possible nutrient levels.
+        codon_efficiency (dict): Dictionary mapping codons to their "base_efficiency" and "type".
+        stress_probability (float): Probability of a nutrient drop at each cycle (0 ≤ p ≤ 1).
+        recovery_probability (float): Probability of nutrient recovery at each cycle (0 ≤ p ≤ 1).
+        rnase_activity (float): Baseline RNA degradation rate (0 ≤ rnase_activity ≤ 1).
+        decay_variability (float): Variability in RNA degradation.
+        rng (np.random.Generator or list): Parent stream, or one Generator per replicate; each replicate
+            draws only from its own stream, so results do not depend on how replicates are batched.
+        config (SimulationConfig): Run configuration supplying the nutrient process, Hill parameters and RNA
+            decay mode; None uses `get_config()`.
+
+    Returns:
+        dict: A dictionary containing:
+            - "efficiencies" (np.ndarray): (replicates, cycles, codons) efficiencies after RNA decay.
+            - "nutrient_codes" (np.ndarray): (replicates, cycles) stressed nutrient level indices.
+    """
+    config = get_config() if config is None else config
+    num_levels = len(nutrient_levels)
+
+    replicate_rngs = rng if isinstance(rng, (list, tuple)) else spawn_rngs(rng, num_replicates)
+    if len(replicate_rngs) != num_replicates:
+        raise ValueError("rng must provide one Generator per replicate.")
+
+    # Initialization and nutrient stress: one nutrient level index per replicate and cycle
+    initial_codes = np.empty((num_replicates, num_cycles), dtype=np.uint8)
+    stressed_codes = np.empty((num_replicates, num_cycles), dtype=np.uint8)
+    for replicate, replicate_rng in enumerate(replicate_rngs):
+        initial_codes[replicate] = _sample_nutrient_codes(num_cycles, nutrient_levels, config, replicate_rng,
+                                                          stress_probability, recovery_probability)
+        stressed_codes[replicate] = stress_level_codes(initial_codes[replicate], num_levels, stress_probability,
+                                                       recovery_probability, replicate_rng)
+
+    # Translation and decay are both per-level lookups, gathered for every replicate and cycle
+    translation_table = hill_response_table(
+        nutrient_levels, codon_efficiency,
+        config["max_efficiency"], config["min_efficiency"], config["hill_coefficient"], config["nutrient_threshold"],
+    )
+    base_efficiency = [properties["base_efficiency"] for properties in codon_efficiency.values()]
+    efficiencies = np.take(translation_table, stressed_codes if config["translate_after_stress"] else initial_codes, axis=0)
+
+    if config["rna_decay_mode"] == "stochastic":
+        # Every replicate's mRNA pools follow its own stressed levels and draw from its own stream
+        rate_table = decay_rates(nutrient_levels, base_efficiency, rnase_activity, decay_variability)
+        for replicate, replicate_rng in enumerate(replicate_rngs):
+            efficiencies[replicate] *= mrna_copy_scale(np.take(rate_table, stressed_codes[replicate], axis=0),
+                                                       config["initial_mrna_copies"], config["ssa_threshold"],
+                                                       replicate_rng)
+    else:
+        decay_table = decay_factors(nutrient_levels, base_efficiency, rnase_activity, decay_variability)
+        efficiencies *= np.take(decay_table, stressed_codes, axis=0)
+    np.clip(efficiencies, 0, None, out=efficiencies)
+
+    return {"efficiencies": efficiencies, "nutrient_codes": stressed_codes}
+
+
+def run_ensemble(num_replicates, num_cycles, nutrient_levels, robust_codons=["AAA", "GAT"],
+                 sensitive_codons=["CGT", "CTG"], stress_probability=0.1, recovery_probability=0.05,
+                 rnase_activity=0.05, decay_variability=0.1, metrics=["variance", "Fano_factor", "CV", "CRI"],
+                 confidence=0.95, batch_size=None, rng=None, config=None):
+    """
+    Runs a replicate ensemble and summarizes the variability metrics across replicates.
+
+    Parameters:
+        num_replicates (int): Number of independent replicates.
+        num_cycles (int): Number of translation cycles per replicate.
+        nutrient_levels (list of float): List of possible nutrient levels.
+        robust_codons (list of str): List of codons with high stability under stress.
+        sensitive_codons (list of str): List of codons with low stability under stress.
+        stress_probability (float): Probability of a nutrient drop at each cycle (0 ≤ p ≤ 1).
+        recovery_probability (float): Probability of nutrient recovery at each cycle (0 ≤ p ≤ 1).
+        rnase_activity (float): Baseline RNA degradation rate (0 ≤ rnase_activity ≤ 1).
+        decay_variability (float): Variability in RNA degradation.
+        metrics (list): List of metrics to calculate (options: "variance", "Fano_factor", "CV", "CRI").
+        confidence (float): Coverage of the confidence interval of the mean and of the replicate interval
+            (0 < confidence < 1).
+        batch_size (int): Replicates simulated per batch; None simulates all replicates together.
+        rng (np.random.Generator, int or np.random.SeedSequence): Root stream; every replicate gets its own child.
+        config (SimulationConfig): Run configuration (e.g. a `with_()` variant); None uses `get_config()`.
+
+    Returns:
+        dict: A dictionary containing:
+            - "replicates" (pd.DataFrame): One row per replicate and codon with the requested metrics.
+            - "summary" (pd.DataFrame): One row per codon and metric with the ensemble mean, its t-based
+              confidence interval "ci_lower"/"ci_upper" (NaN with fewer than two replicates), and the
+              "interval_lower"/"interval_upper" percentiles of the metric across replicates, which describe
+              the spread of the replicates rather than the uncertainty of the mean.
+
+    Raises:
+        ValueError: If input parameters are invalid.
+    """
+    _validate_initialization_inputs(num_cycles, nutrient_levels, robust_codons, sensitive_codons)
+    if not isinstance(num_replicates, int) or num_replicates <= 0:
+        raise ValueError("num_replicates must be a positive integer.")
+    if not nutrient_levels:
+        raise ValueError("nutrient_levels must be a list of numbers.")
+    if not (0 < confidence < 1):
+        raise ValueError("confidence must be between 0 and 1.")
+
+    valid_metrics = ["variance", "Fano_factor", "CV", "CRI"]
+    metrics = [metric for metric in valid_metrics if metric in metrics]
+    if not metrics:
+        raise ValueError(f"Metrics must be chosen from {set(valid_metrics)}")
+
+    config = get_config() if config is None else config
+    codon_efficiency = _build_codon_efficiency(robust_codons, sensitive_codons, config)
+    codons = list(codon_efficiency)
+    batch_size = batch_size or num_replicates
+    replicate_rngs = spawn_rngs(rng, num_replicates)
+
+    # Simulate in replicate batches so memory stays bounded for large ensembles
+    metric_values = {metric: [] for metric in metrics}
+    for start in range(0, num_replicates, batch_size):
+        batch = simulate_ensemble(
+            min(batch_size, num_replicates - start), num_cycles, nutrient_levels, codon_efficiency,
+            stress_probability, recovery_probability, rnase_activity, decay_variability,
+            replicate_rngs[start:start + batch_size], config,
+        )
+        for metric, values in _variability_arrays(batch["efficiencies"], metrics, axis=1).items():
+            metric_values[metric].append(values)
+    metric_values = {metric: np.concatenate(values) for metric, values in metric_values.items()}
+
+    # Per-replicate table in long-by-codon form
+    replicates = pd.DataFrame({
+        "replicate": np.repeat(np.arange(num_replicates), len(codons)),
+        "codon": np.tile(codons, num_replicates),
+        **{metric: values.ravel() for metric, values in metric_values.items()},
+    })
+
+    # Ensemble mean with its confidence interval, and spread of the replicates (percentile interval),
+    # for each codon and metric
+    tail = (1 - confidence) / 2 * 100
+    summary = []
+    for metric, values in metric_values.items():
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)  # Codons whose metric is NaN in every replicate
+            mean = np.nanmean(values, axis=0)
+            lower, upper = np.nanpercentile(values, [tail, 100 - tail], axis=0)
+            count = np.count_nonzero(~np.isnan(values), axis=0)
+            half_width = np.full(len(codons), np.nan)
+            enough = count > 1
+            half_width[enough] = (stats.t.ppf(1 - tail / 100, count[enough] - 1)
+                                  * np.nanstd(values[:, enough], axis=0, ddof=1) / np.sqrt(count[enough]))
+        for position, codon in enumerate(codons):
+            summary.append({
+                "codon": codon,
+                "metric": metric,
+                "mean": mean[position],
+                "ci_lower": mean[position] - half_width[position],
+                "ci_upper": mean[position] + half_width[position],
+                "interval_lower": lower[position],
+                "interval_upper": upper[position],
+            })
+
+    return {"replicates": replicates, "summary": pd.DataFrame(summary)}
+
+
+if __name__ == "__main__":
+    # Example ensemble
+    ensemble_results = run_ensemble(
+        num_replicates=100,
+        num_cycles=1000,
+        nutrient_levels=[1.0, 0.75, 0.5, 0.25, 0.1],
+        robust_codons=["AAA", "GAT"],
+        sensitive_codons=["CGT", "CTG"],
+    )
+
+    # Display ensemble summary
+    print(ensemble_results["summary"])
@@ -0,0 +1,137 @@
+import os
+from functools import lru_cache
+import pandas as pd
+from utils import load_table
+
+
+def normalize_codons(codons):
+    """
+    Converts codons to the upper-case RNA alphabet, so "cgt", "CGT" and "CGU" share one join key.
+
+    Parameters:
+        codons (array-like): Codon strings.
+
+    Returns:
+        pd.Index: Normalized codons.
+    """
+    return pd.Index(pd.Series(codons, dtype="string").str.strip().str.upper().str.replace("T", "U", regex=False),
+                    name="codon")
+
+
+@lru_cache(maxsize=8)
+def _read_experimental_data(path, modified, size, codon_column, condition_column):
+    """
+    Parses and indexes a benchmark table; `modified` and `size` only make file changes invalidate the cache.
+    """
+    data = load_table(path)
+    if codon_column not in data.columns:
+        raise ValueError(f"Missing '{codon_column}' column in experimental data: {path}")
+
+    keys = [normalize_codons(data[codon_column].to_numpy())]
+    if condition_column in data.columns:
+        keys.append(pd.Index(data[condition_column].astype(str).to_numpy(), name="condition"))
+    metrics = data.drop(columns=[column for column in (codon_column, condition_column) if column in data.columns])
+    metrics = metrics.select_dtypes("number")
+
+    # Several rows per codon and condition (e.g. one per gene) are averaged into one benchmark
+    grouped = metrics.groupby(keys, sort=True)
+    indexed = grouped.mean()
+    indexed.insert(0, "num_measurements", grouped.size().to_numpy())
+    return indexed
+
+
+def load_experimental_data(path, codon_column="codon", condition_column="condition"):
+    """
+    Loads a benchmark table indexed by codon and, if present, experimental condition.
+
+    Any format readable by `utils.load_table` works (CSV, Parquet, Feather, NPZ, NPY). Codons are
+    normalized with `normalize_codons`, non-numeric columns other than the keys are dropped, and
+    repeated codon/condition rows (e.g. one per gene) are averaged. Parsed tables are cached
+    in memory until the file changes.
+
+    Parameters:
+        path (str): Benchmark file.
+        codon_column (str): Column holding the codons.
+        condition_column (str): Column holding the experimental condition; optional in the file.
+
+    Returns:
+        pd.DataFrame: Benchmark metrics with a sorted "codon" (or ("codon", "condition")) index and a
+            "num_measurements" column counting the averaged rows.
+
+    Raises:
+        FileNotFoundError: If the file does not exist.
+        ValueError: If the codon column is missing or the format is not recognized.
+    """
+    path = os.path.abspath(path)
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Experimental data not found: {path}")
+    stat = os.stat(path)
+    return _read_experimental_data(path, stat.st_mtime_ns, stat.st_size, codon_column, condition_column).copy()
+
+
+def select_condition(experimental_data, condition=None):
+    """
+    Returns the benchmarks of one experimental condition as a table with a "codon" column.
+
+    Parameters:
+        experimental_data (pd.DataFrame): Benchmarks with a "codon" column or index level, and optionally
+            a "condition" column or index level.
+        condition (str): Condition to keep; may be omitted when the data holds one condition.
+
+    Returns:
+        pd.DataFrame: Benchmarks of the condition.
+
+    Raises:
+        ValueError: If the condition is ambiguous or unknown.
+    """
+    benchmarks = experimental_data.reset_index() if "codon" in experimental_data.index.names else experimental_data
+    if "condition" not in benchmarks.columns:
+        return benchmarks
+    conditions = benchmarks["condition"].astype(str)
+    if condition is None:
+        if conditions.nunique() > 1:
+            raise ValueError("Experimental data holds several conditions; choose one with `condition`.")
+        return benchmarks
+    selected = (conditions == str(condition)).to_numpy()
+    if not selected.any():
+        raise ValueError(f"Unknown experimental condition: {condition}")
+    return benchmarks[selected]
+
+
+def align_experimental_data(variability_results, experimental_data, condition=None):
+    """
+    Aligns benchmarks to the simulated codons with a hash join on the normalized codon.
+
+    Parameters:
+        variability_results (pd.DataFrame): Simulation results with a "codon" column.
+        experimental_data (pd.DataFrame): Benchmarks (see `select_condition`).
+        condition (str): Condition to compare against; may be omitted when the data holds one condition.
+
+    Returns:
+        pd.DataFrame: One benchmark row per row of `variability_results`, in the same order; codons without
+            a benchmark hold NaN.
+
+    Raises:
+        ValueError: If the condition is ambiguous or unknown, or the benchmarks repeat a codon.
+    """
+    benchmarks = select_condition(experimental_data, condition)
+    keys = normalize_codons(benchmarks["codon"].to_numpy())
+    if keys.has_duplicates:
+        raise ValueError("Experimental data contains duplicate codons.")
+    aligned = benchmarks.set_axis(keys, axis=0).reindex(normalize_codons(variability_results["codon"].to_numpy()))
+    return aligned.reset_index(drop=True)
+
+
+if __name__ == "__main__":
+    # Example benchmark table with two conditions and two genes per codon
+    table = pd.DataFrame({
+        "codon": ["AAA", "AAA", "CGT", "CGT"] * 2,
+        "gene": ["lacZ", "rpoB"] * 4,
+        "condition": ["glucose"] * 4 + ["starvation"] * 4,
+        "variance": [0.0026, 0.0028, 0.0079, 0.0081, 0.0031, 0.0033, 0.0098, 0.0102],
+    })
+    os.makedirs("results", exist_ok=True)
+    table.to_csv("results/benchmarks.csv", index=False)
+    experimental_data = load_experimental_data("results/benchmarks.csv")
+    print(experimental_data)
+    print(align_experimental_data(pd.DataFrame({"codon": ["CGT", "AAA", "GAT"]}), experimental_data, "glucose"))
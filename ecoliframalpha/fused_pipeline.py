@@ -0,0 +1,111 @@
+import numpy as np
+from config.config import get_config
+from translation_dynamics import hill_response_table
+from nutrient_stress import stress_level_codes
+from rna_processing import decay_factors
+from utils import make_rng
+
+def fused_response_table(nutrient_levels, codon_efficiency, rnase_activity=0.05, decay_variability=0.1,
+                         translate_after_stress=False, config=None):
+    """
+    Combines translation and RNA decay into a single lookup table keyed on nutrient level indices.
+
+    Parameters:
+        nutrient_levels (list of float): List of possible nutrient levels.
+        codon_efficiency (dict): Dictionary mapping codons to their "base_efficiency" and "type".
+        rnase_activity (float): Baseline RNA degradation rate (0 ≤ rnase_activity ≤ 1).
+        decay_variability (float): Variability in RNA degradation.
+        translate_after_stress (bool): If True, translation uses the post-stress level.
+        config (SimulationConfig): Run configuration (e.g. a `with_()` variant); None uses `get_config()`.
+
+    Returns:
+        np.ndarray: With `translate_after_stress`, a (levels, codons) table indexed by the stressed level;
+            otherwise a (levels * levels, codons) table indexed by `initial * levels + stressed`.
+    """
+    config = get_config() if config is None else config
+    translation_table = hill_response_table(
+        nutrient_levels, codon_efficiency,
+        config["max_efficiency"], config["min_efficiency"], config["hill_coefficient"], config["nutrient_threshold"],
+    )
+    base_efficiency = [properties["base_efficiency"] for properties in codon_efficiency.values()]
+    decay_table = decay_factors(nutrient_levels, base_efficiency, rnase_activity, decay_variability)
+
+    if translate_after_stress:
+        table = translation_table * decay_table
+    else:
+        # Row (initial, stressed): translation at the initial level, decay at the stressed level
+        table = (translation_table[:, None, :] * decay_table[None, :, :]).reshape(-1, len(base_efficiency))
+    return np.clip(table, 0, None)
+
+
+def run_fused_pipeline(state, stress_probability=0.1, recovery_probability=0.05, rnase_activity=0.05,
+                       decay_variability=0.1, translate_after_stress=False, rng=None, chunk_size=None,
+                       config=None):
+    """
+    Runs nutrient stress, translation and RNA decay in one pass over the buffers of a simulation state.
+
+    The nutrient codes are stressed in place and every efficiency is gathered once from a fused
+    translation x decay table, so no intermediate efficiency arrays or DataFrames are created.
+
+    Parameters:
+        state (SimulationState): State from `initialize_state`; its nutrient codes and efficiencies are overwritten.
+        stress_probability (float): Probability of a nutrient drop at each cycle (0 ≤ p ≤ 1).
+        recovery_probability (float): Probability of nutrient recovery at each cycle (0 ≤ p ≤ 1).
+        rnase_activity (float): Baseline RNA degradation rate (0 ≤ rnase_activity ≤ 1).
+        decay_variability (float): Variability in RNA degradation.
+        translate_after_stress (bool): If True, efficiencies reflect the post-stress nutrient level;
+            otherwise translation uses the initial level, as in the staged pipeline of `main.main`.
+        rng (np.random.Generator): Random stream for the stress events (see `utils.make_rng`).
+        chunk_size (int): If given, process the state in views of this many cycles, so temporaries stay
+            bounded for memory-mapped states. The result does not depend on it.
+        config (SimulationConfig): Run configuration supplying the Hill parameters; None uses `get_config()`.
+
+    Returns:
+        SimulationState: The same state holding stressed nutrient codes and decayed efficiencies.
+    """
+    if not (0 <= stress_probability <= 1):
+        raise ValueError("stress_probability must be between 0 and 1.")
+    if not (0 <= recovery_probability <= 1):
+        raise ValueError("recovery_probability must be between 0 and 1.")
+    if not (0 <= rnase_activity <= 1):
+        raise ValueError("rnase_activity must be between 0 and 1.")
+    if not (0 <= decay_variability <= 1):
+        raise ValueError("decay_variability must be between 0 and 1.")
+
+    num_levels = len(state.nutrient_levels)
+    table = fused_response_table(
+        state.nutrient_levels, state.codon_efficiency, rnase_activity, decay_variability, translate_after_stress,
+        config=config,
+    ).astype(state.efficiencies.dtype, copy=False)
+
+    rng = make_rng(rng)
+    for chunk in state.iter_chunks(chunk_size) if chunk_size else [state]:
+        stressed_codes = stress_level_codes(chunk.nutrient_codes, num_levels, stress_probability, recovery_probability, rng)
+        if translate_after_stress:
+            table_rows = stressed_codes
+        else:
+            table_rows = chunk.nutrient_codes.astype(np.intp) * num_levels + stressed_codes
+
+        np.take(table, table_rows, axis=0, out=chunk.efficiencies)
+        chunk.nutrient_codes[:] = stressed_codes
+    return state
+
+
+if __name__ == "__main__":
+    from initialization import initialize_state
+    from codon_variability import analyze_variability
+
+    # Example initialization
+    state = initialize_state(
+        num_cycles=1000,
+        nutrient_levels=[1.0, 0.75, 0.5, 0.25, 0.1],
+        robust_codons=["AAA", "GAT"],
+        sensitive_codons=["CGT", "CTG"],
+    )
+
+    # Stress, translate and decay in one pass
+    run_fused_pipeline(state, stress_probability=0.1, recovery_probability=0.05,
+                       rnase_activity=0.05, decay_variability=0.1)
+
+    # Display results
+    print(analyze_variability(state))
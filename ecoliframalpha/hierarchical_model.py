@@ -0,0 +1,260 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from simulation_state import CodonType, is_simulation_state
+from utils import make_rng, spawn_seeds
+
+# Weakly informative priors: category means ~ N(0, 10^2), variances ~ InvGamma(0.01, 0.01)
+DEFAULT_PRIORS = {"mean_scale": 10.0, "variance_shape": 0.01, "variance_rate": 0.01}
+
+
+def regression_statistics(state, chunk_size=1_000_000):
+    """
+    Reduces a trajectory to the per-codon sufficient statistics of a linear regression on nutrient level.
+
+    The state is read `chunk_size` cycles at a time, so memory-mapped trajectories are never loaded whole.
+    NaN efficiencies are left out of their codon's statistics.
+
+    Parameters:
+        state (SimulationState): Efficiencies and nutrient levels.
+        chunk_size (int): Cycles read at a time.
+
+    Returns:
+        dict: Per-codon arrays "n", "x", "xx", "y", "xy" and "yy" (counts and sums of nutrient level x,
+            efficiency y and their products), plus the mean nutrient level "x_mean".
+    """
+    statistics = {name: np.zeros(len(state.codons)) for name in ("n", "x", "xx", "y", "xy", "yy")}
+    for chunk in state.iter_chunks(chunk_size):
+        x = chunk.nutrient_values[:, None]
+        y = np.asarray(chunk.efficiencies, dtype=float)
+        valid = ~np.isnan(y)
+        x = np.where(valid, x, 0.0)
+        y = np.where(valid, y, 0.0)
+        statistics["n"] += valid.sum(axis=0)
+        statistics["x"] += x.sum(axis=0)
+        statistics["xx"] += np.einsum("ij,ij->j", x, x)
+        statistics["y"] += y.sum(axis=0)
+        statistics["xy"] += np.einsum("ij,ij->j", x, y)
+        statistics["yy"] += np.einsum("ij,ij->j", y, y)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        statistics["x_mean"] = statistics["x"].sum() / statistics["n"].sum() if statistics["n"].sum() else 0.0
+    return statistics
+
+
+def _centered(statistics):
+    """
+    Re-expresses the sums for the covariate centered on its mean, which decorrelates intercept and slope.
+    """
+    n, x_mean = statistics["n"], statistics["x_mean"]
+    return {
+        "n": n,
+        "x": statistics["x"] - n * x_mean,
+        "xx": statistics["xx"] - 2 * x_mean * statistics["x"] + n * x_mean ** 2,
+        "y": statistics["y"],
+        "xy": statistics["xy"] - x_mean * statistics["y"],
+        "yy": statistics["yy"],
+    }
+
+
+def log_likelihood(statistics, intercept, slope, noise_variance):
+    """
+    Gaussian log-likelihood of every codon's regression, summed over cycles through the sufficient statistics.
+
+    Parameters:
+        statistics (dict): Centered sufficient statistics (see `regression_statistics`).
+        intercept, slope, noise_variance (np.ndarray): Per-codon parameters; leading axes are broadcast,
+            so a whole (draws, codons) array of samples is evaluated at once.
+
+    Returns:
+        np.ndarray: Log-likelihood per codon (and per draw).
+    """
+    s = statistics
+    residual_sum_of_squares = (s["yy"] - 2 * intercept * s["y"] - 2 * slope * s["xy"] + intercept ** 2 * s["n"]
+                               + 2 * intercept * slope * s["x"] + slope ** 2 * s["xx"])
+    return -0.5 * s["n"] * np.log(2 * np.pi * noise_variance) - residual_sum_of_squares / (2 * noise_variance)
+
+
+def _inverse_gamma(rng, shape, rate):
+    return rate / rng.gamma(shape)
+
+
+def _run_chain(task):
+    """
+    Runs one Gibbs sampling chain; every update is vectorized over codons or categories.
+    """
+    statistics, categories, num_categories, num_samples, warmup, seed, priors = task
+    rng = make_rng(seed)
+    s = statistics
+    num_codons = len(categories)
+    category_sizes = np.bincount(categories, minlength=num_categories)
+
+    # (codons, 2, 2) normal equations of intercept and slope
+    gram = np.empty((num_codons, 2, 2))
+    gram[:, 0, 0], gram[:, 0, 1], gram[:, 1, 0], gram[:, 1, 1] = s["n"], s["x"], s["x"], s["xx"]
+    moments = np.stack([s["y"], s["xy"]], axis=1)
+
+    # Start from per-codon least squares, jittered so chains begin apart
+    coefficients = np.linalg.solve(gram + 1e-9 * np.eye(2), moments[..., None])[..., 0]
+    coefficients += rng.normal(0, 0.1, coefficients.shape)
+    group_mean = np.zeros((num_categories, 2))
+    group_variance = np.ones((num_categories, 2))
+    noise_variance = np.ones(num_codons)
+
+    draws = {
+        "intercept": np.empty((num_samples, num_codons)),
+        "slope": np.empty((num_samples, num_codons)),
+        "noise_variance": np.empty((num_samples, num_codons)),
+        "category_mean": np.empty((num_samples, num_categories, 2)),
+        "category_variance": np.empty((num_samples, num_categories, 2)),
+        "log_likelihood": np.empty(num_samples),
+    }
+    for iteration in range(warmup + num_samples):
+        # Codon coefficients | everything else: bivariate normal per codon
+        prior_precision = 1.0 / group_variance[categories]
+        precision = gram / noise_variance[:, None, None]
+        precision[:, [0, 1], [0, 1]] += prior_precision
+        linear = moments / noise_variance[:, None] + group_mean[categories] * prior_precision
+        cholesky = np.linalg.cholesky(precision)
+        mean = np.linalg.solve(precision, linear[..., None])[..., 0]
+        noise = np.linalg.solve(np.swapaxes(cholesky, 1, 2), rng.standard_normal((num_codons, 2, 1)))[..., 0]
+        coefficients = mean + noise
+        intercept, slope = coefficients[:, 0], coefficients[:, 1]
+
+        # Noise variance per codon | coefficients
+        residual_sum_of_squares = np.maximum(
+            s["yy"] - 2 * intercept * s["y"] - 2 * slope * s["xy"] + intercept ** 2 * s["n"]
+            + 2 * intercept * slope * s["x"] + slope ** 2 * s["xx"], 0.0)
+        noise_variance = _inverse_gamma(rng, priors["variance_shape"] + s["n"] / 2,
+                                        priors["variance_rate"] + residual_sum_of_squares / 2)
+
+        # Category means and variances | codon coefficients
+        sums = np.stack([np.bincount(categories, coefficients[:, j], num_categories) for j in range(2)], axis=1)
+        posterior_precision = category_sizes[:, None] / group_variance + 1.0 / priors["mean_scale"] ** 2
+        group_mean = (sums / group_variance) / posterior_precision + rng.standard_normal((num_categories, 2)) / np.sqrt(posterior_precision)
+        squares = np.stack([np.bincount(categories, (coefficients[:, j] - group_mean[categories, j]) ** 2, num_categories)
+                            for j in range(2)], axis=1)
+        group_variance = _inverse_gamma(rng, priors["variance_shape"] + category_sizes[:, None] / 2,
+                                        priors["variance_rate"] + squares / 2)
+
+        if iteration >= warmup:
+            draw = iteration - warmup
+            draws["intercept"][draw], draws["slope"][draw] = intercept, slope
+            draws["noise_variance"][draw] = noise_variance
+            draws["category_mean"][draw], draws["category_variance"][draw] = group_mean, group_variance
+            draws["log_likelihood"][draw] = log_likelihood(s, intercept, slope, noise_variance).sum()
+    return draws
+
+
+def split_r_hat(draws):
+    """
+    Computes the split potential scale reduction factor (R-hat) of every parameter at once.
+
+    Parameters:
+        draws (np.ndarray): (chains, draws, ...) samples.
+
+    Returns:
+        np.ndarray: R-hat with the trailing parameter shape; values near 1 indicate convergence.
+    """
+    half = draws.shape[1] // 2
+    if half < 2:
+        raise ValueError("At least four draws per chain are needed for R-hat.")
+    halves = np.concatenate([draws[:, :half], draws[:, half:2 * half]], axis=0)
+    within = halves.var(axis=1, ddof=1).mean(axis=0)
+    between = half * halves.mean(axis=1).var(axis=0, ddof=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        pooled = (half - 1) / half * within + between / half
+        return np.where(within > 0, np.sqrt(pooled / within), 1.0)
+
+
+def fit_hierarchical_model(state, num_chains=4, num_samples=1000, warmup=500, rng=None, max_workers=None,
+                           chunk_size=1_000_000, priors=None):
+    """
+    Fits a Bayesian hierarchical regression of translation efficiency on nutrient level.
+
+    Each codon c has efficiency_t = intercept_c + slope_c * (nutrient_t - mean nutrient) + noise with its own
+    noise variance, and codon intercepts and slopes are drawn from normal distributions specific to the
+    codon's category (robust, sensitive or other). The trajectory is reduced once to per-codon sufficient
+    statistics, so a Gibbs iteration costs O(codons) whatever the number of cycles, and independent chains
+    run in parallel worker processes.
+
+    Parameters:
+        state (SimulationState): Efficiencies and nutrient levels; codon categories come from its registry.
+        num_chains (int): Number of independent chains (at least 2 for R-hat).
+        num_samples (int): Draws kept per chain.
+        warmup (int): Draws discarded per chain before sampling.
+        rng (np.random.Generator): Parent random stream; each chain draws from its own child (see `utils.make_rng`).
+        max_workers (int): Maximum number of worker processes; None uses the CPU count, 1 runs in-process.
+        chunk_size (int): Cycles read at a time while computing the sufficient statistics.
+        priors (dict): Overrides of `DEFAULT_PRIORS`.
+
+    Returns:
+        dict: A dictionary containing:
+            - "codon_summary" (pd.DataFrame): Per codon: category, posterior mean and standard deviation of
+              intercept, slope and noise variance, and the worst R-hat of its parameters.
+            - "category_summary" (pd.DataFrame): Per category: posterior mean and standard deviation of the
+              mean and variance of intercepts and slopes (e.g. "slope_mean_posterior_mean"), with R-hat.
+            - "draws" (dict): (chains, draws, ...) samples of every parameter and the log-likelihood.
+            - "nutrient_mean" (float): Nutrient level at which intercepts are evaluated.
+
+    Raises:
+        ValueError: If the input is not a simulation state or a sampling parameter is invalid.
+    """
+    if not is_simulation_state(state):
+        raise ValueError("state must be a SimulationState.")
+    for name, value, minimum in (("num_chains", num_chains, 1), ("num_samples", num_samples, 4), ("warmup", warmup, 0)):
+        if not isinstance(value, int) or value < minimum:
+            raise ValueError(f"{name} must be an integer of at least {minimum}.")
+    if not state.codons:
+        raise ValueError("state has no codons to model.")
+    priors = {**DEFAULT_PRIORS, **(priors or {})}
+
+    statistics = regression_statistics(state, chunk_size)
+    category_codes, categories = np.unique(state.registry["type"], return_inverse=True)
+    category_names = [CodonType(code).name.lower() for code in category_codes]
+    tasks = [(_centered(statistics), categories, len(category_codes), num_samples, warmup, seed, priors)
+             for seed in spawn_seeds(rng, num_chains)]
+
+    max_workers = min(max_workers or os.cpu_count() or 1, num_chains)
+    if max_workers == 1:
+        chains = [_run_chain(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            chains = list(executor.map(_run_chain, tasks))
+    draws = {name: np.stack([chain[name] for chain in chains]) for name in chains[0]}
+
+    def r_hat(samples):
+        return split_r_hat(samples) if num_chains > 1 else np.full(samples.shape[2:], np.nan)
+
+    codon_summary = pd.DataFrame({"codon": state.codons, "category": [category_names[i] for i in categories]})
+    for name in ("intercept", "slope", "noise_variance"):
+        codon_summary[f"{name}_mean"] = draws[name].mean(axis=(0, 1))
+        codon_summary[f"{name}_sd"] = draws[name].std(axis=(0, 1))
+    codon_summary["r_hat"] = np.max([r_hat(draws[name]) for name in ("intercept", "slope", "noise_variance")], axis=0)
+
+    category_summary = pd.DataFrame({"category": category_names})
+    for name in ("category_mean", "category_variance"):
+        for j, coefficient in enumerate(("intercept", "slope")):
+            samples = draws[name][..., j]
+            column = f"{coefficient}_{name.split('_')[1]}"
+            category_summary[f"{column}_posterior_mean"] = samples.mean(axis=(0, 1))
+            category_summary[f"{column}_posterior_sd"] = samples.std(axis=(0, 1))
+            category_summary[f"{column}_r_hat"] = r_hat(samples)
+
+    return {
+        "codon_summary": codon_summary,
+        "category_summary": category_summary,
+        "draws": draws,
+        "nutrient_mean": float(statistics["x_mean"]),
+    }
+
+
+if __name__ == "__main__":
+    from initialization import initialize_state
+    from fused_pipeline import run_fused_pipeline
+
+    # Example fit on a fused run
+    state = run_fused_pipeline(initialize_state(1_000_000, [1.0, 0.75, 0.5, 0.25, 0.1], ["AAA", "GAT"], ["CGT", "CTG"]))
+    model = fit_hierarchical_model(state, num_chains=4, num_samples=500, warmup=250)
+    print(model["codon_summary"])
+    print(model["category_summary"])
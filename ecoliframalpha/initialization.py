@@ -1,8 +1,86 @@
 import numpy as np
 import pandas as pd
 from config.config import get_config
+from simulation_state import SimulationState
+from nutrient_stress import NutrientMarkovChain, default_transition_matrix
+from utils import make_rng
 
-def initialize_simulation(num_cycles, nutrient_levels, robust_codons=["AAA", "GAT"], sensitive_codons=["CGT", "CTG"] ):
+
+def _validate_initialization_inputs(num_cycles, nutrient_levels, robust_codons, sensitive_codons):
+    """
+    Validates the inputs shared by `initialize_simulation` and `initialize_state`.
+
+    Raises:
+        ValueError: If input parameters are invalid.
+    """
+    if not isinstance(num_cycles, int) or num_cycles <= 0:
+        raise ValueError("num_cycles must be a positive integer.")
+    if not isinstance(nutrient_levels, list) or not all(isinstance(n, (int, float)) for n in nutrient_levels):
+        raise ValueError("nutrient_levels must be a list of numbers.")
+    if not isinstance(robust_codons, list) or not all(isinstance(c, str) for c in robust_codons):
+        raise ValueError("robust_codons must be a list of strings.")
+    if not isinstance(sensitive_codons, list) or not all(isinstance(c, str) for c in sensitive_codons):
+        raise ValueError("sensitive_codons must be a list of strings.")
+
+
+def _build_codon_efficiency(robust_codons, sensitive_codons, config):
+    """
+    Maps each codon to its baseline efficiency and category.
+    """
+    codon_efficiency = {codon: {"base_efficiency": config["base_efficiency_robust"], "type": "robust"} for codon in robust_codons}
+    codon_efficiency.update({codon: {"base_efficiency": config["base_efficiency_sensitive"], "type": "sensitive"} for codon in sensitive_codons})
+    return codon_efficiency
+
+
+def _nutrient_chain(nutrient_levels, config, rng=None, initial_state=0, stress_probability=None, recovery_probability=None):
+    """
+    Builds the nutrient Markov chain from `config["transition_matrix"]` or the run's stress/recovery
+    probabilities (None falls back to the configured ones).
+    """
+    transition_matrix = config["transition_matrix"]
+    if transition_matrix is None:
+        transition_matrix = default_transition_matrix(
+            len(nutrient_levels),
+            config["stress_probability"] if stress_probability is None else stress_probability,
+            config["recovery_probability"] if recovery_probability is None else recovery_probability,
+        )
+    if len(transition_matrix) != len(nutrient_levels):
+        raise ValueError("transition_matrix must have one row per nutrient level.")
+    return NutrientMarkovChain(transition_matrix, initial_state, rng)
+
+
+def iter_nutrient_codes(num_cycles, nutrient_levels, chunk_size, config, rng=None, initial_state=0,
+                        stress_probability=None, recovery_probability=None):
+    """
+    Yields the nutrient level index of every cycle in chunks of at most `chunk_size` cycles.
+
+    "iid" draws each cycle independently; "markov" runs one level Markov chain from `initial_state`
+    (the richest level by default), each chunk resuming from the last state of the previous one.
+    Without a configured transition matrix the chain uses `stress_probability` and `recovery_probability`.
+    All draws come from `rng`, and the codes do not depend on `chunk_size`.
+    """
+    rng = make_rng(rng)
+    if config["nutrient_process"] == "markov":
+        chain = _nutrient_chain(nutrient_levels, config, rng, initial_state, stress_probability, recovery_probability)
+        yield from chain.iter_chunks(num_cycles, chunk_size)
+    elif config["nutrient_process"] == "iid":
+        # 8-bit draws are buffered within each call, so draw int64 to keep the stream independent of chunk_size
+        for start in range(0, num_cycles, chunk_size):
+            yield rng.integers(len(nutrient_levels), size=min(chunk_size, num_cycles - start)).astype(np.uint8)
+    else:
+        raise ValueError("nutrient_process must be 'iid' or 'markov'.")
+
+
+def _sample_nutrient_codes(num_cycles, nutrient_levels, config, rng=None, stress_probability=None, recovery_probability=None):
+    """
+    Draws the nutrient level index of every cycle according to `config["nutrient_process"]`.
+    """
+    return next(iter_nutrient_codes(num_cycles, nutrient_levels, num_cycles, config, rng,
+                                    stress_probability=stress_probability, recovery_probability=recovery_probability))
+
+
+def initialize_simulation(num_cycles, nutrient_levels, robust_codons=["AAA", "GAT"], sensitive_codons=["CGT", "CTG"], rng=None,
+                          stress_probability=None, recovery_probability=None, config=None):
     
     """
     Initializes the simulation environment and sets up parameters.
@@ -12,6 +90,10 @@ def initialize_simulation(num_cycles, nutrient_levels, robust_codons=["AAA", "GA
         nutrient_levels (list of float): List of possible nutrient availability levels.
         robust_codons (list of str): List of codons with high stability under stress.
         sensitive_codons (list of str): List of codons with low stability under stress.
+        rng (np.random.Generator): Random stream for the nutrient levels (see `utils.make_rng`).
+        stress_probability (float): Drop probability of the "markov" nutrient process; None uses the config.
+        recovery_probability (float): Recovery probability of the "markov" nutrient process; None uses the config.
+        config (SimulationConfig): Run configuration (e.g. a `with_()` variant); None uses `get_config()`.
 
     Returns:
         dict: A dictionary containing:
@@ -23,28 +105,20 @@ def initialize_simulation(num_cycles, nutrient_levels, robust_codons=["AAA", "GA
     Raises:
         ValueError: If input parameters are invalid.
     """
-    config = get_config()
+    config = get_config() if config is None else config
     # Validate inputs
-    if not isinstance(num_cycles, int) or num_cycles <= 0:
-        raise ValueError("num_cycles must be a positive integer.")
-    if not isinstance(nutrient_levels, list) or not all(isinstance(n, (int, float)) for n in nutrient_levels):
-        raise ValueError("nutrient_levels must be a list of numbers.")
-    if not isinstance(robust_codons, list) or not all(isinstance(c, str) for c in robust_codons):
-        raise ValueError("robust_codons must be a list of strings.")
-    if not isinstance(sensitive_codons, list) or not all(isinstance(c, str) for c in sensitive_codons):
-        raise ValueError("sensitive_codons must be a list of strings.")
-
+    _validate_initialization_inputs(num_cycles, nutrient_levels, robust_codons, sensitive_codons)
 
     # Initialize codon efficiency data
-    codon_efficiency = {codon: {"base_efficiency": config["base_efficiency_robust"], "type": "robust"} for codon in robust_codons}
-    codon_efficiency.update({codon: {"base_efficiency": config["base_efficiency_sensitive"], "type": "sensitive"} for codon in sensitive_codons})
+    codon_efficiency = _build_codon_efficiency(robust_codons, sensitive_codons, config)
 
     # Generate efficiency column names dynamically
     efficiency_columns = {f"{codon}_efficiency": [codon_efficiency[codon]["base_efficiency"]] * num_cycles for codon in robust_codons + sensitive_codons}
+    nutrient_codes = _sample_nutrient_codes(num_cycles, nutrient_levels, config, rng, stress_probability, recovery_probability)
     # Create an initial dataframe to track translation efficiency over cycles
     simulation_data = pd.DataFrame({
         "cycle": np.arange(1, num_cycles + 1),
-        "nutrient_levels": np.random.choice(nutrient_levels, size=num_cycles),
+        "nutrient_levels": np.asarray(nutrient_levels, dtype=float)[nutrient_codes],
         **efficiency_columns,  # Dynamically add efficiency columns
     })
     return {
@@ -55,6 +129,49 @@ def initialize_simulation(num_cycles, nutrient_levels, robust_codons=["AAA", "GA
         "codon_efficiency": codon_efficiency
     }
 
+def initialize_state(num_cycles, nutrient_levels, robust_codons=["AAA", "GAT"], sensitive_codons=["CGT", "CTG"], rng=None,
+                     directory=None, stress_probability=None, recovery_probability=None, config=None):
+    """
+    Initializes an array-backed simulation state instead of a wide DataFrame.
+
+    Parameters:
+        num_cycles (int): Number of translation cycles to simulate.
+        nutrient_levels (list of float): List of possible nutrient availability levels.
+        robust_codons (list of str): List of codons with high stability under stress.
+        sensitive_codons (list of str): List of codons with low stability under stress.
+        rng (np.random.Generator): Random stream for the nutrient levels (see `utils.make_rng`).
+        directory (str): If given, back the state with memory-mapped files in this directory and
+            draw the nutrient levels in `config["chunk_size"]` chunks, so it may exceed RAM.
+        stress_probability (float): Drop probability of the "markov" nutrient process; None uses the config.
+        recovery_probability (float): Recovery probability of the "markov" nutrient process; None uses the config.
+        config (SimulationConfig): Run configuration (e.g. a `with_()` variant); None uses `get_config()`.
+
+    Returns:
+        SimulationState: State with uint8 nutrient level codes and base efficiencies for every codon.
+
+    Raises:
+        ValueError: If input parameters are invalid.
+    """
+    config = get_config() if config is None else config
+    _validate_initialization_inputs(num_cycles, nutrient_levels, robust_codons, sensitive_codons)
+    if not nutrient_levels:
+        raise ValueError("nutrient_levels must be a list of numbers.")
+
+    codon_efficiency = _build_codon_efficiency(robust_codons, sensitive_codons, config)
+    if directory is not None:
+        state = SimulationState.create(directory, num_cycles, nutrient_levels, codon_efficiency,
+                                       chunk_size=config["chunk_size"])
+        start = 0
+        for codes in iter_nutrient_codes(num_cycles, nutrient_levels, config["chunk_size"], config, rng,
+                                         stress_probability=stress_probability, recovery_probability=recovery_probability):
+            state.nutrient_codes[start:start + len(codes)] = codes
+            start += len(codes)
+        return state
+
+    nutrient_codes = _sample_nutrient_codes(num_cycles, nutrient_levels, config, rng, stress_probability, recovery_probability)
+    return SimulationState.allocate(nutrient_codes, nutrient_levels, codon_efficiency)
+
+
 if __name__ == "__main__":
     # Example inputs
     num_cycles = 1000
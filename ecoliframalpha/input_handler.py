@@ -1,9 +1,61 @@
 import sys
+import ast
 import json
 import csv
 from config.config import get_config
 
-def get_user_inputs():
+# Parameters read per run by `get_user_inputs`; the configuration only supplies their defaults
+USER_INPUT_KEYS = ("num_cycles", "nutrient_levels", "robust_codons", "sensitive_codons",
+                   "stress_probability", "recovery_probability")
+
+
+def _parse_config_value(value, current):
+    """
+    Converts a command-line string to the type of a configuration value ("none", "true" and "false" are
+    keywords; lists are given comma-separated or as Python literals).
+    """
+    keywords = {"none": None, "true": True, "false": False}
+    if value.lower() in keywords:
+        return keywords[value.lower()]
+    if isinstance(current, list) and not value.startswith("["):
+        return [_parse_config_value(item.strip(), None) for item in value.split(",")]
+    try:
+        return ast.literal_eval(value)
+    except (ValueError, SyntaxError):
+        return value
+
+
+def get_run_config(args=None, config=None, exclude=()):
+    """
+    Builds the configuration of a run from `--key value` command-line arguments naming configuration
+    parameters (e.g. `--pipeline_mode fused --seed 3 --rna_decay_mode stochastic`).
+
+    The per-run inputs of `get_user_inputs` and any `exclude`d names are left to their own parsers.
+
+    Parameters:
+        args (list of str): Command-line arguments without the script name; defaults to `sys.argv[1:]`.
+        config (SimulationConfig): Configuration to start from; None uses `get_config()`.
+        exclude (iterable of str): Further argument names that are not configuration overrides.
+
+    Returns:
+        SimulationConfig: A `with_()` variant holding the overrides, to be passed to every stage.
+
+    Raises:
+        ValueError: If an overridden value is invalid.
+    """
+    config = get_config() if config is None else config
+    args = sys.argv[1:] if args is None else args
+
+    overrides = {}
+    for i in range(len(args)):
+        if args[i].startswith("--") and i + 1 < len(args) and not args[i + 1].startswith("--"):
+            key = args[i][2:]
+            if key in config and key not in USER_INPUT_KEYS and key not in exclude:
+                overrides[key] = _parse_config_value(args[i + 1], config[key])
+    return config.with_(**overrides) if overrides else config
+
+
+def get_user_inputs(config=None):
     """
     Fetches user-defined simulation parameters from:
     1. **Command-line arguments (`sys.argv`)**: Parses `--key value` pairs.
@@ -19,10 +71,13 @@ def get_user_inputs():
     - `stress_probability` (float)
     - `recovery_probability` (float)
 
+    Parameters:
+        config (SimulationConfig): Run configuration supplying the defaults; None uses `get_config()`.
+
     Returns:
         dict: A dictionary containing all simulation parameters.
     """
-    config = get_config()
+    config = get_config() if config is None else config
     
     args = sys.argv[1:]  # Skip script name
     args_dict = {}
@@ -83,4 +138,31 @@ def get_user_inputs():
         "sensitive_codons": sensitive_codons,
         "stress_probability": stress_probability,
         "recovery_probability": recovery_probability,
-    }
\ No newline at end of file
+    }
+def get_run_options(args=None, config=None):
+    """
+    Fetches run options that control how results are produced rather than what is simulated:
+    - `--output_format` (str): Table format for results ("csv", "parquet", "feather", "npz" or "npy").
+    - `--resume`: Continue from the last checkpoint.
+    - `--no-plots`: Run headless, without importing or drawing any plots.
+
+    Parameters:
+        args (list of str): Command-line arguments without the script name; defaults to `sys.argv[1:]`.
+        config (SimulationConfig): Run configuration supplying the defaults; None uses `get_config()`.
+
+    Returns:
+        dict: A dictionary containing "output_format", "resume" and "plots".
+    """
+    config = get_config() if config is None else config
+    args = sys.argv[1:] if args is None else args
+
+    args_dict = {}
+    for i in range(len(args)):
+        if args[i].startswith("--") and i + 1 < len(args) and not args[i + 1].startswith("--"):
+            args_dict[args[i][2:]] = args[i + 1]
+
+    return {
+        "output_format": args_dict.get("output_format", config["output_format"]),
+        "resume": "--resume" in args,
+        "plots": config["generate_plots"] and "--no-plots" not in args,
+    }
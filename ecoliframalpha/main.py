@@ -1,15 +1,18 @@
-import numpy as np
+import os
 import pandas as pd
-from input_handler import get_user_inputs
-from initialization import initialize_simulation
+from input_handler import get_user_inputs, get_run_options, get_run_config
+from initialization import initialize_simulation, initialize_state
 from translation_dynamics import simulate_translation
 from nutrient_stress import apply_nutrient_stress
-from rna_processing import process_rna
-from codon_variability import analyze_variability
+from rna_processing import process_rna, process_rna_stochastic
+from fused_pipeline import run_fused_pipeline
+from streaming import run_streaming
+from stage_cache import StageCache, run_stage
+from codon_variability import analyze_variability, fit_codon_glms
 from validation import validate_simulation
-from visualization import generate_visualizations
-from utils import ensure_output_directory, save_to_csv, save_to_json, generate_summary, save_summary_to_file
-from config.config import get_config
+from experimental_data import load_experimental_data
+from simulation_state import SimulationState, is_simulation_state
+from utils import ensure_output_directory, save_table, save_to_json, generate_summary, save_summary_to_file, spawn_rngs
 
 
 #Set default configuration
@@ -18,11 +21,14 @@ from config.config import get_config
 
 def main():
 
-    config = get_config()
+    # Configuration parameters given on the command line (e.g. --pipeline_mode fused) override the defaults;
+    # this configuration is passed to every stage
+    config = get_run_config()
 
 
     # Step 1: Fetch user inputs
-    user_inputs = get_user_inputs()
+    user_inputs = get_user_inputs(config)
+    run_options = get_run_options(config=config)
     if config["robust_codons"] not in config["possible_codons"] and config["sensitive_codons"] not in config["possible_codons"]:
         print("Codons in input do not exist.")
 
@@ -30,53 +36,202 @@ def main():
     ensure_output_directory(config["output_path"])
     if config["input_path"]: ensure_output_directory(config["input_path"]) 
 
-    # Step 3: Initialize the simulation environment
-    print("Initializing simulation...")
-    simulation_data = initialize_simulation(
-        num_cycles=user_inputs["num_cycles"],
-        nutrient_levels=user_inputs["nutrient_levels"],
-        robust_codons=user_inputs["robust_codons"],
-        sensitive_codons=user_inputs["sensitive_codons"],
-    )
-
-    # Step 4: Simulate translation dynamics
-    print("Simulating translation dynamics...")
-    translation_results = simulate_translation(simulation_data)
-    
-    # Step 5: Apply nutrient stress effects
-    print("Applying nutrient stress...")
-    stressed_results = apply_nutrient_stress(
-        translation_results,
-        nutrient_levels=user_inputs["nutrient_levels"],
-        stress_probability=user_inputs["stress_probability"],
-        recovery_probability=user_inputs["recovery_probability"],
-    )
-    # Step 6: Process RNA stability and decay
-    print("Processing RNA stability and decay...")
-    rna_results = process_rna(stressed_results, simulation_data["codon_efficiency"], config["rnase_activity"], config["decay_variability"])
-    
-    # Step 7: Analyze codon variability
-    print("Analyzing codon variability...")
-    variability_results = analyze_variability(rna_results, metrics=config["metrics"])
-    # Save variability results to CSV
-    save_to_csv(variability_results, "variability_metrics.csv", config["output_path"])
+    # One independent random stream per stochastic stage, all spawned from the root seed
+    initialization_rng, stress_rng, rna_rng, experimental_rng, validation_rng, model_rng = spawn_rngs(config["seed"], 6)
+
+    if config["pipeline_mode"] == "streaming":
+        # Steps 3-7: Stream fixed-size chunks through the fused pass into running variability accumulators
+        print("Streaming simulation chunks...")
+        streaming_results = run_streaming(
+            num_cycles=user_inputs["num_cycles"],
+            nutrient_levels=user_inputs["nutrient_levels"],
+            robust_codons=user_inputs["robust_codons"],
+            sensitive_codons=user_inputs["sensitive_codons"],
+            stress_probability=user_inputs["stress_probability"],
+            recovery_probability=user_inputs["recovery_probability"],
+            rnase_activity=config["rnase_activity"],
+            decay_variability=config["decay_variability"],
+            metrics=config["metrics"],
+            chunk_size=config["chunk_size"],
+            translate_after_stress=config["translate_after_stress"],
+            nutrient_rng=initialization_rng,
+            stress_rng=stress_rng,
+            checkpoint_path=os.path.join(config["output_path"], "streaming_checkpoint.pkl"),
+            checkpoint_interval=config["checkpoint_interval"],
+            resume=run_options["resume"],
+            config=config,
+        )
+        variability_results = streaming_results["variability_results"]
+        # Trajectory plots are drawn from the binned summary of the whole run
+        stressed_results = streaming_results["plot_summary"]
+    elif config["pipeline_mode"] == "fused":
+        # Steps 3-6: Initialize, then stress, translate and decay in one pass over the state buffers
+        # A memory-mapped state lives in the output directory and is processed chunk by chunk
+        state_directory = os.path.join(config["output_path"], "trajectory_state") if config["memmap_trajectory"] else None
+        print("Initializing simulation...")
+        state = initialize_state(
+            num_cycles=user_inputs["num_cycles"],
+            nutrient_levels=user_inputs["nutrient_levels"],
+            robust_codons=user_inputs["robust_codons"],
+            sensitive_codons=user_inputs["sensitive_codons"],
+            rng=initialization_rng,
+            directory=state_directory,
+            stress_probability=user_inputs["stress_probability"],
+            recovery_probability=user_inputs["recovery_probability"],
+            config=config,
+        )
+        print("Running fused stress, translation and RNA decay...")
+        rna_results = run_fused_pipeline(
+            state,
+            stress_probability=user_inputs["stress_probability"],
+            recovery_probability=user_inputs["recovery_probability"],
+            rnase_activity=config["rnase_activity"],
+            decay_variability=config["decay_variability"],
+            translate_after_stress=config["translate_after_stress"],
+            rng=stress_rng,
+            chunk_size=config["chunk_size"] if state_directory else None,
+            config=config,
+        )
+        if state_directory:
+            rna_results.flush()
+        stressed_results = rna_results  # Summarized chunk by chunk for plotting
+    else:
+        # Stage outputs are reused from the cache only when the run is seeded, so results stay reproducible
+        cache = None
+        if config["cache_dir"] and config["seed"] is not None:
+            cache = StageCache(config["cache_dir"], config["cache_max_bytes"])
+
+        # Steps 3-4: Initialize the simulation environment and simulate translation dynamics
+        def initialize_and_translate():
+            print("Initializing simulation...")
+            simulation_data = initialize_simulation(
+                num_cycles=user_inputs["num_cycles"],
+                nutrient_levels=user_inputs["nutrient_levels"],
+                robust_codons=user_inputs["robust_codons"],
+                sensitive_codons=user_inputs["sensitive_codons"],
+                rng=initialization_rng,
+                stress_probability=user_inputs["stress_probability"],
+                recovery_probability=user_inputs["recovery_probability"],
+                config=config,
+            )
+            print("Simulating translation dynamics...")
+            return {"codon_efficiency": simulation_data["codon_efficiency"],
+                    "translation_results": simulate_translation(simulation_data, config)}
+
+        translation_parameters = {name: user_inputs[name] for name in (
+            "num_cycles", "nutrient_levels", "robust_codons", "sensitive_codons",
+            "stress_probability", "recovery_probability",  # Default Markov transition matrix
+        )}
+        translation_parameters.update({name: config[name] for name in (
+            "base_efficiency_robust", "base_efficiency_sensitive", "nutrient_process", "transition_matrix",
+            "max_efficiency", "min_efficiency", "hill_coefficient", "nutrient_threshold", "seed",
+        )})
+        translation_stage, translation_key = run_stage(cache, "translation", translation_parameters, initialize_and_translate)
+        codon_efficiency = translation_stage["codon_efficiency"]
+
+        # Step 5: Apply nutrient stress effects
+        def stress():
+            print("Applying nutrient stress...")
+            return apply_nutrient_stress(
+                translation_stage["translation_results"],
+                nutrient_levels=user_inputs["nutrient_levels"],
+                stress_probability=user_inputs["stress_probability"],
+                recovery_probability=user_inputs["recovery_probability"],
+                rng=stress_rng,
+            )
+
+        stressed_results, stress_key = run_stage(cache, "stress", {
+            "stress_probability": user_inputs["stress_probability"],
+            "recovery_probability": user_inputs["recovery_probability"],
+            "seed": config["seed"],
+        }, stress, translation_key)
+
+        # Step 6: Process RNA stability and decay
+        def decay():
+            print("Processing RNA stability and decay...")
+            if config["rna_decay_mode"] == "stochastic":
+                return process_rna_stochastic(stressed_results, codon_efficiency, config["rnase_activity"], config["decay_variability"],
+                                              initial_copies=config["initial_mrna_copies"], ssa_threshold=config["ssa_threshold"], rng=rna_rng)
+            return process_rna(stressed_results, codon_efficiency, config["rnase_activity"], config["decay_variability"])
+
+        rna_results, rna_key = run_stage(cache, "rna", {name: config[name] for name in (
+            "rnase_activity", "decay_variability", "rna_decay_mode", "initial_mrna_copies", "ssa_threshold", "seed",
+        )}, decay, stress_key)
+
+        # Step 7: Analyze codon variability
+        def analyze():
+            print("Analyzing codon variability...")
+            return analyze_variability(rna_results, metrics=config["metrics"])
+
+        variability_results, _ = run_stage(cache, "variability", {"metrics": config["metrics"]}, analyze, rna_key)
+
+    if config["pipeline_mode"] == "fused":
+        # Step 7: Analyze codon variability
+        print("Analyzing codon variability...")
+        variability_results = analyze_variability(rna_results, metrics=config["metrics"], chunk_size=config["chunk_size"])
+    # Per-codon GLM coefficients are saved next to the variability metrics
+    variability_table = variability_results
+    if config["fit_glm"]:
+        if config["pipeline_mode"] == "streaming":
+            print("Skipping GLM fits: streaming runs do not keep the trajectory.")
+        else:
+            print("Fitting per-codon GLMs...")
+            glm_results = fit_codon_glms(
+                rna_results, family=config["glm_family"], chunk_size=config["chunk_size"],
+                codon_efficiency=None if is_simulation_state(rna_results) else codon_efficiency,
+            )
+            variability_table = variability_results.merge(glm_results, on="codon", how="left")
+    # Save variability results (and optionally the trajectory) in the selected table format
+    save_table(variability_table, "variability_metrics", config["output_path"], run_options["output_format"])
+    if config["save_trajectory"] and config["pipeline_mode"] != "streaming" and not config["memmap_trajectory"]:
+        trajectory = rna_results if isinstance(rna_results, pd.DataFrame) else rna_results.to_dataframe()
+        save_table(trajectory, "trajectory", config["output_path"], run_options["output_format"])
+
+    # Optional Bayesian hierarchical model of efficiency on nutrient level, codons nested in categories
+    if config["hierarchical_model"]:
+        if config["pipeline_mode"] == "streaming":
+            print("Skipping hierarchical model: streaming runs do not keep the trajectory.")
+        else:
+            from hierarchical_model import fit_hierarchical_model
+
+            print("Fitting hierarchical model...")
+            model_state = rna_results if is_simulation_state(rna_results) else SimulationState.from_dataframe(
+                rna_results, codon_efficiency, user_inputs["nutrient_levels"])
+            model = fit_hierarchical_model(
+                model_state, num_chains=config["hierarchical_chains"], num_samples=config["hierarchical_samples"],
+                warmup=config["hierarchical_warmup"], rng=model_rng, max_workers=config["max_workers"],
+                chunk_size=config["chunk_size"],
+            )
+            save_table(model["codon_summary"], "hierarchical_codon_summary", config["output_path"], run_options["output_format"])
+            save_table(model["category_summary"], "hierarchical_category_summary", config["output_path"], run_options["output_format"])
 
     # Step 8: Validate simulation outputs
     print("Validating simulation outputs...")
-    experimental_data = pd.DataFrame({
-        "codon": user_inputs["robust_codons"] + user_inputs["sensitive_codons"],
-        "variance": np.random.uniform(0.002, 0.01, len(user_inputs["robust_codons"] + user_inputs["sensitive_codons"])),
-        "Fano_factor": np.random.uniform(0.2, 1.0, len(user_inputs["robust_codons"] + user_inputs["sensitive_codons"])),
-        "CV": np.random.uniform(0.05, 0.15, len(user_inputs["robust_codons"] + user_inputs["sensitive_codons"])),
-        "CRI": np.random.uniform(1.0, 5.0, len(user_inputs["robust_codons"] + user_inputs["sensitive_codons"])),
-    })
-    validation_results = validate_simulation(variability_results, experimental_data, config["metrics"])
+    if config["experimental_data_path"]:
+        # Benchmarks are matched to the simulated codons by codon, not by row order
+        experimental_data = load_experimental_data(config["experimental_data_path"])
+    else:
+        experimental_data = pd.DataFrame({
+            "codon": user_inputs["robust_codons"] + user_inputs["sensitive_codons"],
+            "variance": experimental_rng.uniform(0.002, 0.01, len(user_inputs["robust_codons"] + user_inputs["sensitive_codons"])),
+            "Fano_factor": experimental_rng.uniform(0.2, 1.0, len(user_inputs["robust_codons"] + user_inputs["sensitive_codons"])),
+            "CV": experimental_rng.uniform(0.05, 0.15, len(user_inputs["robust_codons"] + user_inputs["sensitive_codons"])),
+            "CRI": experimental_rng.uniform(1.0, 5.0, len(user_inputs["robust_codons"] + user_inputs["sensitive_codons"])),
+        })
+    validation_results = validate_simulation(variability_results, experimental_data, config["metrics"],
+                                             n_bootstrap=config["n_bootstrap"], n_permutations=config["n_permutations"],
+                                             confidence_level=config["confidence_level"], rng=validation_rng,
+                                             condition=config["experimental_condition"])
     # Save validation results to JSON
     save_to_json(validation_results, "validation_results.json", config["output_path"])
 
-    # Step 9: Generate visualizations
-    print("Generating visualizations...")
-    generate_visualizations(variability_results, stressed_results, validation_results, config["output_path"])
+    # Step 9: Generate visualizations (plotting libraries are only imported when needed)
+    if run_options["plots"]:
+        from visualization import generate_visualizations
+
+        print("Generating visualizations...")
+        generate_visualizations(variability_results, stressed_results, validation_results, config["output_path"],
+                                config=config)
     
     # Step 10: Generate and save simulation summary
     print("Generating simulation summary...")
@@ -1,7 +1,213 @@
 import numpy as np
 import pandas as pd
+from utils import encode_nutrient_levels, make_rng
 
-def apply_nutrient_stress(translation_results, nutrient_levels, stress_probability=0.1, recovery_probability=0.05):
+def stress_level_codes(level_codes, num_levels, stress_probability=0.1, recovery_probability=0.05, rng=None):
+    """
+    Applies one stress/recovery step to integer nutrient level indices of any shape.
+
+    Each entry drops one level with `stress_probability`; otherwise it recovers one level with
+    `recovery_probability`. Entries already at the last (or first) level stay where they are.
+    Both events are decided from one uniform draw per entry, so stressing an array in consecutive
+    pieces consumes the stream exactly as stressing it whole.
+
+    Parameters:
+        level_codes (np.ndarray): Nutrient level indices (0 is the richest level).
+        num_levels (int): Number of possible nutrient levels.
+        stress_probability (float): Probability of a nutrient drop at each cycle (0 ≤ p ≤ 1).
+        recovery_probability (float): Probability of nutrient recovery at each cycle (0 ≤ p ≤ 1).
+        rng (np.random.Generator): Random stream for the stress events (see `utils.make_rng`).
+
+    Returns:
+        np.ndarray: New level indices with the same shape and dtype as `level_codes`.
+    """
+    rng = make_rng(rng)
+    level_codes = np.asarray(level_codes)
+    uniforms = rng.random(level_codes.shape)
+    drop = uniforms < stress_probability
+    recover = ~drop & (uniforms < stress_probability + (1 - stress_probability) * recovery_probability)
+
+    shift = drop.astype(np.int8) - recover.astype(np.int8)
+    shifted = level_codes.astype(np.int64) + shift
+    return np.clip(shifted, 0, num_levels - 1).astype(level_codes.dtype)
+
+
+def default_transition_matrix(num_levels, stress_probability=0.1, recovery_probability=0.05):
+    """
+    Builds the level-to-level transition matrix implied by the stress/recovery step.
+
+    From level i the chain drops to i + 1 with `stress_probability`, otherwise recovers to i - 1
+    with `recovery_probability`, and stays put in every other case (including at the list ends).
+
+    Parameters:
+        num_levels (int): Number of possible nutrient levels.
+        stress_probability (float): Probability of a nutrient drop at each cycle (0 ≤ p ≤ 1).
+        recovery_probability (float): Probability of nutrient recovery at each cycle (0 ≤ p ≤ 1).
+
+    Returns:
+        np.ndarray: Row-stochastic (num_levels, num_levels) matrix.
+    """
+    if not isinstance(num_levels, int) or num_levels <= 0:
+        raise ValueError("num_levels must be a positive integer.")
+    if not (0 <= stress_probability <= 1):
+        raise ValueError("stress_probability must be between 0 and 1.")
+    if not (0 <= recovery_probability <= 1):
+        raise ValueError("recovery_probability must be between 0 and 1.")
+
+    levels = np.arange(num_levels)
+    matrix = np.zeros((num_levels, num_levels))
+    matrix[levels[:-1], levels[:-1] + 1] = stress_probability
+    matrix[levels[1:], levels[1:] - 1] = (1 - stress_probability) * recovery_probability
+    matrix[levels, levels] = 1 - matrix.sum(axis=1)
+    return matrix
+
+
+def validate_transition_matrix(transition_matrix):
+    """
+    Checks that a transition matrix is square, non-negative and row-stochastic.
+
+    Returns:
+        np.ndarray: The matrix as a float array.
+
+    Raises:
+        ValueError: If the matrix is not a valid transition matrix.
+    """
+    matrix = np.asarray(transition_matrix, dtype=float)
+    if matrix.ndim != 2 or matrix.shape[0] != matrix.shape[1] or matrix.shape[0] == 0:
+        raise ValueError("transition_matrix must be a non-empty square matrix.")
+    if matrix.shape[0] > np.iinfo(np.uint8).max + 1:
+        raise ValueError("transition_matrix supports at most 256 nutrient levels.")
+    if (matrix < 0).any():
+        raise ValueError("transition_matrix must not contain negative probabilities.")
+    if not np.allclose(matrix.sum(axis=1), 1.0):
+        raise ValueError("Each row of transition_matrix must sum to 1.")
+    return matrix
+
+
+def build_alias_tables(transition_matrix):
+    """
+    Builds Walker/Vose alias tables for every row of a transition matrix.
+
+    Returns:
+        tuple: (probability, alias) arrays of shape (levels, levels); a uniform column k of row i is
+            kept with `probability[i, k]` and otherwise replaced by `alias[i, k]`.
+    """
+    matrix = validate_transition_matrix(transition_matrix)
+    num_levels = matrix.shape[0]
+    probability = np.ones((num_levels, num_levels))
+    alias = np.tile(np.arange(num_levels), (num_levels, 1))
+
+    for row in range(num_levels):
+        scaled = matrix[row] * num_levels / matrix[row].sum()
+        small = [column for column in range(num_levels) if scaled[column] < 1.0]
+        large = [column for column in range(num_levels) if scaled[column] >= 1.0]
+        while small and large:
+            less, more = small.pop(), large.pop()
+            probability[row, less] = scaled[less]
+            alias[row, less] = more
+            scaled[more] -= 1.0 - scaled[less]
+            (small if scaled[more] < 1.0 else large).append(more)
+        # Whatever remains is numerically 1
+        for column in small + large:
+            probability[row, column] = 1.0
+    return probability, alias
+
+
+def sample_chain_codes(probability, alias, uniforms, initial_state):
+    """
+    Advances a Markov chain through one uniform draw per step using alias tables.
+
+    The sequential recursion is evaluated in blocks: every block's state-to-state map is computed
+    for all start levels at once, the blocks are chained together, and each block is then replayed
+    from its true start level. This gives exactly the sequential result with O(sqrt(n)) Python steps.
+
+    Parameters:
+        probability (np.ndarray): Alias acceptance probabilities from `build_alias_tables`.
+        alias (np.ndarray): Alias targets from `build_alias_tables`.
+        uniforms (np.ndarray): One U(0, 1) draw per step.
+        initial_state (int): Level index before the first step.
+
+    Returns:
+        np.ndarray: uint8 level index after each step.
+    """
+    num_levels = probability.shape[0]
+    num_steps = len(uniforms)
+    if num_steps == 0:
+        return np.empty(0, dtype=np.uint8)
+
+    # Pad to a square-ish grid of blocks; padded steps are dropped at the end
+    block_length = int(np.ceil(np.sqrt(num_steps)))
+    num_blocks = int(np.ceil(num_steps / block_length))
+    padded = np.zeros(num_blocks * block_length)
+    padded[:num_steps] = uniforms
+    scaled = padded.reshape(num_blocks, block_length) * num_levels
+    columns = np.minimum(scaled.astype(np.intp), num_levels - 1)
+    fractions = scaled - columns
+
+    def step(states, column, fraction):
+        return np.where(fraction < probability[states, column], column, alias[states, column])
+
+    # Map every possible start level through each block
+    block_maps = np.broadcast_to(np.arange(num_levels), (num_blocks, num_levels))
+    for t in range(block_length):
+        block_maps = step(block_maps, columns[:, t, None], fractions[:, t, None])
+
+    # Chain the blocks to find each block's true start level
+    block_starts = np.empty(num_blocks, dtype=np.intp)
+    state = int(initial_state)
+    for block in range(num_blocks):
+        block_starts[block] = state
+        state = block_maps[block, state]
+
+    # Replay every block from its start level
+    codes = np.empty((num_blocks, block_length), dtype=np.uint8)
+    states = block_starts
+    for t in range(block_length):
+        states = step(states, columns[:, t], fractions[:, t])
+        codes[:, t] = states
+    return codes.ravel()[:num_steps]
+
+
+class NutrientMarkovChain:
+    """
+    Stateful nutrient-level Markov chain that can be sampled in resumable chunks.
+
+    Attributes:
+        transition_matrix (np.ndarray): Row-stochastic (levels, levels) transition matrix.
+        state (int): Current level index; each call to `sample` continues from it.
+        rng (np.random.Generator): Random stream driving the chain.
+    """
+
+    def __init__(self, transition_matrix, initial_state=0, rng=None):
+        self.transition_matrix = validate_transition_matrix(transition_matrix)
+        if not (0 <= initial_state < self.transition_matrix.shape[0]):
+            raise ValueError("initial_state must index a nutrient level.")
+        self.state = int(initial_state)
+        self.rng = make_rng(rng)
+        self._probability, self._alias = build_alias_tables(self.transition_matrix)
+
+    def sample(self, num_cycles):
+        """
+        Samples the next `num_cycles` level indices and advances the chain.
+
+        Returns:
+            np.ndarray: uint8 level index of every cycle.
+        """
+        codes = sample_chain_codes(self._probability, self._alias, self.rng.random(num_cycles), self.state)
+        if len(codes):
+            self.state = int(codes[-1])
+        return codes
+
+    def iter_chunks(self, num_cycles, chunk_size=1_000_000):
+        """
+        Yields the next `num_cycles` level indices in chunks of at most `chunk_size` cycles.
+        """
+        for start in range(0, num_cycles, chunk_size):
+            yield self.sample(min(chunk_size, num_cycles - start))
+
+
+def apply_nutrient_stress(translation_results, nutrient_levels, stress_probability=0.1, recovery_probability=0.05,
+                          rng=None):
     """
     Simulates nutrient stress fluctuations and updates the translation results.
 
@@ -10,6 +216,7 @@ def apply_nutrient_stress(translation_results, nutrient_levels, stress_probabili
         nutrient_levels (list): List of possible nutrient levels (e.g., [1.0, 0.75, 0.5, 0.25, 0.1]).
         stress_probability (float): Probability of a nutrient drop at each cycle (0 ≤ p ≤ 1).
         recovery_probability (float): Probability of nutrient recovery at each cycle (0 ≤ p ≤ 1).
+        rng (np.random.Generator): Random stream for the stress events (see `utils.make_rng`).
 
     Returns:
         pd.DataFrame: Updated DataFrame with fluctuating nutrient levels.
@@ -27,23 +234,46 @@ def apply_nutrient_stress(translation_results, nutrient_levels, stress_probabili
     if translation_results.empty:
         return translation_results  # Return unchanged if DataFrame is empty
 
+    # Encode every cycle as an index into the level list
+    values = translation_results["nutrient_levels"].to_numpy(dtype=float)
+    level_codes = encode_nutrient_levels(values, nutrient_levels)
+    unknown = level_codes < 0
+    if unknown.any():
+        raise ValueError(f"{values[unknown][0]} is not in nutrient_levels.")
+
+    # Draw all stress/recovery events at once and shift the level indices
+    stressed_codes = stress_level_codes(level_codes, len(nutrient_levels), stress_probability, recovery_probability, rng)
+
     # Copy to prevent modifying input DataFrame
     updated_results = translation_results.copy()
+    updated_results["nutrient_levels"] = np.asarray(nutrient_levels, dtype=float)[stressed_codes]
 
-    # Iterate over each cycle in the simulation
-    for index, val in enumerate(updated_results["nutrient_levels"]):  # Ensure correct column name
-        val = float(val)  # Ensure `val` is a float to avoid lookup issues
-        current_index = nutrient_levels.index(val)
+    return updated_results
 
-        if np.random.rand() < stress_probability:
-            if current_index < len(nutrient_levels)-1:
-                updated_results.loc[index, "nutrient_levels"] = nutrient_levels[current_index + 1]
-        elif np.random.rand() < recovery_probability:
-            if current_index > 0:
-                updated_results.loc[index, "nutrient_levels"] = nutrient_levels[current_index - 1]
 
+def stress_state(state, stress_probability=0.1, recovery_probability=0.05, rng=None):
+    """
+    Applies nutrient stress in place to the level codes of an array-backed simulation state.
 
-    return updated_results
+    Parameters:
+        state (SimulationState): State whose `nutrient_codes` are updated.
+        stress_probability (float): Probability of a nutrient drop at each cycle (0 ≤ p ≤ 1).
+        recovery_probability (float): Probability of nutrient recovery at each cycle (0 ≤ p ≤ 1).
+        rng (np.random.Generator): Random stream for the stress events (see `utils.make_rng`).
+
+    Returns:
+        SimulationState: The same state with stressed nutrient levels.
+    """
+    if not (0 <= stress_probability <= 1):
+        raise ValueError("stress_probability must be between 0 and 1.")
+
+    if not (0 <= recovery_probability <= 1):
+        raise ValueError("recovery_probability must be between 0 and 1.")
+
+    state.nutrient_codes[:] = stress_level_codes(
+        state.nutrient_codes, len(state.nutrient_levels), stress_probability, recovery_probability, rng
+    )
+    return state
 
 
 if __name__ == "__main__":
@@ -0,0 +1,201 @@
+import numpy as np
+import pandas as pd
+from config.config import get_config
+
+
+class PlotSummary:
+    """
+    Fixed-size plot data folded from simulation chunks, so figures never need the full trajectory.
+
+    Cycles are grouped into at most `num_bins` equal buckets holding the min, sum and max of the nutrient
+    level and of every codon efficiency. Nutrient level occupancy and per-codon efficiency histograms are
+    counted alongside. Memory use is O(num_bins * codons) whatever the number of cycles.
+
+    Attributes:
+        num_cycles (int): Total number of cycles the summary covers.
+        codons (list of str): Codon of each efficiency column.
+        nutrient_levels (np.ndarray): Nutrient level of each level code.
+        bucket_size (int): Cycles per bucket.
+        series (list of str): "nutrient_levels" followed by one "<codon>_efficiency" series per codon.
+        minimum, total, maximum (np.ndarray): (buckets, series) bucket statistics.
+        count (np.ndarray): (buckets, series) number of non-NaN values per bucket.
+        level_counts (np.ndarray): Number of cycles spent at each nutrient level.
+        histogram_edges (np.ndarray): Edges of the efficiency histogram bins.
+        histograms (np.ndarray): (codons, histogram bins) efficiency counts; values outside the edges
+            are counted in the first or last bin.
+    """
+
+    def __init__(self, num_cycles, codons, nutrient_levels, num_bins=1000, histogram_bins=50, efficiency_range=(0.0, 1.5)):
+        if not isinstance(num_cycles, int) or num_cycles <= 0:
+            raise ValueError("num_cycles must be a positive integer.")
+        if not isinstance(num_bins, int) or num_bins <= 0:
+            raise ValueError("num_bins must be a positive integer.")
+        if not isinstance(histogram_bins, int) or histogram_bins <= 0:
+            raise ValueError("histogram_bins must be a positive integer.")
+        if efficiency_range[0] >= efficiency_range[1]:
+            raise ValueError("efficiency_range must be an increasing (low, high) pair.")
+
+        self.num_cycles = num_cycles
+        self.codons = list(codons)
+        self.nutrient_levels = np.asarray(nutrient_levels, dtype=float)
+        self.bucket_size = -(-num_cycles // num_bins)
+        num_buckets = -(-num_cycles // self.bucket_size)
+        self.series = ["nutrient_levels"] + [f"{codon}_efficiency" for codon in self.codons]
+
+        shape = (num_buckets, len(self.series))
+        self.minimum = np.full(shape, np.inf)
+        self.total = np.zeros(shape)
+        self.maximum = np.full(shape, -np.inf)
+        self.count = np.zeros(shape, dtype=np.int64)
+        self.level_counts = np.zeros(len(self.nutrient_levels), dtype=np.int64)
+        self.histogram_edges = np.linspace(efficiency_range[0], efficiency_range[1], histogram_bins + 1)
+        self.histograms = np.zeros((len(self.codons), histogram_bins), dtype=np.int64)
+
+    @classmethod
+    def for_state(cls, state, num_cycles=None, num_bins=None, histogram_bins=None, config=None):
+        """
+        Creates an empty summary matching the codons and nutrient levels of a state.
+
+        Parameters:
+            state (SimulationState): State (or chunk) whose codons and levels are summarized.
+            num_cycles (int): Cycles covered; None uses `state.num_cycles`.
+            num_bins (int): Number of cycle buckets; None uses `config["plot_bins"]`.
+            histogram_bins (int): Bins per efficiency histogram; None uses `config["histogram_bins"]`.
+            config (SimulationConfig): Run configuration (e.g. a `with_()` variant); None uses `get_config()`.
+
+        Returns:
+            PlotSummary: Summary whose histograms span zero to the highest reachable efficiency.
+        """
+        config = get_config() if config is None else config
+        highest = config["max_efficiency"] * max(state.registry["base_efficiency"].max(initial=0.0), 1.0)
+        return cls(num_cycles or state.num_cycles, state.codons, state.nutrient_levels,
+                   num_bins or config["plot_bins"], histogram_bins or config["histogram_bins"], (0.0, highest))
+
+    @classmethod
+    def from_state(cls, state, chunk_size=None, num_bins=None, histogram_bins=None, config=None):
+        """
+        Summarizes a whole state, reading it `chunk_size` cycles at a time.
+        """
+        config = get_config() if config is None else config
+        summary = cls.for_state(state, num_bins=num_bins, histogram_bins=histogram_bins, config=config)
+        chunk_size = chunk_size or config["chunk_size"]
+        for start, chunk in zip(range(0, state.num_cycles, chunk_size), state.iter_chunks(chunk_size)):
+            summary.update(chunk, start)
+        return summary
+
+    def update(self, state, start):
+        """
+        Folds a chunk of consecutive cycles into the summary.
+
+        Parameters:
+            state (SimulationState): Chunk holding nutrient codes and efficiencies.
+            start (int): Cycle number of the chunk's first cycle.
+
+        Raises:
+            ValueError: If the chunk does not fit in the summarized cycles.
+        """
+        size = state.num_cycles
+        if size == 0:
+            return
+        if start < 0 or start + size > self.num_cycles:
+            raise ValueError("Chunk lies outside the summarized cycles.")
+
+        values = np.empty((size, len(self.series)))
+        values[:, 0] = self.nutrient_levels[state.nutrient_codes]
+        values[:, 1:] = state.efficiencies
+        valid = ~np.isnan(values)
+
+        # Chunks are consecutive cycles, so each bucket is one contiguous run of rows
+        first_bucket = start // self.bucket_size
+        boundaries = np.arange((first_bucket + 1) * self.bucket_size, start + size, self.bucket_size) - start
+        offsets = np.concatenate([[0], boundaries])
+        buckets = slice(first_bucket, first_bucket + len(offsets))
+        self.minimum[buckets] = np.fmin(self.minimum[buckets], np.fmin.reduceat(values, offsets, axis=0))
+        self.maximum[buckets] = np.fmax(self.maximum[buckets], np.fmax.reduceat(values, offsets, axis=0))
+        self.total[buckets] += np.add.reduceat(np.where(valid, values, 0.0), offsets, axis=0)
+        self.count[buckets] += np.add.reduceat(valid, offsets, axis=0)
+
+        self.level_counts += np.bincount(state.nutrient_codes, minlength=len(self.level_counts))
+
+        # One bincount over all codons: bin index offset by the codon's column
+        efficiencies = values[:, 1:]
+        histogram_bins = self.histograms.shape[1]
+        low, high = self.histogram_edges[0], self.histogram_edges[-1]
+        scaled = (np.where(valid[:, 1:], efficiencies, low) - low) / (high - low) * histogram_bins
+        bins = np.clip(scaled, 0, histogram_bins - 1).astype(np.int64)
+        bins += np.arange(len(self.codons)) * histogram_bins
+        self.histograms += np.bincount(bins[valid[:, 1:]], minlength=self.histograms.size).reshape(self.histograms.shape)
+
+    def merge(self, other):
+        """
+        Adds another summary of the same cycles, e.g. one filled from a different range of chunks.
+
+        Returns:
+            PlotSummary: This summary, updated in place.
+        """
+        if (other.num_cycles, other.bucket_size, other.codons) != (self.num_cycles, self.bucket_size, self.codons) \
+                or not np.array_equal(other.histogram_edges, self.histogram_edges):
+            raise ValueError("Only summaries with the same cycles, codons and bins can be merged.")
+        np.fmin(self.minimum, other.minimum, out=self.minimum)
+        np.fmax(self.maximum, other.maximum, out=self.maximum)
+        self.total += other.total
+        self.count += other.count
+        self.level_counts += other.level_counts
+        self.histograms += other.histograms
+        return self
+
+    @property
+    def bucket_starts(self):
+        """
+        First cycle of every bucket.
+        """
+        return np.arange(len(self.count)) * self.bucket_size
+
+    def binned(self, series):
+        """
+        Returns the per-bucket statistics of one series.
+
+        Parameters:
+            series (str): "nutrient_levels" or "<codon>_efficiency".
+
+        Returns:
+            pd.DataFrame: Columns "cycle" (bucket start), "min", "mean" and "max"; empty buckets hold NaN.
+        """
+        if series not in self.series:
+            raise ValueError(f"Unknown series: {series}")
+        column = self.series.index(series)
+        count = self.count[:, column]
+        filled = count > 0
+        with np.errstate(divide="ignore", invalid="ignore"):
+            mean = np.where(filled, self.total[:, column] / count, np.nan)
+        return pd.DataFrame({
+            "cycle": self.bucket_starts,
+            "min": np.where(filled, self.minimum[:, column], np.nan),
+            "mean": mean,
+            "max": np.where(filled, self.maximum[:, column], np.nan),
+        })
+
+    def level_occupancy(self):
+        """
+        Returns the fraction of summarized cycles spent at each nutrient level.
+
+        Returns:
+            pd.DataFrame: Columns "nutrient_level", "cycles" and "fraction".
+        """
+        total = self.level_counts.sum()
+        return pd.DataFrame({
+            "nutrient_level": self.nutrient_levels,
+            "cycles": self.level_counts,
+            "fraction": self.level_counts / total if total else np.zeros(len(self.level_counts)),
+        })
+
+
+if __name__ == "__main__":
+    from initialization import initialize_state
+    from fused_pipeline import run_fused_pipeline
+
+    # Example summary of a fused run
+    state = run_fused_pipeline(initialize_state(1_000_000, [1.0, 0.5, 0.1], ["AAA"], ["CGT"]))
+    summary = PlotSummary.from_state(state, num_bins=100)
+    print(summary.binned("AAA_efficiency").head())
+    print(summary.level_occupancy())
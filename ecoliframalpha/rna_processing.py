@@ -1,21 +1,50 @@
 import numpy as np
-import pandas as pd
+from utils import make_rng
 
-def process_rna(stressed_results, codon_efficiency, rnase_activity=0.05, decay_variability=0.1):
+def decay_rates(nutrient_values, base_efficiency, rnase_activity=0.05, decay_variability=0.1):
     """
-    Processes RNA stability and decay based on codon efficiency.
+    Computes the per-cycle RNA degradation rate for every nutrient value and codon.
 
     Parameters:
-        stressed_results (pd.DataFrame): Dataframe with codon efficiencies and nutrient levels.
-        codon_efficiency (dict): Codon efficiency data from initialization.
+        nutrient_values (array-like): Nutrient levels, of any shape.
+        base_efficiency (array-like): Base efficiency of each codon.
         rnase_activity (float): Baseline RNA degradation rate (0 ≤ rnase_activity ≤ 1).
         decay_variability (float): Variability in RNA degradation.
 
     Returns:
-        pd.DataFrame: Updated dataframe with RNA stability accounted for.
+        np.ndarray: Array of shape `nutrient_values.shape + (codons,)`.
+    """
+    base_decay_rate = rnase_activity * (1 + decay_variability * (1 - np.asarray(base_efficiency, dtype=float)))
+    nutrient_term = 1 + np.asarray(nutrient_values, dtype=float) * decay_variability
+    return np.multiply.outer(nutrient_term, base_decay_rate)
+
+
+def decay_factors(nutrient_values, base_efficiency, rnase_activity=0.05, decay_variability=0.1):
+    """
+    Computes the exponential RNA decay factor for every nutrient value and codon.
+
+    Parameters:
+        nutrient_values (array-like): Nutrient levels, of any shape.
+        base_efficiency (array-like): Base efficiency of each codon.
+        rnase_activity (float): Baseline RNA degradation rate (0 ≤ rnase_activity ≤ 1).
+        decay_variability (float): Variability in RNA degradation.
+
+    Returns:
+        np.ndarray: Array of shape `nutrient_values.shape + (codons,)`.
+    """
+    return np.exp(-decay_rates(nutrient_values, base_efficiency, rnase_activity, decay_variability))
+
+
+def _validate_rna_inputs(stressed_results, codon_efficiency, rnase_activity, decay_variability, function_name):
+    """
+    Validates the inputs shared by the RNA processing functions.
+
+    Raises:
+        ValueError: If the data or parameters are invalid.
+        KeyError: If a codon efficiency column is missing.
     """
     if stressed_results.empty:
-        raise ValueError("Empty dataset provided to process_rna().")
+        raise ValueError(f"Empty dataset provided to {function_name}().")
     #Ensure required column exists
     if "nutrient_levels" not in stressed_results.columns:
         raise ValueError("Missing required column: 'nutrient_levels'")
@@ -27,31 +56,291 @@ def process_rna(stressed_results, codon_efficiency, rnase_activity=0.05, decay_v
     if not (0 <= decay_variability <= 1):
         raise ValueError("decay_variability must be between 0 and 1.")
 
-    # Copy the DataFrame to avoid modifying the original
-    updated_results = stressed_results.copy()
-
-    # Calculate decay rates based on codon efficiency
     for codon, properties in codon_efficiency.items():
         if "base_efficiency" not in properties:
             raise ValueError(f"Missing 'base_efficiency' for codon: {codon}")
 
-        codon_column = f"{codon}_efficiency"
-
         # Ensure the codon efficiency column exists
-        if codon_column not in updated_results.columns:
-            raise KeyError(f"Column '{codon_column}' missing in stressed_results.")
+        if f"{codon}_efficiency" not in stressed_results.columns:
+            raise KeyError(f"Column '{codon}_efficiency' missing in stressed_results.")
+
+
+# Lanes synthesizing more molecules per cycle than this are leaped, since tracking every molecule costs more
+LEAP_BIRTHS_PER_CYCLE = 16.0
+
+
+def _lifetime_block(copies, births, degradation_rates, continuous_births, rng):
+    """
+    Advances a block of cycles exactly by drawing the lifetime of every molecule present or born in it.
+
+    Molecules decay independently, so each one dies once its integrated degradation rate exceeds an
+    Exp(1) draw; copy numbers are the molecules born and not yet dead at the end of every cycle.
+    Births fall uniformly within their cycle in lanes with `continuous_births` (the Gillespie SSA
+    process) and at the end of the cycle elsewhere (the tau-leap process).
+
+    Parameters:
+        copies (np.ndarray): Molecule count of each lane at the start of the block.
+        births (np.ndarray): (cycles, lanes) molecules synthesized in each cycle.
+        degradation_rates (np.ndarray): (cycles, lanes) per-molecule decay rate in each cycle.
+        continuous_births (np.ndarray): Boolean per lane, True for SSA lanes.
+        rng (np.random.Generator): Random stream for birth times and lifetimes.
+
+    Returns:
+        np.ndarray: (cycles, lanes) molecule counts at the end of every cycle.
+    """
+    num_cycles, num_lanes = degradation_rates.shape
+    hazard = np.zeros((num_cycles + 1, num_lanes))
+    np.cumsum(degradation_rates, axis=0, out=hazard[1:])
+
+    # Existing molecules start at the block start; newborns at their birth time within the cycle.
+    # Molecules are ordered lane by lane and cycle by cycle, so the search below walks memory in order.
+    birth_cells = np.repeat(np.arange(births.size), births.ravel(order="F"))
+    birth_lane, birth_cycle = np.divmod(birth_cells, num_cycles)
+    birth_fraction = np.where(continuous_births[birth_lane], rng.random(birth_cells.size), 1.0)
+    lane = np.concatenate([np.repeat(np.arange(num_lanes), copies), birth_lane])
+    first_cycle = np.concatenate([np.zeros(copies.sum(), dtype=np.intp), birth_cycle])
+    death_hazard = np.concatenate([
+        np.zeros(copies.sum()),
+        hazard[birth_cycle, birth_lane] + degradation_rates[birth_cycle, birth_lane] * birth_fraction,
+    ]) + rng.exponential(size=lane.size)
+
+    # Death cycle k has hazard[k] < death_hazard <= hazard[k + 1]; one search over all lanes, each
+    # lane's cumulative hazard shifted past the previous one
+    offsets = np.concatenate([[0.0], np.cumsum(hazard[-1] + 1.0)[:-1]])
+    position = np.searchsorted((hazard + offsets).ravel(order="F"), death_hazard + offsets[lane])
+    death_cycle = np.maximum(position - lane * (num_cycles + 1) - 1, first_cycle)
+    death_cycle[death_hazard > hazard[-1, lane]] = num_cycles
+
+    # Molecules count from their first cycle up to (not including) the cycle they die in
+    cells = (num_cycles + 1) * num_lanes
+    change = np.bincount(first_cycle * num_lanes + lane, minlength=cells) - np.bincount(death_cycle * num_lanes + lane, minlength=cells)
+    return np.cumsum(change.reshape(num_cycles + 1, num_lanes)[:num_cycles], axis=0)
+
+
+def simulate_mrna_copies(degradation_rates, synthesis_rates, initial_copies=100, ssa_threshold=10, rng=None,
+                         block_cycles=256, max_molecules=1_000_000):
+    """
+    Simulates discrete mRNA copy numbers per cycle for a batch of independent lanes.
+
+    Each lane is a birth-death process with constant synthesis and first-order decay whose rate changes
+    every cycle. Lanes holding fewer than `ssa_threshold` molecules follow the exact Gillespie SSA, with
+    births spread through each cycle; all others follow tau-leaping with one leap per cycle, births
+    joining at the end of the cycle. A lane's regime is chosen at the start of each block of at most
+    `block_cycles` cycles rather than at every cycle.
+
+    Blocks are advanced at once from per-molecule lifetimes, vectorized over lanes, so the cost grows
+    with the number of molecules instead of with cycles times SSA events; blocks are shortened to hold
+    about `max_molecules` molecules. Lanes above `ssa_threshold` that synthesize more than
+    `LEAP_BIRTHS_PER_CYCLE` molecules per cycle are leaped with one binomial draw per cycle instead.
+    That path steps through cycles in Python (roughly 15-25 µs per cycle, whatever the number of such
+    lanes), which dominates long runs of large mRNA pools.
+
+    Parameters:
+        degradation_rates (np.ndarray): (cycles, lanes) per-molecule decay rate in each cycle.
+        synthesis_rates (np.ndarray): Molecules synthesized per cycle in each lane.
+        initial_copies (int): Molecule count of every lane before the first cycle.
+        ssa_threshold (int): Copy number below which a lane switches to exact SSA.
+        rng (np.random.Generator): Random stream for births and deaths (see `utils.make_rng`).
+        block_cycles (int): Maximum cycles per block, i.e. how often lanes may switch regime.
+        max_molecules (int): Approximate number of molecules tracked per block, bounding memory use.
+
+    Returns:
+        np.ndarray: (cycles, lanes) integer molecule counts at the end of every cycle.
+    """
+    rng = make_rng(rng)
+    degradation_rates = np.asarray(degradation_rates, dtype=float)
+    shape = degradation_rates.shape
+    degradation_rates = degradation_rates.reshape(shape[0], -1)
+    synthesis_rates = np.broadcast_to(np.asarray(synthesis_rates, dtype=float), shape[1:]).ravel()
+    num_cycles, num_lanes = degradation_rates.shape
+
+    copies = np.full(num_lanes, initial_copies, dtype=np.int64)
+    history = np.empty((num_cycles, num_lanes), dtype=np.int64)
+    start = 0
+    while start < num_cycles:
+        leaped = (synthesis_rates > LEAP_BIRTHS_PER_CYCLE) & (copies >= ssa_threshold)
+        tracked = ~leaped
+
+        # Block length keeping the tracked molecules (present plus expected births) near `max_molecules`
+        births_per_cycle = synthesis_rates[tracked].sum()
+        budget = max(max_molecules - copies[tracked].sum(), 0)
+        block = min(num_cycles - start, block_cycles)
+        if births_per_cycle > 0:
+            block = max(1, min(block, int(budget / births_per_cycle)))
+        stop = start + block
+
+        births = rng.poisson(synthesis_rates, size=(block, num_lanes))
+        if tracked.any():
+            history[start:stop, tracked] = _lifetime_block(
+                copies[tracked], births[:, tracked], degradation_rates[start:stop, tracked],
+                copies[tracked] < ssa_threshold, rng,
+            )
+        if leaped.any():
+            death_probability = -np.expm1(-degradation_rates[start:stop, leaped])
+            lane_births = births[:, leaped]
+            leaped_history = np.empty_like(lane_births)
+            lane_copies = copies[leaped]
+            for t in range(block):
+                lane_copies -= rng.binomial(lane_copies, death_probability[t])
+                lane_copies += lane_births[t]
+                leaped_history[t] = lane_copies
+            history[start:stop, leaped] = leaped_history
+        copies = history[stop - 1].copy()
+        start = stop
+    return history.reshape(shape)
+
+
+def mrna_copy_scale(degradation_rates, initial_copies=100, ssa_threshold=10, rng=None):
+    """
+    Simulates mRNA pools decaying at the given per-cycle rates and returns their copy numbers relative
+    to `initial_copies`.
+
+    Each pool is synthesized at `initial_copies` times its mean per-cycle decay probability, so copy
+    numbers fluctuate around `initial_copies` whatever the nutrient load.
+
+    Parameters:
+        degradation_rates (np.ndarray): (cycles, lanes) per-molecule decay rate in each cycle.
+        initial_copies (int): Starting (and typical) mRNA molecules per lane.
+        ssa_threshold (int): Copy number below which a pool is simulated with exact SSA.
+        rng (np.random.Generator): Random stream for the mRNA copy numbers (see `utils.make_rng`).
 
-        # Compute RNA degradation using an exponential decay model
-        base_decay_rate = rnase_activity * (1 + decay_variability * (1 - properties["base_efficiency"]))
-        decay_factor = np.exp(-base_decay_rate * (1 + updated_results["nutrient_levels"] * decay_variability))
+    Returns:
+        np.ndarray: (cycles, lanes) copy numbers divided by `initial_copies`.
+    """
+    synthesis_rates = initial_copies * -np.expm1(-degradation_rates).mean(axis=0)
+    return simulate_mrna_copies(degradation_rates, synthesis_rates, initial_copies, ssa_threshold, rng) / initial_copies
+
+
+def process_rna_stochastic(stressed_results, codon_efficiency, rnase_activity=0.05, decay_variability=0.1,
+                           initial_copies=100, ssa_threshold=10, num_replicates=None, rng=None):
+    """
+    Processes RNA stability with discrete, stochastic mRNA copy numbers instead of a deterministic decay factor.
+
+    Every codon's mRNA pool is synthesized to balance its mean decay over the trajectory, so copy numbers
+    fluctuate around `initial_copies`; each efficiency is scaled by its pool's copies / `initial_copies`
+    (see `mrna_copy_scale`).
+
+    Parameters:
+        stressed_results (pd.DataFrame): Dataframe with codon efficiencies and nutrient levels.
+        codon_efficiency (dict): Codon efficiency data from initialization.
+        rnase_activity (float): Baseline RNA degradation rate (0 ≤ rnase_activity ≤ 1).
+        decay_variability (float): Variability in RNA degradation.
+        initial_copies (int): Starting (and typical) mRNA molecules per codon.
+        ssa_threshold (int): Copy number below which a pool is simulated with exact SSA.
+        num_replicates (int): If given, simulate this many independent replicates in one batch.
+        rng (np.random.Generator): Random stream for the mRNA copy numbers (see `utils.make_rng`).
+
+    Returns:
+        pd.DataFrame or list of pd.DataFrame: Updated dataframe (one per replicate if `num_replicates` is given).
+    """
+    _validate_rna_inputs(stressed_results, codon_efficiency, rnase_activity, decay_variability, "process_rna_stochastic")
+    if not isinstance(initial_copies, int) or initial_copies <= 0:
+        raise ValueError("initial_copies must be a positive integer.")
+
+    codons = list(codon_efficiency)
+    replicates = num_replicates or 1
+    base_efficiency = [codon_efficiency[codon]["base_efficiency"] for codon in codons]
+
+    # One lane per replicate and codon: (cycles, replicates * codons)
+    rates = decay_rates(stressed_results["nutrient_levels"].to_numpy(dtype=float), base_efficiency,
+                        rnase_activity, decay_variability)
+    scale = mrna_copy_scale(np.tile(rates, (1, replicates)), initial_copies, ssa_threshold, rng)
+    scale = scale.reshape(len(stressed_results), replicates, len(codons))
+
+    efficiency_columns = [f"{codon}_efficiency" for codon in codons]
+    efficiencies = stressed_results[efficiency_columns].to_numpy(dtype=float)
+    results = []
+    for replicate in range(replicates):
+        updated_results = stressed_results.copy()
+        updated_results[efficiency_columns] = np.clip(efficiencies * scale[:, replicate, :], 0, None)
+        results.append(updated_results)
+
+    return results if num_replicates else results[0]
+
+
+def process_rna(stressed_results, codon_efficiency, rnase_activity=0.05, decay_variability=0.1,
+                inplace=False, dtype=None, chunk_size=65_536):
+    """
+    Processes RNA stability and decay based on codon efficiency.
+
+    Decay factors are gathered from a (levels, codons) table built in the target dtype, `chunk_size`
+    cycles at a time, so no full-size decay factor array is created.
+
+    Parameters:
+        stressed_results (pd.DataFrame): Dataframe with codon efficiencies and nutrient levels.
+        codon_efficiency (dict): Codon efficiency data from initialization.
+        rnase_activity (float): Baseline RNA degradation rate (0 ≤ rnase_activity ≤ 1).
+        decay_variability (float): Variability in RNA degradation.
+        inplace (bool): If True, update `stressed_results` directly instead of a copy. Efficiency columns
+            that already have `dtype` are decayed in their existing buffers.
+        dtype (np.dtype): Floating point type of the decayed columns (e.g. np.float32 to halve memory);
+            None keeps float64.
+        chunk_size (int): Cycles decayed at a time, bounding temporary memory.
+
+    Returns:
+        pd.DataFrame: Updated dataframe with RNA stability accounted for.
+    """
+    _validate_rna_inputs(stressed_results, codon_efficiency, rnase_activity, decay_variability, "process_rna")
+    dtype = np.dtype(dtype or np.float64)
 
+    # A shallow copy leaves the input untouched, since the decayed columns are replaced rather than written
+    updated_results = stressed_results if inplace else stressed_results.copy(deep=False)
+    if not codon_efficiency:
+        return updated_results
+
+    # Exponential decay factor of every nutrient level and codon, gathered per cycle from the level codes
+    efficiency_columns = [f"{codon}_efficiency" for codon in codon_efficiency]
+    base_efficiency = [properties["base_efficiency"] for properties in codon_efficiency.values()]
+    level_codes, levels = updated_results["nutrient_levels"].factorize(use_na_sentinel=False)
+    decay_table = decay_factors(np.asarray(levels, dtype=float), base_efficiency, rnase_activity,
+                                decay_variability).astype(dtype)
+
+    def decayed(efficiencies, start):
+        efficiencies *= np.take(decay_table, level_codes[start:start + len(efficiencies)], axis=0)
         # Apply decay but prevent values from becoming negative
-        updated_results[codon_column] *= decay_factor
-        updated_results[codon_column] = updated_results[codon_column].clip(lower=0)
+        return np.clip(efficiencies, 0, None, out=efficiencies)
+
+    if inplace and (updated_results.dtypes[efficiency_columns] == dtype).all():
+        # Write each chunk back into the existing column buffers
+        positions = updated_results.columns.get_indexer(efficiency_columns)
+        for start in range(0, len(updated_results), chunk_size):
+            rows = slice(start, start + chunk_size)
+            chunk = updated_results.iloc[rows, positions].to_numpy(dtype=dtype, copy=True)
+            updated_results.iloc[rows, positions] = decayed(chunk, start)
+        return updated_results
+
+    efficiencies = updated_results[efficiency_columns].to_numpy(dtype=dtype, copy=True)
+    for start in range(0, len(efficiencies), chunk_size):
+        decayed(efficiencies[start:start + chunk_size], start)
+    updated_results[efficiency_columns] = efficiencies
 
     return updated_results
 
 
+def process_rna_state(state, rnase_activity=0.05, decay_variability=0.1):
+    """
+    Applies RNA decay in place to the efficiencies of an array-backed simulation state.
+
+    Parameters:
+        state (SimulationState): State whose efficiencies are decayed at its current nutrient levels.
+        rnase_activity (float): Baseline RNA degradation rate (0 ≤ rnase_activity ≤ 1).
+        decay_variability (float): Variability in RNA degradation.
+
+    Returns:
+        SimulationState: The same state with RNA stability accounted for.
+    """
+    if not (0 <= rnase_activity <= 1):
+        raise ValueError("rnase_activity must be between 0 and 1.")
+
+    if not (0 <= decay_variability <= 1):
+        raise ValueError("decay_variability must be between 0 and 1.")
+
+    decay_table = decay_factors(state.nutrient_levels, state.registry["base_efficiency"], rnase_activity, decay_variability)
+    state.efficiencies *= np.take(decay_table.astype(state.efficiencies.dtype, copy=False), state.nutrient_codes, axis=0)
+    np.clip(state.efficiencies, 0, None, out=state.efficiencies)
+    return state
+
+
 
 
 if __name__ == "__main__":
@@ -0,0 +1,312 @@
+import os
+from enum import IntEnum
+import numpy as np
+import pandas as pd
+from utils import encode_nutrient_levels
+
+
+class CodonType(IntEnum):
+    """
+    Compact integer encoding of codon categories.
+    """
+    ROBUST = 0
+    SENSITIVE = 1
+    OTHER = 2
+
+
+def codon_registry_dtype(codons=()):
+    """
+    Returns the structured dtype of a codon registry: one row per codon holding its column position
+    in the efficiency array, category and baseline efficiency.
+
+    Parameters:
+        codons (iterable of str): Codon names; the codon field is as wide as the longest one,
+            so codon-by-gene names are never truncated.
+
+    Returns:
+        np.dtype: The registry dtype.
+    """
+    return np.dtype([
+        ("codon", f"U{max(map(len, codons), default=3)}"),
+        ("index", np.int32),
+        ("type", np.uint8),
+        ("base_efficiency", np.float64),
+    ])
+
+
+# Registry dtype of plain three-letter codons
+CODON_REGISTRY_DTYPE = codon_registry_dtype()
+
+
+# Files of a memory-mapped state directory
+STATE_FILES = {
+    "efficiencies": "efficiencies.npy",
+    "nutrient_codes": "nutrient_codes.npy",
+    "nutrient_levels": "nutrient_levels.npy",
+    "registry": "registry.npy",
+}
+
+
+def build_codon_registry(codon_efficiency):
+    """
+    Converts the codon efficiency dictionary into a structured codon registry.
+
+    Parameters:
+        codon_efficiency (dict): Dictionary mapping codons to their "base_efficiency" and "type".
+
+    Returns:
+        np.ndarray: Structured array (see `codon_registry_dtype`), in `codon_efficiency` order.
+
+    Raises:
+        ValueError: If a codon is missing its 'base_efficiency'.
+    """
+    registry = np.zeros(len(codon_efficiency), dtype=codon_registry_dtype(codon_efficiency))
+    for position, (codon, properties) in enumerate(codon_efficiency.items()):
+        if "base_efficiency" not in properties:
+            raise ValueError(f"Missing 'base_efficiency' for codon: {codon}")
+        codon_type = properties.get("type")
+        registry[position] = (
+            codon,
+            position,
+            CodonType[codon_type.upper()] if codon_type in ("robust", "sensitive") else CodonType.OTHER,
+            properties["base_efficiency"],
+        )
+    return registry
+
+
+def registry_to_codon_efficiency(registry):
+    """
+    Converts a codon registry back into the codon efficiency dictionary used by the DataFrame stages.
+
+    Parameters:
+        registry (np.ndarray): Structured array with dtype `codon_registry_dtype`.
+
+    Returns:
+        dict: Dictionary mapping codons to their "base_efficiency" and "type".
+    """
+    return {
+        str(entry["codon"]): {
+            "base_efficiency": float(entry["base_efficiency"]),
+            "type": CodonType(entry["type"]).name.lower(),
+        }
+        for entry in registry
+    }
+
+
+class SimulationState:
+    """
+    Array-backed simulation state shared by the pipeline stages.
+
+    The efficiency and nutrient code arrays may be `np.memmap`s backed by `.npy` files (see `create`
+    and `open`), in which case stages write through to disk and `iter_chunks` bounds memory use.
+
+    Attributes:
+        efficiencies (np.ndarray): Contiguous (cycles, codons) array of translation efficiencies.
+        nutrient_codes (np.ndarray): uint8 vector with the nutrient level index of every cycle.
+        nutrient_levels (np.ndarray): Float vector of the possible nutrient levels.
+        registry (np.ndarray): Structured codon registry (see `codon_registry_dtype`).
+    """
+
+    __slots__ = ("efficiencies", "nutrient_codes", "nutrient_levels", "registry")
+
+    def __init__(self, efficiencies, nutrient_codes, nutrient_levels, registry):
+        efficiencies = np.asanyarray(efficiencies)  # Keeps np.memmap buffers
+        nutrient_codes = np.asanyarray(nutrient_codes)
+        if efficiencies.ndim != 2:
+            raise ValueError("efficiencies must be a 2D (cycles, codons) array.")
+        if nutrient_codes.shape != (efficiencies.shape[0],):
+            raise ValueError("nutrient_codes must have one entry per cycle.")
+        if len(registry) != efficiencies.shape[1]:
+            raise ValueError("registry must have one entry per efficiency column.")
+
+        self.efficiencies = efficiencies
+        self.nutrient_codes = nutrient_codes
+        self.nutrient_levels = np.asarray(nutrient_levels, dtype=float)
+        self.registry = registry
+
+    @classmethod
+    def allocate(cls, nutrient_codes, nutrient_levels, codon_efficiency, dtype=np.float64):
+        """
+        Creates a state whose efficiencies start at each codon's base efficiency.
+
+        Parameters:
+            nutrient_codes (array-like): Nutrient level index of every cycle.
+            nutrient_levels (list of float): List of possible nutrient levels.
+            codon_efficiency (dict): Dictionary mapping codons to their "base_efficiency" and "type".
+            dtype (np.dtype): Floating point type of the efficiency array.
+
+        Returns:
+            SimulationState: The initialized state.
+        """
+        if len(nutrient_levels) > np.iinfo(np.uint8).max + 1:
+            raise ValueError("At most 256 nutrient levels are supported.")
+        registry = build_codon_registry(codon_efficiency)
+        nutrient_codes = np.ascontiguousarray(nutrient_codes, dtype=np.uint8)
+        efficiencies = np.empty((len(nutrient_codes), len(registry)), dtype=dtype)
+        efficiencies[:] = registry["base_efficiency"]
+        return cls(efficiencies, nutrient_codes, nutrient_levels, registry)
+
+    @classmethod
+    def create(cls, directory, num_cycles, nutrient_levels, codon_efficiency, dtype=np.float64, chunk_size=1_000_000):
+        """
+        Creates a state backed by memory-mapped `.npy` files, with efficiencies at each codon's base efficiency.
+
+        Parameters:
+            directory (str): Directory for the state files (see `STATE_FILES`); existing files are overwritten.
+            num_cycles (int): Number of cycles.
+            nutrient_levels (list of float): List of possible nutrient levels.
+            codon_efficiency (dict): Dictionary mapping codons to their "base_efficiency" and "type".
+            dtype (np.dtype): Floating point type of the efficiency array.
+            chunk_size (int): Cycles filled per step, bounding resident memory.
+
+        Returns:
+            SimulationState: State whose nutrient codes are still zero and must be filled by the caller.
+        """
+        if len(nutrient_levels) > np.iinfo(np.uint8).max + 1:
+            raise ValueError("At most 256 nutrient levels are supported.")
+        os.makedirs(directory, exist_ok=True)
+        registry = build_codon_registry(codon_efficiency)
+        np.save(os.path.join(directory, STATE_FILES["registry"]), registry)
+        np.save(os.path.join(directory, STATE_FILES["nutrient_levels"]), np.asarray(nutrient_levels, dtype=float))
+
+        efficiencies = np.lib.format.open_memmap(os.path.join(directory, STATE_FILES["efficiencies"]), mode="w+",
+                                                 dtype=dtype, shape=(num_cycles, len(registry)))
+        nutrient_codes = np.lib.format.open_memmap(os.path.join(directory, STATE_FILES["nutrient_codes"]), mode="w+",
+                                                   dtype=np.uint8, shape=(num_cycles,))
+        for start in range(0, num_cycles, chunk_size):
+            efficiencies[start:start + chunk_size] = registry["base_efficiency"]
+        return cls(efficiencies, nutrient_codes, nutrient_levels, registry)
+
+    @classmethod
+    def open(cls, directory, mode="r"):
+        """
+        Opens a memory-mapped state written by `create` without reading it into memory.
+
+        Parameters:
+            directory (str): Directory holding the state files.
+            mode (str): "r" for read-only access, "r+" to let stages update it in place.
+
+        Returns:
+            SimulationState: The memory-mapped state.
+        """
+        return cls(
+            np.load(os.path.join(directory, STATE_FILES["efficiencies"]), mmap_mode=mode),
+            np.load(os.path.join(directory, STATE_FILES["nutrient_codes"]), mmap_mode=mode),
+            np.load(os.path.join(directory, STATE_FILES["nutrient_levels"])),
+            np.load(os.path.join(directory, STATE_FILES["registry"])),
+        )
+
+    @classmethod
+    def from_dataframe(cls, dataframe, codon_efficiency, nutrient_levels):
+        """
+        Builds a state from a wide "<codon>_efficiency" DataFrame.
+
+        Parameters:
+            dataframe (pd.DataFrame): DataFrame with "nutrient_levels" and one efficiency column per codon.
+            codon_efficiency (dict): Dictionary mapping codons to their "base_efficiency" and "type".
+            nutrient_levels (list of float): List of possible nutrient levels.
+
+        Returns:
+            SimulationState: State holding a copy of the DataFrame values.
+
+        Raises:
+            ValueError: If a nutrient value is not one of `nutrient_levels`.
+        """
+        codes = encode_nutrient_levels(dataframe["nutrient_levels"].to_numpy(dtype=float), nutrient_levels)
+        if (codes < 0).any():
+            raise ValueError("nutrient_levels column contains values outside the nutrient level list.")
+        registry = build_codon_registry(codon_efficiency)
+        efficiencies = np.column_stack(
+            [dataframe[f"{codon}_efficiency"].to_numpy(dtype=float) for codon in registry["codon"]]
+        ) if len(registry) else np.empty((len(dataframe), 0))
+        return cls(np.ascontiguousarray(efficiencies), codes.astype(np.uint8), nutrient_levels, registry)
+
+    @property
+    def num_cycles(self):
+        return self.efficiencies.shape[0]
+
+    @property
+    def codons(self):
+        return [str(codon) for codon in self.registry["codon"]]
+
+    @property
+    def codon_efficiency(self):
+        return registry_to_codon_efficiency(self.registry)
+
+    @property
+    def nutrient_values(self):
+        """
+        Nutrient level of every cycle, decoded from the level codes.
+        """
+        return self.nutrient_levels[self.nutrient_codes]
+
+    @property
+    def is_memory_mapped(self):
+        return isinstance(self.efficiencies, np.memmap)
+
+    def chunk(self, start, stop):
+        """
+        Returns a state viewing cycles `start:stop`; stages applied to it update this state.
+        """
+        return SimulationState(self.efficiencies[start:stop], self.nutrient_codes[start:stop],
+                               self.nutrient_levels, self.registry)
+
+    def iter_chunks(self, chunk_size):
+        """
+        Yields consecutive views of at most `chunk_size` cycles (see `chunk`).
+        """
+        if not isinstance(chunk_size, int) or chunk_size <= 0:
+            raise ValueError("chunk_size must be a positive integer.")
+        for start in range(0, self.num_cycles, chunk_size):
+            yield self.chunk(start, start + chunk_size)
+
+    def flush(self):
+        """
+        Writes pending changes of memory-mapped arrays to disk.
+        """
+        for array in (self.efficiencies, self.nutrient_codes):
+            if isinstance(array, np.memmap):
+                array.flush()
+
+    def codon_index(self, codon):
+        """
+        Returns the efficiency column of a codon.
+
+        Raises:
+            KeyError: If the codon is not in the registry.
+        """
+        matches = np.flatnonzero(self.registry["codon"] == codon)
+        if not len(matches):
+            raise KeyError(f"Codon '{codon}' is not in the simulation state.")
+        return int(matches[0])
+
+    def column(self, codon):
+        """
+        Returns a view of one codon's efficiencies across cycles.
+        """
+        return self.efficiencies[:, self.codon_index(codon)]
+
+    def to_dataframe(self):
+        """
+        Returns the wide DataFrame view used by the DataFrame-based stages.
+
+        Returns:
+            pd.DataFrame: DataFrame with "cycle", "nutrient_levels" and "<codon>_efficiency" columns.
+        """
+        columns = {
+            "cycle": np.arange(1, self.num_cycles + 1),
+            "nutrient_levels": self.nutrient_values,
+        }
+        columns.update({f"{codon}_efficiency": self.efficiencies[:, position]
+                        for position, codon in enumerate(self.codons)})
+        return pd.DataFrame(columns)
+
+
+def is_simulation_state(value):
+    """
+    Tells whether `value` is a simulation state, by its array buffers rather than its class.
+
+    The check holds for states built through either import path (`simulation_state` or
+    `ecoliframalpha.simulation_state`), which define distinct SimulationState classes.
+    """
+    return all(hasattr(value, name) for name in SimulationState.__slots__)
@@ -0,0 +1,179 @@
+import os
+import json
+import pickle
+import hashlib
+import tempfile
+import numpy as np
+
+
+def _canonical(value):
+    """
+    Converts stage parameters into JSON-serializable values with a stable representation.
+    """
+    if isinstance(value, dict):
+        return {str(key): _canonical(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_canonical(item) for item in value]
+    if isinstance(value, np.random.SeedSequence):
+        return {"entropy": _canonical(value.entropy), "spawn_key": list(value.spawn_key)}
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    raise TypeError(f"Cannot build a cache key from a value of type {type(value).__name__}.")
+
+
+def stage_key(stage, parameters, parent_key=None):
+    """
+    Builds the content address of a stage output.
+
+    The key chains the parent stage's key, so a change in any upstream parameter or seed
+    also changes the key of every downstream stage.
+
+    Parameters:
+        stage (str): Stage name, e.g. "translation".
+        parameters (dict): Every parameter and seed the stage output depends on.
+        parent_key (str): Key of the upstream stage whose output is this stage's input, if any.
+
+    Returns:
+        str: SHA-256 hex digest.
+
+    Raises:
+        TypeError: If a parameter cannot be represented in the key.
+    """
+    canonical = json.dumps({"stage": stage, "parent": parent_key, "parameters": _canonical(parameters)},
+                           sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class StageCache:
+    """
+    Local content-addressed store of pipeline stage outputs with least-recently-used eviction.
+
+    Every entry is one pickle file named after its key. Reading an entry refreshes its modification
+    time, and the oldest entries are deleted whenever the cache grows beyond `max_bytes`.
+
+    Attributes:
+        cache_dir (str): Directory holding the entries.
+        max_bytes (int): Size limit of the cache; None keeps every entry.
+    """
+
+    def __init__(self, cache_dir, max_bytes=None):
+        if max_bytes is not None and (not isinstance(max_bytes, int) or max_bytes <= 0):
+            raise ValueError("max_bytes must be a positive integer or None.")
+        os.makedirs(cache_dir, exist_ok=True)
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.pkl")
+
+    def get(self, key):
+        """
+        Returns the cached value for `key`, or None if it is not cached.
+        """
+        path = self._path(key)
+        try:
+            with open(path, "rb") as file:
+                value = pickle.load(file)
+        except FileNotFoundError:
+            return None
+        except (pickle.UnpicklingError, EOFError) as e:
+            print(f"Discarding unreadable cache entry {path}: {e}")
+            os.remove(path)
+            return None
+        os.utime(path)  # Mark as recently used
+        return value
+
+    def put(self, key, value):
+        """
+        Stores a value under `key`, then evicts old entries if the cache is over its size limit.
+        """
+        # Write to a temporary file first so readers never see a partial entry
+        descriptor, temporary_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(descriptor, "wb") as file:
+                pickle.dump(value, file, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temporary_path, self._path(key))
+        except BaseException:
+            os.remove(temporary_path)
+            raise
+        self.evict()
+
+    def entries(self):
+        """
+        Lists the cached entries as (modification time, size, path), least recently used first.
+        """
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if name.endswith(".pkl"):
+                path = os.path.join(self.cache_dir, name)
+                stat = os.stat(path)
+                entries.append((stat.st_mtime_ns, stat.st_size, path))
+        return sorted(entries)
+
+    def evict(self):
+        """
+        Deletes least recently used entries until the cache fits in `max_bytes`.
+
+        Returns:
+            int: Number of entries removed.
+        """
+        if self.max_bytes is None:
+            return 0
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            os.remove(path)
+            total -= size
+            removed += 1
+        return removed
+
+    def clear(self):
+        """
+        Deletes every entry.
+        """
+        for _, _, path in self.entries():
+            os.remove(path)
+
+
+def run_stage(cache, stage, parameters, compute, parent_key=None):
+    """
+    Returns a stage output from the cache, or computes and stores it.
+
+    Parameters:
+        cache (StageCache): Cache to use; None always computes.
+        stage (str): Stage name.
+        parameters (dict): Every parameter and seed the stage output depends on.
+        compute (callable): Function without arguments producing the stage output.
+        parent_key (str): Key of the upstream stage, if any.
+
+    Returns:
+        tuple: (output, key), where `key` is passed as `parent_key` to the next stage.
+    """
+    key = stage_key(stage, parameters, parent_key)
+    if cache is not None:
+        value = cache.get(key)
+        if value is not None:
+            print(f"Reusing cached {stage} results.")
+            return value, key
+
+    value = compute()
+    if cache is not None:
+        cache.put(key, value)
+    return value, key
+
+
+if __name__ == "__main__":
+    import pandas as pd
+
+    # Example cached stage
+    cache = StageCache("results/cache", max_bytes=10_000_000)
+    data, key = run_stage(cache, "example", {"size": 5}, lambda: pd.DataFrame({"value": range(5)}))
+    data, key = run_stage(cache, "example", {"size": 5}, lambda: pd.DataFrame({"value": range(5)}))
+    print(key, data)
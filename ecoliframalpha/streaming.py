@@ -0,0 +1,185 @@
+import numpy as np
+from config.config import get_config
+from initialization import _validate_initialization_inputs, _build_codon_efficiency, iter_nutrient_codes
+from simulation_state import SimulationState, build_codon_registry
+from fused_pipeline import run_fused_pipeline
+from codon_variability import RunningVariability
+from plot_summary import PlotSummary
+from checkpoint import Checkpointer, run_fingerprint, load_checkpoint, remove_checkpoint
+from utils import make_rng
+
+def _iter_chunks(num_cycles, nutrient_levels, robust_codons, sensitive_codons, stress_probability,
+                 recovery_probability, rnase_activity, decay_variability, chunk_size, translate_after_stress,
+                 nutrient_rng, stress_rng, initial_state=0, config=None):
+    """
+    Yields each processed chunk together with the nutrient chain state it ends in.
+    """
+    config = get_config() if config is None else config
+    _validate_initialization_inputs(num_cycles, nutrient_levels, robust_codons, sensitive_codons)
+    if not nutrient_levels:
+        raise ValueError("nutrient_levels must be a list of numbers.")
+    chunk_size = chunk_size or config["chunk_size"]
+    if not isinstance(chunk_size, int) or chunk_size <= 0:
+        raise ValueError("chunk_size must be a positive integer.")
+
+    codon_efficiency = _build_codon_efficiency(robust_codons, sensitive_codons, config)
+    registry = build_codon_registry(codon_efficiency)
+    buffer_cycles = min(chunk_size, num_cycles)
+    efficiency_buffer = np.empty((buffer_cycles, len(registry)))
+    code_buffer = np.empty(buffer_cycles, dtype=np.uint8)
+
+    for codes in iter_nutrient_codes(num_cycles, nutrient_levels, chunk_size, config, nutrient_rng, initial_state,
+                                     stress_probability, recovery_probability):
+        size = len(codes)
+        code_buffer[:size] = codes
+        chain_state = int(codes[-1])  # Level before stress, where the nutrient chain continues from
+        state = SimulationState(efficiency_buffer[:size], code_buffer[:size], nutrient_levels, registry)
+        yield run_fused_pipeline(state, stress_probability, recovery_probability, rnase_activity,
+                                 decay_variability, translate_after_stress, stress_rng, config=config), chain_state
+
+
+def iter_simulation_chunks(num_cycles, nutrient_levels, robust_codons=["AAA", "GAT"], sensitive_codons=["CGT", "CTG"],
+                           stress_probability=0.1, recovery_probability=0.05, rnase_activity=0.05,
+                           decay_variability=0.1, chunk_size=None, translate_after_stress=False, nutrient_rng=None,
+                           stress_rng=None, config=None):
+    """
+    Yields the simulation in fixed-size chunks of cycles after stress, translation and RNA decay.
+
+    Every chunk is written into the same preallocated buffers, so memory use does not depend on
+    `num_cycles`. A yielded state is only valid until the next chunk is requested; copy it to keep it.
+
+    Parameters:
+        num_cycles (int): Total number of translation cycles to simulate.
+        nutrient_levels (list of float): List of possible nutrient levels.
+        robust_codons (list of str): List of codons with high stability under stress.
+        sensitive_codons (list of str): List of codons with low stability under stress.
+        stress_probability (float): Probability of a nutrient drop at each cycle (0 ≤ p ≤ 1).
+        recovery_probability (float): Probability of nutrient recovery at each cycle (0 ≤ p ≤ 1).
+        rnase_activity (float): Baseline RNA degradation rate (0 ≤ rnase_activity ≤ 1).
+        decay_variability (float): Variability in RNA degradation.
+        chunk_size (int): Cycles per chunk; None uses `config["chunk_size"]`.
+        translate_after_stress (bool): If True, efficiencies reflect the post-stress nutrient level.
+        nutrient_rng (np.random.Generator): Random stream for the nutrient levels, as in `initialize_state`.
+        stress_rng (np.random.Generator): Random stream for the stress events, as in `run_fused_pipeline`.
+        config (SimulationConfig): Run configuration (e.g. a `with_()` variant); None uses `get_config()`.
+
+    Yields:
+        SimulationState: The next chunk of at most `chunk_size` cycles.
+
+    Raises:
+        ValueError: If input parameters are invalid.
+    """
+    nutrient_rng, stress_rng = make_rng(nutrient_rng), make_rng(stress_rng)
+    for state, _ in _iter_chunks(num_cycles, nutrient_levels, robust_codons, sensitive_codons, stress_probability,
+                                 recovery_probability, rnase_activity, decay_variability, chunk_size,
+                                 translate_after_stress, nutrient_rng, stress_rng, config=config):
+        yield state
+
+
+def run_streaming(num_cycles, nutrient_levels, robust_codons=["AAA", "GAT"], sensitive_codons=["CGT", "CTG"],
+                  stress_probability=0.1, recovery_probability=0.05, rnase_activity=0.05, decay_variability=0.1,
+                  metrics=["variance", "Fano_factor", "CV", "CRI"], chunk_size=None, translate_after_stress=False,
+                  nutrient_rng=None, stress_rng=None, checkpoint_path=None, checkpoint_interval=300, resume=False,
+                  config=None):
+    """
+    Runs the simulation chunk by chunk, folding each chunk into running variability accumulators
+    and a fixed-size plot summary.
+
+    With a `checkpoint_path`, the random stream states, nutrient chain state and accumulators are saved
+    between chunks at most every `checkpoint_interval` seconds. A run started with `resume=True` continues
+    from that checkpoint and gives bit-identical results to an uninterrupted run.
+
+    Parameters:
+        num_cycles (int): Total number of translation cycles to simulate.
+        nutrient_levels (list of float): List of possible nutrient levels.
+        robust_codons (list of str): List of codons with high stability under stress.
+        sensitive_codons (list of str): List of codons with low stability under stress.
+        stress_probability (float): Probability of a nutrient drop at each cycle (0 ≤ p ≤ 1).
+        recovery_probability (float): Probability of nutrient recovery at each cycle (0 ≤ p ≤ 1).
+        rnase_activity (float): Baseline RNA degradation rate (0 ≤ rnase_activity ≤ 1).
+        decay_variability (float): Variability in RNA degradation.
+        metrics (list): List of metrics to calculate (options: "variance", "Fano_factor", "CV", "CRI").
+        chunk_size (int): Cycles per chunk; None uses `config["chunk_size"]`.
+        translate_after_stress (bool): If True, efficiencies reflect the post-stress nutrient level.
+        nutrient_rng (np.random.Generator): Random stream for the nutrient levels, as in `initialize_state`.
+        stress_rng (np.random.Generator): Random stream for the stress events, as in `run_fused_pipeline`.
+            With the same two streams, results match the fused pipeline run on the whole trajectory.
+        checkpoint_path (str): Checkpoint file; None disables checkpointing. Removed once the run completes.
+        checkpoint_interval (float): Minimum seconds between checkpoints (0 saves after every chunk).
+        resume (bool): If True, continue from the checkpoint at `checkpoint_path` when it exists.
+        config (SimulationConfig): Run configuration (e.g. a `with_()` variant); None uses `get_config()`.
+
+    Returns:
+        dict: A dictionary containing:
+            - "variability_results" (pd.DataFrame): Variability metrics for each codon.
+            - "accumulator" (RunningVariability): The final accumulator state.
+            - "sample" (SimulationState): Copy of the first chunk.
+            - "plot_summary" (PlotSummary): Binned trajectory and histograms of the whole run, for plotting.
+
+    Raises:
+        ValueError: If the checkpoint was written by a run with different parameters.
+    """
+    config = get_config() if config is None else config
+    chunk_size = chunk_size or config["chunk_size"]
+    fingerprint = run_fingerprint("streaming", {
+        "num_cycles": num_cycles, "nutrient_levels": nutrient_levels, "robust_codons": robust_codons,
+        "sensitive_codons": sensitive_codons, "stress_probability": stress_probability,
+        "recovery_probability": recovery_probability, "rnase_activity": rnase_activity,
+        "decay_variability": decay_variability, "chunk_size": chunk_size,
+        "translate_after_stress": translate_after_stress, "config": config.fingerprint,
+    })
+    nutrient_rng, stress_rng = make_rng(nutrient_rng), make_rng(stress_rng)
+    cycle, chain_state, accumulator, sample, plot_summary = 0, 0, None, None, None
+
+    checkpoint = load_checkpoint(checkpoint_path, fingerprint) if resume and checkpoint_path else None
+    if checkpoint is not None:
+        nutrient_rng.bit_generator.state = checkpoint["nutrient_rng"]
+        stress_rng.bit_generator.state = checkpoint["stress_rng"]
+        cycle, chain_state = checkpoint["cycle"], checkpoint["chain_state"]
+        accumulator, sample = checkpoint["accumulator"], checkpoint["sample"]
+        plot_summary = checkpoint["plot_summary"]
+
+    checkpointer = Checkpointer(checkpoint_path, fingerprint, checkpoint_interval)
+    chunks = _iter_chunks(num_cycles - cycle, nutrient_levels, robust_codons, sensitive_codons, stress_probability,
+                          recovery_probability, rnase_activity, decay_variability, chunk_size,
+                          translate_after_stress, nutrient_rng, stress_rng, chain_state, config) if cycle < num_cycles else []
+    for chunk, chain_state in chunks:
+        if accumulator is None:
+            accumulator = RunningVariability(chunk.codons)
+            sample = SimulationState(chunk.efficiencies.copy(), chunk.nutrient_codes.copy(),
+                                     chunk.nutrient_levels, chunk.registry)
+            plot_summary = PlotSummary.for_state(chunk, num_cycles, config=config)
+        accumulator.update(chunk.efficiencies)
+        plot_summary.update(chunk, cycle)
+        cycle += chunk.num_cycles
+        checkpointer.maybe_save(lambda: {
+            "cycle": cycle,
+            "chain_state": chain_state,
+            "nutrient_rng": nutrient_rng.bit_generator.state,
+            "stress_rng": stress_rng.bit_generator.state,
+            "accumulator": accumulator,
+            "sample": sample,
+            "plot_summary": plot_summary,
+        })
+    remove_checkpoint(checkpoint_path)
+
+    return {
+        "variability_results": accumulator.finalize(metrics),
+        "accumulator": accumulator,
+        "sample": sample,
+        "plot_summary": plot_summary,
+    }
+
+
+if __name__ == "__main__":
+    # Example streaming run
+    streaming_results = run_streaming(
+        num_cycles=10_000_000,
+        nutrient_levels=[1.0, 0.75, 0.5, 0.25, 0.1],
+        robust_codons=["AAA", "GAT"],
+        sensitive_codons=["CGT", "CTG"],
+        chunk_size=1_000_000,
+    )
+
+    # Display results
+    print(streaming_results["variability_results"])
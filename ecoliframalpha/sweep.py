@@ -0,0 +1,279 @@
+import os
+import sys
+import hashlib
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+import pandas as pd
+from config.config import get_config
+from ensemble import run_ensemble, ENSEMBLE_CONFIG_KEYS
+from input_handler import get_run_config
+from stage_cache import StageCache, run_stage
+from checkpoint import Checkpointer, run_fingerprint, load_checkpoint, remove_checkpoint
+from utils import save_table, spawn_seeds, TABLE_WRITERS
+
+# Parameters that can be scanned by a sweep
+SWEEP_PARAMETERS = ["stress_probability", "recovery_probability", "rnase_activity", "decay_variability"]
+
+def expand_grid(grid):
+    """
+    Expands a parameter grid into the list of all parameter combinations.
+
+    Parameters:
+        grid (dict): Mapping of sweep parameter names to lists of values.
+
+    Returns:
+        list of dict: One dictionary per grid point, in row-major order of `grid`.
+
+    Raises:
+        ValueError: If the grid is empty or contains unknown parameters.
+    """
+    if not grid:
+        raise ValueError("grid must contain at least one parameter.")
+    unknown = [name for name in grid if name not in SWEEP_PARAMETERS]
+    if unknown:
+        raise ValueError(f"Unknown sweep parameters: {', '.join(unknown)}")
+
+    names = list(grid)
+    return [dict(zip(names, values)) for values in itertools.product(*(list(grid[name]) for name in names))]
+
+
+def _default_base_parameters(config):
+    """
+    Builds the fixed (non-swept) simulation parameters from the configuration.
+    """
+    return {
+        "num_cycles": config["num_cycles"],
+        "num_replicates": 1,
+        "nutrient_levels": config["nutrient_levels"],
+        "robust_codons": config["robust_codons"],
+        "sensitive_codons": config["sensitive_codons"],
+        "stress_probability": config["stress_probability"],
+        "recovery_probability": config["recovery_probability"],
+        "rnase_activity": config["rnase_activity"],
+        "decay_variability": config["decay_variability"],
+        "seed": config["seed"],
+    }
+
+
+def _simulate_sweep_point(point_index, parameters, seed, metrics, experimental_data, config):
+    """
+    Simulates one grid point and returns only its compact long-form results.
+    """
+    ensemble = run_ensemble(
+        num_replicates=parameters["num_replicates"],
+        num_cycles=parameters["num_cycles"],
+        nutrient_levels=parameters["nutrient_levels"],
+        robust_codons=parameters["robust_codons"],
+        sensitive_codons=parameters["sensitive_codons"],
+        stress_probability=parameters["stress_probability"],
+        recovery_probability=parameters["recovery_probability"],
+        rnase_activity=parameters["rnase_activity"],
+        decay_variability=parameters["decay_variability"],
+        metrics=metrics,
+        rng=seed,
+        config=config,
+    )
+    replicates = ensemble["replicates"]
+    metric_columns = [column for column in replicates.columns if column not in ("replicate", "codon")]
+    rows = replicates.melt(id_vars=["replicate", "codon"], value_vars=metric_columns,
+                           var_name="metric", value_name="value")
+
+    # Validation against benchmarks adds one row per replicate and validation statistic
+    if experimental_data is not None:
+        from validation import validate_simulation
+
+        validation_rows = []
+        for replicate, variability_results in replicates.groupby("replicate", sort=True):
+            validation_results = validate_simulation(variability_results.reset_index(drop=True),
+                                                     experimental_data, metric_columns)
+            for metric, result in validation_results.items():
+                if isinstance(result, dict):
+                    for statistic in ("correlation", "mean_squared_error"):
+                        validation_rows.append({"replicate": replicate, "codon": None,
+                                                "metric": f"{metric}_{statistic}", "value": result[statistic]})
+        rows = pd.concat([rows, pd.DataFrame(validation_rows, columns=rows.columns)], ignore_index=True)
+
+    rows.insert(0, "point", point_index)
+    for position, name in enumerate(SWEEP_PARAMETERS, start=1):
+        rows.insert(position, name, parameters[name])
+    return rows
+
+
+def _run_sweep_point(task):
+    """
+    Returns the results of one grid point, reusing them from the stage cache when available.
+    """
+    point_index, point, seed, base_parameters, metrics, experimental_data, cache_settings, config = task
+    parameters = {**base_parameters, **point}
+    if cache_settings is None:
+        return _simulate_sweep_point(point_index, parameters, seed, metrics, experimental_data, config)
+
+    cache_dir, cache_max_bytes, experimental_digest = cache_settings
+    rows, _ = run_stage(
+        StageCache(cache_dir, cache_max_bytes), "sweep_point",
+        {"point": point_index, "parameters": parameters, "seed": seed, "metrics": metrics,
+         "experimental_data": experimental_digest,
+         "config": {name: config[name] for name in ENSEMBLE_CONFIG_KEYS}},
+        lambda: _simulate_sweep_point(point_index, parameters, seed, metrics, experimental_data, config),
+    )
+    return rows
+
+
+def run_sweep(grid, base_parameters=None, max_workers=None, metrics=["variance", "Fano_factor", "CV", "CRI"],
+              experimental_data=None, cache_dir=None, cache_max_bytes=None, checkpoint_path=None,
+              checkpoint_interval=300, resume=False, config=None):
+    """
+    Runs the simulation for every point of a parameter grid across a process pool.
+
+    Parameters:
+        grid (dict): Mapping of sweep parameter names to lists of values (see `SWEEP_PARAMETERS`).
+        base_parameters (dict): Fixed simulation parameters overriding the configuration defaults
+            (num_cycles, num_replicates, nutrient_levels, robust_codons, sensitive_codons, seed, ...).
+            Every point draws from its own child of the root seed, so results do not depend on `max_workers`.
+        max_workers (int): Maximum number of worker processes; None uses the CPU count, 1 runs in-process.
+        metrics (list): List of metrics to calculate (options: "variance", "Fano_factor", "CV", "CRI").
+        experimental_data (pd.DataFrame): Optional benchmarks used to validate every replicate.
+        cache_dir (str): Stage cache directory; completed points of a seeded sweep are reused from it.
+        cache_max_bytes (int): Size limit of the stage cache; None keeps every entry.
+        checkpoint_path (str): Checkpoint file recording completed points; None disables checkpointing.
+            Removed once the sweep completes.
+        checkpoint_interval (float): Minimum seconds between checkpoints (0 saves after every point).
+        resume (bool): If True, only run the points missing from the checkpoint at `checkpoint_path`.
+        config (SimulationConfig): Run configuration (e.g. a `with_()` variant), sent to every worker;
+            None uses `get_config()`. Cached points and checkpoints are keyed on its `ENSEMBLE_CONFIG_KEYS`
+            values only, so settings that do not affect the ensemble do not invalidate them.
+
+    Returns:
+        pd.DataFrame: Tidy table with one row per point, replicate, codon and metric, plus one row per
+            validation statistic (with an empty codon) when `experimental_data` is given.
+
+    Raises:
+        ValueError: If the checkpoint was written by a sweep with different parameters.
+    """
+    config = get_config() if config is None else config
+    points = expand_grid(grid)
+    base_parameters = {**_default_base_parameters(config), **(base_parameters or {})}
+    experimental_digest = None
+    if experimental_data is not None:
+        experimental_digest = hashlib.sha256(
+            pd.util.hash_pandas_object(experimental_data, index=True).to_numpy().tobytes()
+        ).hexdigest()
+
+    fingerprint = run_fingerprint("sweep", {
+        "grid": grid, "base_parameters": base_parameters, "metrics": metrics,
+        "experimental_data": experimental_digest,
+        "config": {name: config[name] for name in ENSEMBLE_CONFIG_KEYS},
+    })
+    checkpoint = load_checkpoint(checkpoint_path, fingerprint) if resume and checkpoint_path else None
+    if checkpoint is not None:
+        # Reuse the original point seeds, so unseeded sweeps also resume exactly
+        point_seeds, completed = checkpoint["point_seeds"], checkpoint["completed"]
+    else:
+        point_seeds, completed = spawn_seeds(base_parameters["seed"], len(points)), {}
+
+    # Unseeded sweeps are never cached, since their results cannot be reproduced
+    cache_settings = None
+    if cache_dir and base_parameters["seed"] is not None:
+        cache_settings = (cache_dir, cache_max_bytes, experimental_digest)
+
+    tasks = [(index, point, point_seeds[index], base_parameters, metrics, experimental_data, cache_settings, config)
+             for index, point in enumerate(points) if index not in completed]
+    checkpointer = Checkpointer(checkpoint_path, fingerprint, checkpoint_interval)
+
+    def record(results):
+        for task, rows in zip(tasks, results):
+            completed[task[0]] = rows
+            checkpointer.maybe_save(lambda: {"point_seeds": point_seeds, "completed": completed})
+
+    max_workers = min(max_workers or os.cpu_count() or 1, len(tasks))
+    if max_workers == 1:
+        record(_run_sweep_point(task) for task in tasks)
+    elif max_workers > 1:
+        # Batch several points per task so small points don't pay per-task IPC costs
+        chunksize = max(1, len(tasks) // (max_workers * 4))
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            record(executor.map(_run_sweep_point, tasks, chunksize=chunksize))
+    remove_checkpoint(checkpoint_path)
+
+    return pd.concat([completed[index] for index in range(len(points))], ignore_index=True)
+
+
+def parse_sweep_arguments(args, config=None):
+    """
+    Parses `--key value` command-line arguments into a sweep grid and run options.
+
+    Swept parameters take comma-separated values (e.g. `--rnase_activity 0.01,0.05,0.1`).
+
+    Parameters:
+        args (list of str): Command-line arguments without the script name.
+        config (SimulationConfig): Run configuration supplying the defaults; None uses `get_config()`.
+
+    Returns:
+        dict: A dictionary containing "grid", "base_parameters", "max_workers", "output_file" (without extension),
+            "output_format" and "resume".
+    """
+    config = get_config() if config is None else config
+    args_dict = {}
+    for i in range(len(args)):
+        if args[i].startswith("--") and i + 1 < len(args) and not args[i + 1].startswith("--"):
+            args_dict[args[i][2:]] = args[i + 1]
+
+    grid = {name: [float(value) for value in args_dict[name].split(",")]
+            for name in SWEEP_PARAMETERS if name in args_dict}
+
+    base_parameters = {}
+    if "num_cycles" in args_dict:
+        base_parameters["num_cycles"] = int(args_dict["num_cycles"])
+    if "num_replicates" in args_dict:
+        base_parameters["num_replicates"] = int(args_dict["num_replicates"])
+    if "nutrient_levels" in args_dict:
+        base_parameters["nutrient_levels"] = [float(value) for value in args_dict["nutrient_levels"].split(",")]
+    if "robust_codons" in args_dict:
+        base_parameters["robust_codons"] = args_dict["robust_codons"].split(",")
+    if "sensitive_codons" in args_dict:
+        base_parameters["sensitive_codons"] = args_dict["sensitive_codons"].split(",")
+    if "seed" in args_dict:
+        base_parameters["seed"] = int(args_dict["seed"])
+
+    # The table format comes from --output_format, else the output file extension, else the configuration
+    output_name, extension = os.path.splitext(args_dict.get("output_file", "sweep_results"))
+    inferred_format = extension[1:] if extension[1:] in TABLE_WRITERS else config["output_format"]
+
+    return {
+        "grid": grid,
+        "base_parameters": base_parameters,
+        "max_workers": int(args_dict["max_workers"]) if "max_workers" in args_dict else config["max_workers"],
+        "output_file": output_name if extension[1:] in TABLE_WRITERS else output_name + extension,
+        "output_format": args_dict.get("output_format", inferred_format),
+        "resume": "--resume" in args,
+    }
+
+
+def main():
+    # Other configuration parameters given on the command line override the defaults of every point
+    config = get_run_config(sys.argv[1:], exclude=SWEEP_PARAMETERS + ["num_replicates", "seed", "max_workers",
+                                                                      "output_file", "output_format"])
+    options = parse_sweep_arguments(sys.argv[1:], config)
+    if not options["grid"]:
+        print(f"No sweep parameters given. Use any of: {', '.join('--' + name for name in SWEEP_PARAMETERS)}")
+        sys.exit(1)
+
+    experimental_data = None
+    if config["experimental_data_path"]:
+        from experimental_data import load_experimental_data, select_condition
+
+        experimental_data = select_condition(load_experimental_data(config["experimental_data_path"]),
+                                             config["experimental_condition"])
+
+    print(f"Running sweep over {len(expand_grid(options['grid']))} points...")
+    results = run_sweep(options["grid"], options["base_parameters"], options["max_workers"], config["metrics"],
+                        experimental_data=experimental_data,
+                        cache_dir=config["cache_dir"], cache_max_bytes=config["cache_max_bytes"],
+                        checkpoint_path=os.path.join(config["output_path"], "sweep_checkpoint.pkl"),
+                        checkpoint_interval=config["checkpoint_interval"], resume=options["resume"],
+                        config=config)
+    save_table(results, options["output_file"], config["output_path"], options["output_format"])
+
+
+if __name__ == "__main__":
+    main()
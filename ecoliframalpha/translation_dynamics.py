@@ -1,9 +1,111 @@
+from functools import lru_cache
 import numpy as np
-import pandas as pd
-from scipy.special import expit  # For modeling Hill functions
 from config.config import get_config
+from utils import encode_nutrient_levels
 
-def simulate_translation(initialization_results):
+def _logistic(values):
+    """
+    Numerically stable logistic function 1 / (1 + exp(-x)), used to model the Hill response.
+    """
+    return 0.5 * (1.0 + np.tanh(0.5 * values))
+
+
+def translation_efficiency_matrix(nutrient_values, codon_efficiency, max_efficiency, min_efficiency,
+                                  hill_coefficient, nutrient_threshold):
+    """
+    Computes Hill-function translation efficiencies for all cycles and codons at once.
+
+    Parameters:
+        nutrient_values (array-like): Nutrient level of every cycle.
+        codon_efficiency (dict): Dictionary mapping codons to their "base_efficiency" and "type".
+        max_efficiency (float): Maximum codon efficiency under optimal conditions.
+        min_efficiency (float): Lower bound applied to every efficiency.
+        hill_coefficient (float): Hill function steepness.
+        nutrient_threshold (float): Nutrient level for half-maximal efficiency.
+
+    Returns:
+        np.ndarray: Array of shape (cycles, codons), with codons in `codon_efficiency` order.
+    """
+    nutrient_values = np.asarray(nutrient_values, dtype=float)
+    types = [properties["type"] for properties in codon_efficiency.values()]
+    base_efficiency = np.array([properties["base_efficiency"] for properties in codon_efficiency.values()], dtype=float)
+    sensitive = np.array([codon_type == "sensitive" for codon_type in types], dtype=bool)
+    scaled = np.array([codon_type in ("robust", "sensitive") for codon_type in types], dtype=bool)
+
+    # Codons of unknown type keep the raw Hill response
+    scale = np.where(scaled, base_efficiency, 1.0)
+    response = max_efficiency * _logistic(hill_coefficient * (nutrient_values - nutrient_threshold))
+    efficiencies = np.multiply.outer(response, scale)
+
+    # Sensitive codons degrade with stress
+    if sensitive.any():
+        efficiencies[:, sensitive] *= nutrient_values[:, None]
+
+    # Ensure efficiency doesn't drop below min_efficiency
+    np.maximum(efficiencies, min_efficiency, out=efficiencies)
+    return efficiencies
+
+
+@lru_cache(maxsize=32)
+def _cached_response_table(nutrient_levels, codon_classes, max_efficiency, min_efficiency,
+                           hill_coefficient, nutrient_threshold):
+    """
+    Builds (and memoizes) the levels x codon-classes response table for one set of Hill parameters.
+    """
+    class_properties = {
+        position: {"type": codon_type, "base_efficiency": base_efficiency}
+        for position, (codon_type, base_efficiency) in enumerate(codon_classes)
+    }
+    table = translation_efficiency_matrix(
+        nutrient_levels, class_properties, max_efficiency, min_efficiency, hill_coefficient, nutrient_threshold
+    )
+    table.setflags(write=False)  # Shared between runs, so it must never be modified
+    return table
+
+
+def hill_response_table(nutrient_levels, codon_efficiency, max_efficiency, min_efficiency,
+                        hill_coefficient, nutrient_threshold):
+    """
+    Returns the precomputed Hill response of every codon at every discrete nutrient level.
+
+    The table is built once per codon class (type plus base efficiency) and cached on the
+    nutrient levels and Hill parameters, so repeated runs with the same parameters reuse it
+    and a parameter change always produces a fresh table.
+
+    Parameters:
+        nutrient_levels (list of float): List of possible nutrient levels.
+        codon_efficiency (dict): Dictionary mapping codons to their "base_efficiency" and "type".
+        max_efficiency (float): Maximum codon efficiency under optimal conditions.
+        min_efficiency (float): Lower bound applied to every efficiency.
+        hill_coefficient (float): Hill function steepness.
+        nutrient_threshold (float): Nutrient level for half-maximal efficiency.
+
+    Returns:
+        np.ndarray: Array of shape (levels, codons), with codons in `codon_efficiency` order.
+    """
+    codon_classes = []
+    class_index = []
+    for properties in codon_efficiency.values():
+        codon_class = (properties["type"], float(properties["base_efficiency"]))
+        if codon_class not in codon_classes:
+            codon_classes.append(codon_class)
+        class_index.append(codon_classes.index(codon_class))
+
+    table = _cached_response_table(
+        tuple(float(level) for level in nutrient_levels), tuple(codon_classes),
+        float(max_efficiency), float(min_efficiency), float(hill_coefficient), float(nutrient_threshold),
+    )
+    return table[:, class_index]
+
+
+def clear_response_tables():
+    """
+    Evicts every cached Hill response table.
+    """
+    _cached_response_table.cache_clear()
+
+
+def simulate_translation(initialization_results, config=None):
     """
     Simulates the translation dynamics across cycles using a Hill function.
 
@@ -12,6 +114,7 @@ def simulate_translation(initialization_results):
             - "simulation_data" (pd.DataFrame): Tracks translation efficiency over cycles.
             - "codon_efficiency" (dict): Dictionary with baseline efficiency values.
             - "nutrient_levels" (list of float): Available nutrient levels.
+        config (SimulationConfig): Run configuration (e.g. a `with_()` variant); None uses `get_config()`.
 
     Returns:
         pd.DataFrame: Updated DataFrame with simulated codon translation efficiencies.
@@ -19,7 +122,7 @@ def simulate_translation(initialization_results):
     Raises:
         ValueError: If required keys are missing from `initialization_results`.
     """
-    config = get_config()
+    config = get_config() if config is None else config
 
     # Validate required keys
     required_keys = ["simulation_data", "codon_efficiency", "nutrient_levels"]
@@ -37,29 +140,47 @@ def simulate_translation(initialization_results):
     hill_coefficient = config["hill_coefficient"]   # Hill function steepness
     nutrient_threshold = config["nutrient_threshold"]  # Nutrient level threshold for half-maximal efficiency
 
-    # Iterate over each cycle in the simulation
-    for index, nutrient_level in enumerate(simulation_data["nutrient_levels"]):
+    # Gather from the per-level response table when every cycle sits on a known level
+    nutrient_values = simulation_data["nutrient_levels"].to_numpy(dtype=float)
+    level_codes = encode_nutrient_levels(nutrient_values, initialization_results["nutrient_levels"])
+    if len(level_codes) and (level_codes >= 0).all():
+        table = hill_response_table(
+            initialization_results["nutrient_levels"], codon_efficiency,
+            max_efficiency, min_efficiency, hill_coefficient, nutrient_threshold,
+        )
+        efficiencies = np.take(table, level_codes, axis=0)
+    else:
+        # Otherwise compute every cycle and codon in one broadcast pass
+        efficiencies = translation_efficiency_matrix(
+            nutrient_values, codon_efficiency, max_efficiency, min_efficiency, hill_coefficient, nutrient_threshold
+        )
+
+    # Write each codon column back in a single assignment
+    for position, codon in enumerate(codon_efficiency):
+        simulation_data[f"{codon}_efficiency"] = efficiencies[:, position]
 
-        # Update codon efficiencies
-        for codon, properties in codon_efficiency.items():
-            base_efficiency = properties["base_efficiency"]  # Reset to base value every row
-            
-            # Compute new efficiency from scratch
-            efficiency = max_efficiency * expit(hill_coefficient * (nutrient_level - nutrient_threshold))
+    print("Translation simulation completed successfully.")
+    return simulation_data
 
-            if properties["type"] == "robust":
-                efficiency = efficiency * base_efficiency  
-            elif properties["type"] == "sensitive":
-                efficiency = efficiency * base_efficiency * nutrient_level  # Sensitive codons degrade with stress
 
-            # Ensure efficiency doesn't drop below min_efficiency
-            efficiency = max(efficiency, min_efficiency)
+def translate_state(state, config=None):
+    """
+    Simulates translation dynamics in place on an array-backed simulation state.
 
-            # update only the current row
-            simulation_data.loc[index, f"{codon}_efficiency"] = efficiency
+    Parameters:
+        state (SimulationState): State from `initialize_state`; its efficiencies are overwritten.
+        config (SimulationConfig): Run configuration (e.g. a `with_()` variant); None uses `get_config()`.
 
-    print("Translation simulation completed successfully.")
-    return simulation_data
+    Returns:
+        SimulationState: The same state with updated codon translation efficiencies.
+    """
+    config = get_config() if config is None else config
+    table = hill_response_table(
+        state.nutrient_levels, state.codon_efficiency,
+        config["max_efficiency"], config["min_efficiency"], config["hill_coefficient"], config["nutrient_threshold"],
+    )
+    np.take(table.astype(state.efficiencies.dtype, copy=False), state.nutrient_codes, axis=0, out=state.efficiencies)
+    return state
 
 
 if __name__ == "__main__":
@@ -42,6 +42,7 @@ def save_to_csv(dataframe, filename, output_path="results/"):
     try:
         dataframe.to_csv(file_path, index=False)
         print(f"CSV saved to: {file_path}")
+        return file_path
     except Exception as e:
         print(f"Failed to save CSV to {file_path}: {e}")
         raise
@@ -70,6 +71,189 @@ def save_to_json(data, filename, output_path="results/"):
         print(f"Failed to save JSON to {file_path}: {e}")
         raise
 
+def _require_pyarrow(output_format):
+    """
+    Checks that the optional pyarrow dependency needed for Parquet and Feather files is installed.
+
+    Raises:
+        ImportError: If pyarrow is not installed.
+    """
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        raise ImportError(f"{output_format} output requires the optional 'pyarrow' package (pip install pyarrow).") from None
+
+def _column_array(series):
+    """
+    Converts a DataFrame column into a numpy array that can be saved without pickling.
+
+    Raises:
+        ValueError: If the column holds objects other than strings.
+    """
+    values = series.to_numpy()
+    if values.dtype.kind == "O" or isinstance(series.dtype, pd.StringDtype):
+        if not all(isinstance(value, str) for value in values):
+            raise ValueError(f"Column '{series.name}' cannot be stored as a numpy array.")
+        values = values.astype(str)
+    return values
+
+def save_to_parquet(dataframe, filename, output_path="results/", compression="zstd"):
+    """
+    Saves a DataFrame to a compressed Parquet file with typed columns.
+
+    Parameters:
+        dataframe (pd.DataFrame): DataFrame to save.
+        filename (str): Name of the file.
+        output_path (str): Path to save the file.
+        compression (str): Parquet compression codec.
+
+    Raises:
+        ImportError: If the optional pyarrow package is not installed.
+    """
+    _require_pyarrow("Parquet")
+    ensure_output_directory(output_path)
+    file_path = os.path.join(output_path, filename)
+    dataframe.to_parquet(file_path, index=False, compression=compression)
+    print(f"Parquet saved to: {file_path}")
+    return file_path
+
+def save_to_feather(dataframe, filename, output_path="results/", compression="uncompressed"):
+    """
+    Saves a DataFrame to a Feather (Arrow IPC) file. Uncompressed files can be memory-mapped back.
+
+    Parameters:
+        dataframe (pd.DataFrame): DataFrame to save.
+        filename (str): Name of the file.
+        output_path (str): Path to save the file.
+        compression (str): "uncompressed", "lz4" or "zstd".
+
+    Raises:
+        ImportError: If the optional pyarrow package is not installed.
+    """
+    _require_pyarrow("Feather")
+    ensure_output_directory(output_path)
+    file_path = os.path.join(output_path, filename)
+    dataframe.reset_index(drop=True).to_feather(file_path, compression=compression)
+    print(f"Feather saved to: {file_path}")
+    return file_path
+
+def save_to_npz(dataframe, filename, output_path="results/"):
+    """
+    Saves the columns of a DataFrame as arrays of one uncompressed NPZ archive.
+
+    Parameters:
+        dataframe (pd.DataFrame): DataFrame to save.
+        filename (str): Name of the file.
+        output_path (str): Path to save the file.
+
+    Raises:
+        ValueError: If a column holds objects other than strings.
+    """
+    ensure_output_directory(output_path)
+    file_path = os.path.join(output_path, filename)
+    arrays = {str(column): _column_array(dataframe[column]) for column in dataframe.columns}
+    with open(file_path, "wb") as file:
+        np.savez(file, **arrays)
+    print(f"NPZ saved to: {file_path}")
+    return file_path
+
+def save_to_npy(dataframe, dirname, output_path="results/"):
+    """
+    Saves every column of a DataFrame as a raw `.npy` file in its own directory, so columns can be memory-mapped.
+
+    Parameters:
+        dataframe (pd.DataFrame): DataFrame to save.
+        dirname (str): Name of the directory holding one `<column>.npy` file per column.
+        output_path (str): Path to save the directory.
+
+    Raises:
+        ValueError: If a column holds objects other than strings.
+    """
+    directory = os.path.join(output_path, dirname)
+    ensure_output_directory(directory)
+    columns = [str(column) for column in dataframe.columns]
+    for column in columns:
+        np.save(os.path.join(directory, f"{column}.npy"), _column_array(dataframe[column]))
+    with open(os.path.join(directory, "columns.json"), "w") as file:
+        json.dump(columns, file)
+    print(f"NPY columns saved to: {directory}")
+    return directory
+
+# Writers selectable through config["output_format"]: format -> (writer, file extension)
+TABLE_WRITERS = {
+    "csv": (save_to_csv, ".csv"),
+    "parquet": (save_to_parquet, ".parquet"),
+    "feather": (save_to_feather, ".feather"),
+    "npz": (save_to_npz, ".npz"),
+    "npy": (save_to_npy, ""),
+}
+
+def save_table(dataframe, name, output_path="results/", output_format="csv"):
+    """
+    Saves a DataFrame in one of the `TABLE_WRITERS` formats.
+
+    Parameters:
+        dataframe (pd.DataFrame): DataFrame to save.
+        name (str): File name without extension (directory name for "npy").
+        output_path (str): Path to save the file.
+        output_format (str): "csv", "parquet", "feather", "npz" or "npy".
+
+    Returns:
+        str: Path of the written file or directory.
+
+    Raises:
+        ValueError: If the format is unknown.
+    """
+    if output_format not in TABLE_WRITERS:
+        raise ValueError(f"output_format must be one of {', '.join(TABLE_WRITERS)}.")
+    writer, extension = TABLE_WRITERS[output_format]
+    return writer(dataframe, f"{name}{extension}", output_path)
+
+def load_columns(path, mmap_mode="r"):
+    """
+    Loads the columns written by `save_to_npy` or `save_to_npz` without copying them into memory.
+
+    Parameters:
+        path (str): `.npz` file or directory of `.npy` column files.
+        mmap_mode (str): Memory-map mode for `.npy` columns (None reads them into memory).
+
+    Returns:
+        dict: Column name -> array; `.npy` columns are memory-mapped, `.npz` columns are read on access.
+    """
+    if os.path.isdir(path):
+        with open(os.path.join(path, "columns.json")) as file:
+            columns = json.load(file)
+        return {column: np.load(os.path.join(path, f"{column}.npy"), mmap_mode=mmap_mode) for column in columns}
+    archive = np.load(path)
+    return {column: archive[column] for column in archive.files}
+
+def load_table(path):
+    """
+    Loads a table written by `save_table`, choosing the reader from the file extension.
+
+    Parquet and Feather files are memory-mapped while being read.
+
+    Parameters:
+        path (str): File (or "npy" directory) to read.
+
+    Returns:
+        pd.DataFrame: The loaded table.
+
+    Raises:
+        ValueError: If the format cannot be recognized.
+    """
+    if os.path.isdir(path) or path.endswith(".npz"):
+        return pd.DataFrame(load_columns(path))
+    if path.endswith(".csv"):
+        return pd.read_csv(path)
+    if path.endswith(".parquet"):
+        _require_pyarrow("Parquet")
+        return pd.read_parquet(path, memory_map=True)
+    if path.endswith(".feather"):
+        _require_pyarrow("Feather")
+        return pd.read_feather(path, memory_map=True)
+    raise ValueError(f"Unrecognized table format: {path}")
+
 def normalize_data(series):
     """
     Normalizes a pandas Series to a range of [0, 1].
@@ -155,3 +339,78 @@ def save_summary_to_file(summary, filename="simulation_summary.txt", output_path
     except Exception as e:
         print(f"Failed to save summary to {file_path}: {e}")
         raise
+
+def encode_nutrient_levels(values, nutrient_levels):
+    """
+    Encodes nutrient values as integer indices into the list of discrete nutrient levels.
+
+    Parameters:
+        values (array-like): Nutrient value of every cycle.
+        nutrient_levels (list of float): List of possible nutrient levels.
+
+    Returns:
+        np.ndarray: Integer array with the position of each value in `nutrient_levels`, or -1 if it is not a level.
+
+    Example:
+        >>> encode_nutrient_levels([0.5, 1.0, 0.3], [1.0, 0.75, 0.5])
+        array([ 2,  0, -1])
+    """
+    values = np.asarray(values, dtype=float)
+    levels = np.asarray(nutrient_levels, dtype=float)
+    if levels.size == 0:
+        return np.full(values.shape, -1, dtype=np.int64)
+
+    # Binary search against the sorted levels, then map back to list positions
+    order = np.argsort(levels, kind="stable")
+    sorted_levels = levels[order]
+    positions = np.clip(np.searchsorted(sorted_levels, values), 0, len(levels) - 1)
+    matched = sorted_levels[positions] == values
+    return np.where(matched, order[positions], -1)
+
+def make_rng(rng=None):
+    """
+    Returns a numpy random Generator for a stochastic stage.
+
+    Parameters:
+        rng (np.random.Generator, int, np.random.SeedSequence or None): An existing Generator is returned
+            unchanged; a seed or SeedSequence creates a new one. None seeds a new Generator from the global
+            `np.random` state, so `np.random.seed` still makes unseeded runs reproducible.
+
+    Returns:
+        np.random.Generator: Generator backed by a SeedSequence that can spawn child streams.
+
+    Example:
+        >>> make_rng(42).integers(10, size=3)
+    """
+    if isinstance(rng, np.random.Generator):
+        return rng
+    if rng is None:
+        rng = np.random.randint(np.iinfo(np.int64).max, dtype=np.int64)
+    return np.random.default_rng(rng)
+
+def spawn_seeds(rng, count):
+    """
+    Spawns independent child SeedSequences, e.g. one per stage, replicate or sweep point.
+
+    Children depend only on the parent seed and their position, so work seeded from them gives
+    the same results whatever process or order it runs in.
+
+    Parameters:
+        rng (np.random.Generator, int, np.random.SeedSequence or None): Parent stream (see `make_rng`).
+        count (int): Number of children.
+
+    Returns:
+        list of np.random.SeedSequence: The child seed sequences (picklable).
+    """
+    if isinstance(rng, np.random.SeedSequence):
+        return rng.spawn(count)
+    return make_rng(rng).bit_generator.seed_seq.spawn(count)
+
+def spawn_rngs(rng, count):
+    """
+    Spawns independent child Generators (see `spawn_seeds`).
+
+    Returns:
+        list of np.random.Generator: The child generators.
+    """
+    return [np.random.default_rng(seed) for seed in spawn_seeds(rng, count)]
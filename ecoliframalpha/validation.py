@@ -1,20 +1,89 @@
 import numpy as np
 import pandas as pd
-from scipy.stats import pearsonr
-from sklearn.metrics import mean_squared_error
+from utils import make_rng
+from experimental_data import align_experimental_data
 
-def validate_simulation(variability_results, experimental_data, metrics=["variance", "Fano_factor", "CV", "CRI"]):
+
+def batched_statistics(simulated, experimental):
+    """
+    Pearson correlation and mean squared error of every row of two (samples, points) arrays.
+
+    Rows with a constant side get a NaN correlation.
+
+    Parameters:
+        simulated (np.ndarray): Simulated values, one sample per row.
+        experimental (np.ndarray): Experimental values paired with `simulated`.
+
+    Returns:
+        tuple: (correlation, mean_squared_error) arrays with one value per row.
+    """
+    simulated_centered = simulated - simulated.mean(axis=-1, keepdims=True)
+    experimental_centered = experimental - experimental.mean(axis=-1, keepdims=True)
+    covariance = np.einsum("...i,...i->...", simulated_centered, experimental_centered)
+    scale = np.sqrt(np.einsum("...i,...i->...", simulated_centered, simulated_centered)
+                    * np.einsum("...i,...i->...", experimental_centered, experimental_centered))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        correlation = np.where(scale > 0, covariance / scale, np.nan)
+    mse = np.mean((experimental - simulated) ** 2, axis=-1)
+    return np.clip(correlation, -1.0, 1.0), mse
+
+
+def _percentile_interval(values, confidence_level):
+    """
+    Percentile interval of bootstrap replicates, ignoring undefined (NaN) replicates.
+    """
+    tail = (1 - confidence_level) / 2 * 100
+    if np.all(np.isnan(values)):
+        return [np.nan, np.nan]
+    low, high = np.nanpercentile(values, [tail, 100 - tail])
+    return [float(low), float(high)]
+
+
+def validate_simulation(variability_results, experimental_data, metrics=["variance", "Fano_factor", "CV", "CRI"],
+                        n_bootstrap=0, n_permutations=0, confidence_level=0.95, rng=None, condition=None):
     """
     Validates simulation results against experimental data.
 
+    When both tables identify codons, benchmarks are matched to simulated codons with a hash join
+    (see `experimental_data.align_experimental_data`); otherwise rows are paired by position.
+
+    Optionally adds bootstrap confidence intervals and permutation p-values for the correlation and
+    mean squared error. All resamples of a metric are drawn as one (resamples, codons) index matrix
+    and evaluated in a single batched pass; metrics with the same number of codons share that matrix.
+
     Parameters:
         variability_results (pd.DataFrame): DataFrame containing variability metrics for each codon.
         experimental_data (pd.DataFrame): DataFrame containing experimental benchmarks for the same codons.
         metrics (list): List of metrics to validate (options: "variance", "Fano_factor", "CV", "CRI").
+        n_bootstrap (int): Number of bootstrap resamples of the codons (0 skips the confidence intervals).
+        n_permutations (int): Number of random pairings of simulated and experimental values
+            (0 skips the p-values).
+        confidence_level (float): Coverage of the bootstrap percentile intervals (0 < level < 1).
+        rng (np.random.Generator): Random stream for the resamples (see `utils.make_rng`).
+        condition (str): Experimental condition to validate against, for benchmarks with several conditions.
 
     Returns:
         dict: A dictionary summarizing validation results, including correlation coefficients and errors.
+            With resampling enabled, each metric also holds "correlation_ci" and "mean_squared_error_ci"
+            ([low, high]), and "correlation_p_value" (two-sided, |r|) and "mean_squared_error_p_value"
+            (probability of an error this low under random pairing).
+
+    Raises:
+        ValueError: If a resampling parameter is invalid, or the benchmark condition is ambiguous or unknown.
     """
+    for name, value in (("n_bootstrap", n_bootstrap), ("n_permutations", n_permutations)):
+        if not isinstance(value, int) or value < 0:
+            raise ValueError(f"{name} must be a non-negative integer.")
+    if not (0 < confidence_level < 1):
+        raise ValueError("confidence_level must be between 0 and 1.")
+    if n_bootstrap or n_permutations:
+        rng = make_rng(rng)
+    bootstrap_indices, permutation_indices = {}, {}
+
+    if "codon" in variability_results.columns and (
+            "codon" in experimental_data.columns or "codon" in experimental_data.index.names):
+        experimental_data = align_experimental_data(variability_results, experimental_data, condition)
+
     validation_results = {}
 
     for metric in metrics:
@@ -22,8 +91,8 @@ def validate_simulation(variability_results, experimental_data, metrics=["varian
             validation_results[metric] = f"Metric {metric} missing in variability results or experimental data."
             continue
         else:
-            simulated = variability_results[metric].to_numpy()
-            experimental = experimental_data[metric].to_numpy()
+            simulated = variability_results[metric].to_numpy(dtype=float)
+            experimental = experimental_data[metric].to_numpy(dtype=float)
 
         #  Remove NaN values in one step
         mask = ~np.isnan(simulated) & ~np.isnan(experimental)
@@ -41,8 +110,8 @@ def validate_simulation(variability_results, experimental_data, metrics=["varian
             continue
 
         # Calculate Pearson correlation and MSE
-        correlation, _ = pearsonr(simulated, experimental)
-        mse = mean_squared_error(experimental, simulated)
+        correlation = np.corrcoef(simulated, experimental)[0, 1]
+        mse = np.mean((experimental - simulated) ** 2)
 
         # Store validation results
         validation_results[metric] = {
@@ -52,6 +121,30 @@ def validate_simulation(variability_results, experimental_data, metrics=["varian
             "experimental_mean": np.mean(experimental),
         }
 
+        num_points = len(simulated)
+        if n_bootstrap:
+            if num_points not in bootstrap_indices:
+                bootstrap_indices[num_points] = rng.integers(0, num_points, size=(n_bootstrap, num_points))
+            indices = bootstrap_indices[num_points]
+            correlations, errors = batched_statistics(simulated[indices], experimental[indices])
+            validation_results[metric]["correlation_ci"] = _percentile_interval(correlations, confidence_level)
+            validation_results[metric]["mean_squared_error_ci"] = _percentile_interval(errors, confidence_level)
+        if n_permutations:
+            if num_points not in permutation_indices:
+                permutation_indices[num_points] = rng.permuted(
+                    np.broadcast_to(np.arange(num_points), (n_permutations, num_points)), axis=1
+                )
+            correlations, errors = batched_statistics(simulated, experimental[permutation_indices[num_points]])
+            # Observed values from the same arithmetic, so an identity pairing ties exactly
+            observed_correlation, observed_mse = batched_statistics(simulated, experimental)
+            # Add-one estimates, so a p-value is never exactly zero
+            validation_results[metric]["correlation_p_value"] = float(
+                (1 + np.sum(np.abs(correlations) >= abs(observed_correlation))) / (n_permutations + 1)
+            )
+            validation_results[metric]["mean_squared_error_p_value"] = float(
+                (1 + np.sum(errors <= observed_mse)) / (n_permutations + 1)
+            )
+
     return validation_results
 
 
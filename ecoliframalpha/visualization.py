@@ -1,98 +1,321 @@
 import os
+from concurrent.futures import ProcessPoolExecutor
 import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
+from simulation_state import is_simulation_state
+from plot_summary import PlotSummary
 
-def generate_visualizations(variability_results, stressed_results, validation_results, output_path="results/"):
+
+def rolling_mean(values, window=10):
+    """
+    Trailing rolling mean, back-filled so the first `window - 1` cycles are not blank.
+
+    Matches `pd.Series.rolling(window).mean().bfill()` column by column, computed with
+    cumulative sums over all columns at once and without modifying the input.
+
+    Parameters:
+        values (np.ndarray): 1-D series or 2-D array with one column per series.
+        window (int): Number of cycles averaged.
+
+    Returns:
+        np.ndarray: Smoothed values with the shape of `values`.
+    """
+    if window < 1:
+        raise ValueError("window must be a positive integer.")
+    values = np.asarray(values, dtype=float)
+    columns = values.reshape(len(values), -1)
+    num_rows = len(columns)
+    means = np.full(columns.shape, np.nan)
+    if num_rows >= window:
+        # Windows containing a NaN stay NaN, as in pandas
+        valid = ~np.isnan(columns)
+        sums = np.zeros((num_rows + 1, columns.shape[1]))
+        counts = np.zeros((num_rows + 1, columns.shape[1]), dtype=np.int64)
+        np.cumsum(np.where(valid, columns, 0.0), axis=0, out=sums[1:])
+        np.cumsum(valid, axis=0, out=counts[1:])
+        window_counts = counts[window:] - counts[:-window]
+        means[window - 1:] = np.where(window_counts == window, (sums[window:] - sums[:-window]) / window, np.nan)
+
+    # Back-fill: every NaN takes the next valid value below it
+    rows = np.where(np.isnan(means), num_rows, np.arange(num_rows)[:, None])
+    rows = np.minimum.accumulate(rows[::-1], axis=0)[::-1]
+    padded = np.vstack([means, np.full((1, columns.shape[1]), np.nan)])
+    return np.take_along_axis(padded, rows, axis=0).reshape(values.shape)
+
+
+def minmax_decimate(x, y, num_bins):
+    """
+    Downsamples a series to the minimum and maximum of each of `num_bins` equal bins.
+
+    Every excursion of the series stays visible, which suits step-like series such as nutrient levels.
+
+    Parameters:
+        x (np.ndarray): Sample positions.
+        y (np.ndarray): Sample values.
+        num_bins (int): Number of bins; at most `2 * num_bins` points are returned.
+
+    Returns:
+        tuple: (x, y) of the retained points, in their original order.
+    """
+    if num_bins < 1:
+        raise ValueError("num_bins must be a positive integer.")
+    x = np.asarray(x)
+    y = np.asarray(y, dtype=float)
+    num_points = len(y)
+    if 2 * num_bins >= num_points:
+        return x, y
+
+    # Pad to equal-width bins with the last value so the bins can be reduced as one 2-D array
+    width = -(-num_points // num_bins)
+    padded = np.full(num_bins * width, y[-1])
+    padded[:num_points] = y
+    bins = padded.reshape(num_bins, width)
+    nan = np.isnan(bins)
+    lowest = np.argmin(np.where(nan, np.inf, bins), axis=1)
+    highest = np.argmax(np.where(nan, -np.inf, bins), axis=1)
+
+    offsets = np.arange(num_bins) * width
+    indices = np.sort(np.stack([lowest, highest], axis=1), axis=1) + offsets[:, None]
+    indices = np.unique(np.minimum(indices.ravel(), num_points - 1))
+    return x[indices], y[indices]
+
+
+def lttb_decimate(x, y, num_points):
+    """
+    Downsamples a series with Largest-Triangle-Three-Buckets.
+
+    The first and last points are kept; every bucket in between keeps the point forming the largest
+    triangle with the previously kept point and the mean of the next bucket, which preserves the
+    visual shape of smooth series.
+
+    Parameters:
+        x (np.ndarray): Sample positions.
+        y (np.ndarray): Sample values.
+        num_points (int): Number of points returned (at least 3).
+
+    Returns:
+        tuple: (x, y) of the retained points, in their original order.
+    """
+    if num_points < 3:
+        raise ValueError("num_points must be at least 3.")
+    x = np.asarray(x)
+    y = np.asarray(y, dtype=float)
+    total = len(y)
+    if num_points >= total:
+        return x, y
+
+    positions = x.astype(float)
+    # Interior points split into num_points - 2 buckets; the last point is its own bucket
+    edges = np.append(np.linspace(1, total - 1, num_points - 1).astype(np.intp), total)
+    bucket_x = np.add.reduceat(positions, edges[:-1]) / np.diff(edges)
+    bucket_y = np.add.reduceat(y, edges[:-1]) / np.diff(edges)
+
+    selected = np.empty(num_points, dtype=np.intp)
+    selected[0], selected[-1] = 0, total - 1
+    previous = 0
+    for bucket in range(num_points - 2):
+        start, stop = edges[bucket], edges[bucket + 1]
+        next_x, next_y = bucket_x[bucket + 1], bucket_y[bucket + 1]
+        areas = np.abs((positions[previous] - next_x) * (y[start:stop] - y[previous])
+                       - (positions[previous] - positions[start:stop]) * (next_y - y[previous]))
+        previous = start + int(np.argmax(np.nan_to_num(areas, nan=-1.0)))
+        selected[bucket + 1] = previous
+    return x[selected], y[selected]
+
+
+DECIMATORS = {
+    "minmax": lambda x, y, max_points: minmax_decimate(x, y, max(1, max_points // 2)),
+    "lttb": lttb_decimate,
+}
+
+
+def _save_figure(figure, output_path, file_name):
+    figure.tight_layout()
+    figure.savefig(os.path.join(output_path, file_name))
+
+
+def _new_figure(figsize):
+    # Figures are drawn without pyplot, so rendering never touches an interactive backend and
+    # is safe in worker processes; PNGs are written by the Agg canvas
+    from matplotlib.figure import Figure
+
+    figure = Figure(figsize=figsize)
+    return figure, figure.subplots()
+
+
+def _plot_codon_efficiencies(output_path, cycles, smoothed, bands=None):
+    figure, axes = _new_figure((12, 6))
+    for codon, values in smoothed.items():
+        line, = axes.plot(cycles, values, label=codon, alpha=0.7)
+        if bands:
+            axes.fill_between(cycles, *bands[codon], color=line.get_color(), alpha=0.2, linewidth=0)
+    axes.set_title("Codon Translation Efficiencies Across Cycles")
+    axes.set_xlabel("Cycle")
+    axes.set_ylabel("Translation Efficiency")
+    axes.legend(title="Codons")
+    _save_figure(figure, output_path, "codon_efficiencies_smoothed.png")
+
+
+def _plot_nutrient_levels(output_path, cycles, nutrient_levels, band=None):
+    figure, axes = _new_figure((12, 6))
+    axes.plot(cycles, nutrient_levels, color="green", alpha=0.8)
+    if band is not None:
+        axes.fill_between(cycles, *band, color="green", alpha=0.2, linewidth=0)
+    axes.set_title("Nutrient Levels Across Cycles")
+    axes.set_xlabel("Cycle")
+    axes.set_ylabel("Nutrient Level")
+    _save_figure(figure, output_path, "nutrient_levels.png")
+
+
+def _plot_nutrient_occupancy(output_path, occupancy):
+    figure, axes = _new_figure((8, 6))
+    axes.bar([f"{level:g}" for level in occupancy["nutrient_level"]], occupancy["fraction"], color="green", alpha=0.8)
+    axes.set_title("Time Spent at Each Nutrient Level")
+    axes.set_xlabel("Nutrient Level")
+    axes.set_ylabel("Fraction of Cycles")
+    _save_figure(figure, output_path, "nutrient_occupancy.png")
+
+
+def _plot_efficiency_histograms(output_path, edges, histograms):
+    figure, axes = _new_figure((12, 6))
+    for codon, counts in histograms.items():
+        axes.stairs(counts / max(counts.sum(), 1), edges, label=codon)
+    axes.set_title("Distribution of Codon Translation Efficiencies")
+    axes.set_xlabel("Translation Efficiency")
+    axes.set_ylabel("Fraction of Cycles")
+    axes.legend(title="Codons")
+    _save_figure(figure, output_path, "efficiency_histograms.png")
+
+
+def _summary_jobs(summary, codons, output_path):
+    """
+    Builds the trajectory figures of a PlotSummary: binned mean with a min/max band, and histograms.
+    """
+    codons = [codon for codon in summary.codons if codon in codons]
+    binned = {codon: summary.binned(f"{codon}_efficiency") for codon in codons}
+    nutrient_levels = summary.binned("nutrient_levels")
+    histograms = {codon: summary.histograms[summary.codons.index(codon)] for codon in codons}
+    return [
+        (_plot_codon_efficiencies, (output_path, summary.bucket_starts,
+                                    {codon: frame["mean"].to_numpy() for codon, frame in binned.items()},
+                                    {codon: (frame["min"].to_numpy(), frame["max"].to_numpy()) for codon, frame in binned.items()})),
+        (_plot_nutrient_levels, (output_path, summary.bucket_starts, nutrient_levels["mean"].to_numpy(),
+                                 (nutrient_levels["min"].to_numpy(), nutrient_levels["max"].to_numpy()))),
+        (_plot_nutrient_occupancy, (output_path, summary.level_occupancy())),
+        (_plot_efficiency_histograms, (output_path, summary.histogram_edges, histograms)),
+    ]
+
+
+def _plot_variability_metrics(output_path, variability_results):
+    import seaborn as sns
+
+    figure, axes = _new_figure((12, 6))
+    variability_long = variability_results.melt(id_vars=["codon"], var_name="Metric", value_name="Value")
+    sns.barplot(x="codon", y="Value", hue="Metric", data=variability_long, ax=axes)
+    axes.set_title("Codon Variability Metrics")
+    axes.set_xlabel("Codon")
+    axes.set_ylabel("Metric Value")
+    _save_figure(figure, output_path, "variability_metrics.png")
+
+
+def _plot_validation(output_path, metric, experimental, simulated):
+    figure, axes = _new_figure((8, 6))
+    axes.scatter(experimental, simulated, label=f"Metric: {metric}")
+    axes.plot(experimental, simulated,
+              linestyle="--", color="red", label="Perfect Agreement")
+    axes.set_title(f"Validation of {metric}")
+    axes.set_xlabel("Experimental Data")
+    axes.set_ylabel("Simulated Data")
+    axes.legend()
+    _save_figure(figure, output_path, f"validation_{metric}.png")
+
+
+def _render(job):
+    function, arguments = job
+    function(*arguments)
+
+
+def generate_visualizations(variability_results, stressed_results, validation_results, output_path="results/",
+                            max_points=5_000, decimation="minmax", max_workers=None, config=None):
     """
     Generates visualizations for codon variability, nutrient stress, and validation results.
 
+    Trajectory figures are drawn from a PlotSummary when one is given: binned mean efficiencies and
+    nutrient levels with min/max bands, nutrient level occupancy and efficiency histograms, at a memory
+    cost that does not depend on the number of cycles. A SimulationState is summarized chunk by chunk.
+    From a DataFrame, long series are decimated to at most `max_points` points instead. The figures are
+    independent, so they are rendered concurrently in worker processes.
+
     Parameters:
         variability_results (pd.DataFrame): DataFrame containing variability metrics for each codon.
-        stressed_results (pd.DataFrame): DataFrame containing translation efficiencies and nutrient levels.
+        stressed_results (pd.DataFrame, SimulationState or PlotSummary): Translation efficiencies and
+            nutrient levels, or their plot summary. The input is not modified.
         validation_results (dict): Dictionary containing validation metrics.
         output_path (str): Path to save the generated visualizations.
+        max_points (int): Maximum number of points drawn per DataFrame series.
+        decimation (str): Shape-preserving downsampling of long DataFrame series, "minmax" or "lttb".
+        max_workers (int): Maximum number of worker processes; None uses the CPU count, 1 renders in-process.
+        config (SimulationConfig): Run configuration used to summarize a SimulationState; None uses `get_config()`.
+
+    Raises:
+        ValueError: If an input is empty, a required column is missing or `decimation` is unknown.
     """
+    if decimation not in DECIMATORS:
+        raise ValueError(f"Unknown decimation '{decimation}'. Choose from: {', '.join(DECIMATORS)}.")
+
+    if is_simulation_state(stressed_results):
+        stressed_results = PlotSummary.from_state(stressed_results, config=config)
+
     # Ensure output directory exists
     os.makedirs(output_path, exist_ok=True)
 
-    if stressed_results.empty or variability_results.empty:
+    if isinstance(stressed_results, PlotSummary):
+        trajectory_empty = stressed_results.level_counts.sum() == 0
+    else:
+        trajectory_empty = stressed_results.empty
+    if trajectory_empty or variability_results.empty:
         raise ValueError("One or more input DataFrames are empty.")
 
     # Ensure necessary columns exist in stressed_results
-    if "nutrient_levels" not in stressed_results.columns:
+    if not isinstance(stressed_results, PlotSummary) and "nutrient_levels" not in stressed_results.columns:
         raise ValueError("Missing 'nutrient_levels' column in stressed_results DataFrame.")
 
     # Ensure variability_results has at least 'codon' column
     if "codon" not in variability_results.columns:
         raise ValueError("Missing 'codon' column in variability_results DataFrame.")
 
-    # Skip visualization if DataFrames are empty
-    if stressed_results.empty or variability_results.empty:
-        print("Skipping visualization: Input DataFrames are empty.")
-        return
+    if isinstance(stressed_results, PlotSummary):
+        # 1-2. Binned efficiencies and nutrient levels, plus occupancy and efficiency histograms
+        jobs = _summary_jobs(stressed_results, set(variability_results["codon"]), output_path)
+    else:
+        # 1. Smoothed codon efficiencies over the first 200 cycles
+        subset = stressed_results.head(min(200, len(stressed_results)))
+        codons = [codon for codon in set(variability_results["codon"]) if f"{codon}_efficiency" in subset.columns]
+        smoothed = rolling_mean(subset[[f"{codon}_efficiency" for codon in codons]].to_numpy(dtype=float))
+        jobs = [(_plot_codon_efficiencies, (output_path, subset.index.to_numpy(),
+                                            {codon: smoothed[:, i] for i, codon in enumerate(codons)}))]
 
-    # Smooth data (handle NaN values)
-    for codon in [col.replace("_efficiency", "") for col in stressed_results.columns if "_efficiency" in col]:
-        stressed_results[f"{codon}_efficiency_smooth"] = (
-            stressed_results[f"{codon}_efficiency"].rolling(window=10).mean().bfill()
+        # 2. Nutrient levels across all cycles, decimated so huge runs draw a bounded number of points
+        cycles, nutrient_levels = DECIMATORS[decimation](
+            stressed_results.index.to_numpy(), stressed_results["nutrient_levels"].to_numpy(dtype=float), max_points
         )
+        jobs.append((_plot_nutrient_levels, (output_path, cycles, nutrient_levels)))
 
-    # Subset data for visualization
-    subset = stressed_results.head(min(200, len(stressed_results)))
-
-    # 1. Plot smoothed codon efficiencies
-    codon_list = set(variability_results["codon"])
-    plt.figure(figsize=(12, 6))
-    for codon in codon_list:
-        if f"{codon}_efficiency_smooth" in subset.columns:
-            plt.plot(subset.index, subset[f"{codon}_efficiency_smooth"], label=codon, alpha=0.7)
-    plt.title("Codon Translation Efficiencies Across Cycles")
-    plt.xlabel("Cycle")
-    plt.ylabel("Translation Efficiency")
-    plt.legend(title="Codons")
-    plt.tight_layout()
-    plt.savefig(os.path.join(output_path, "codon_efficiencies_smoothed.png"))
-    plt.close()
-
-    # 2. Plot Nutrient Levels Across Cycles
-    plt.figure(figsize=(12, 6))
-    plt.plot(stressed_results.index, stressed_results["nutrient_levels"], color="green", alpha=0.8)
-    plt.title("Nutrient Levels Across Cycles")
-    plt.xlabel("Cycle")
-    plt.ylabel("Nutrient Level")
-    plt.tight_layout()
-    plt.savefig(os.path.join(output_path, "nutrient_levels.png"))
-    plt.close()
-
-    # 3. Bar Plot for Variability Metrics
-    plt.figure(figsize=(12, 6))
-    variability_long = variability_results.melt(id_vars=["codon"], var_name="Metric", value_name="Value")
-    sns.barplot(x="codon", y="Value", hue="Metric", data=variability_long)
-    plt.title("Codon Variability Metrics")
-    plt.xlabel("Codon")
-    plt.ylabel("Metric Value")
-    plt.tight_layout()
-    plt.savefig(os.path.join(output_path, "variability_metrics.png"))
-    plt.close()
-
-    # 4. Scatter Plot for Validation (Simulated vs. Experimental)
+    # 3. Bar plot for variability metrics
+    jobs.append((_plot_variability_metrics, (output_path, variability_results)))
+
+    # 4. Scatter plots for validation (simulated vs. experimental)
     for metric, results in validation_results.items():
         if isinstance(results, dict) and "experimental_mean" in results and "simulated_mean" in results:
-            plt.figure(figsize=(8, 6))
-            experimental = results["experimental_mean"]
-            simulated = results["simulated_mean"]
-            plt.scatter(experimental, simulated, label=f"Metric: {metric}")
-            plt.plot(experimental, simulated, 
-                     linestyle="--", color="red", label="Perfect Agreement")
-            plt.title(f"Validation of {metric}")
-            plt.xlabel("Experimental Data")
-            plt.ylabel("Simulated Data")
-            plt.legend()
-            plt.tight_layout()
-            plt.savefig(os.path.join(output_path, f"validation_{metric}.png"))
-            plt.close()
+            jobs.append((_plot_validation, (output_path, metric, results["experimental_mean"], results["simulated_mean"])))
+
+    max_workers = min(max_workers or os.cpu_count() or 1, len(jobs))
+    if max_workers == 1:
+        for job in jobs:
+            _render(job)
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            list(executor.map(_render, jobs))
 
     print("All visualizations generated and saved in:", output_path)
 
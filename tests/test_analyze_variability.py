@@ -93,3 +93,32 @@ def test_analyze_variability_high_variability():
 
     assert result["variance"].iloc[0] > 0  # Variance should be positive
     assert result["CV"].iloc[0] > 0  # CV should be positive
+
+def test_analyze_variability_matches_pandas_statistics():
+    """Test that the vectorized metrics match pandas column statistics."""
+    rna_results = pd.DataFrame({
+        "AAA_efficiency": [0.1, 0.9, 0.2, 0.8, np.nan],
+        "GGG_efficiency": [0.5, 0.6, 0.55, 0.7, 0.65]
+    })
+
+    result = analyze_variability(rna_results).set_index("codon")
+
+    for codon in ["AAA", "GGG"]:
+        column = rna_results[f"{codon}_efficiency"].dropna()
+        assert np.isclose(result.loc[codon, "variance"], column.var(ddof=1))
+        assert np.isclose(result.loc[codon, "Fano_factor"], column.var(ddof=1) / column.mean())
+        assert np.isclose(result.loc[codon, "CV"], column.std(ddof=1) / column.mean())
+        assert np.isclose(result.loc[codon, "CRI"], column.mean() / (column.max() - column.min()))
+
+def test_analyze_variability_simulation_state():
+    """Test that an array-backed simulation state is analyzed without a DataFrame."""
+    from ecoliframalpha.initialization import initialize_state
+
+    state = initialize_state(10, [1.0, 0.5], ["AAA"], ["CGT"])
+    state.efficiencies[:, 0] = np.linspace(0.5, 1.0, 10)
+
+    result = analyze_variability(state)
+
+    assert result["codon"].tolist() == ["AAA", "CGT"]
+    assert np.isclose(result["variance"].iloc[0], np.var(np.linspace(0.5, 1.0, 10), ddof=1))
+    assert result["CRI"].isna().iloc[1]  # Constant codon has no range
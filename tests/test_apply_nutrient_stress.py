@@ -46,3 +46,41 @@ def test_apply_nutrient_stress_does_not_modify_original():
     apply_nutrient_stress(translation_results, nutrient_levels)
 
     pd.testing.assert_frame_equal(translation_results, original_copy)  # Ensure original is unchanged
+
+def test_apply_nutrient_stress_certain_drop_clamps_at_lowest_level():
+    """Test that a certain drop moves every level down once and stops at the last level."""
+    translation_results = pd.DataFrame({"nutrient_levels": [1.0, 0.75, 0.5, 0.5]})
+    nutrient_levels = [1.0, 0.75, 0.5]
+
+    result = apply_nutrient_stress(translation_results, nutrient_levels, stress_probability=1.0)
+
+    assert result["nutrient_levels"].tolist() == [0.75, 0.5, 0.5, 0.5]
+
+def test_apply_nutrient_stress_certain_recovery_clamps_at_highest_level():
+    """Test that a certain recovery moves every level up once and stops at the first level."""
+    translation_results = pd.DataFrame({"nutrient_levels": [1.0, 0.75, 0.5]})
+    nutrient_levels = [1.0, 0.75, 0.5]
+
+    result = apply_nutrient_stress(translation_results, nutrient_levels,
+                                   stress_probability=0.0, recovery_probability=1.0)
+
+    assert result["nutrient_levels"].tolist() == [1.0, 1.0, 0.75]
+
+def test_apply_nutrient_stress_transition_frequencies():
+    """Test that drop and recovery frequencies follow the configured probabilities."""
+    np.random.seed(0)
+    translation_results = pd.DataFrame({"nutrient_levels": [0.5] * 200000})
+    nutrient_levels = [1.0, 0.5, 0.1]
+
+    result = apply_nutrient_stress(translation_results, nutrient_levels,
+                                   stress_probability=0.2, recovery_probability=0.5)
+
+    assert (result["nutrient_levels"] == 0.1).mean() == pytest.approx(0.2, abs=0.01)
+    assert (result["nutrient_levels"] == 1.0).mean() == pytest.approx(0.8 * 0.5, abs=0.01)
+
+def test_apply_nutrient_stress_unknown_level():
+    """Test that nutrient values outside the level list are rejected."""
+    translation_results = pd.DataFrame({"nutrient_levels": [1.0, 0.3]})
+
+    with pytest.raises(ValueError, match="not in nutrient_levels"):
+        apply_nutrient_stress(translation_results, [1.0, 0.5])
@@ -0,0 +1,73 @@
+import os
+import pandas as pd
+import pytest
+from ecoliframalpha.checkpoint import save_checkpoint, load_checkpoint
+from ecoliframalpha.streaming import run_streaming, RunningVariability
+import ecoliframalpha.sweep as sweep
+
+NUTRIENT_LEVELS = [1.0, 0.75, 0.5, 0.25, 0.1]
+
+def test_load_checkpoint_rejects_other_runs(tmp_path):
+    """Test that a checkpoint is only resumed by the run that wrote it."""
+    path = str(tmp_path / "checkpoint.pkl")
+    save_checkpoint(path, {"fingerprint": "a", "cycle": 10})
+
+    assert load_checkpoint(path, "a")["cycle"] == 10
+    assert load_checkpoint(str(tmp_path / "missing.pkl"), "a") is None
+    with pytest.raises(ValueError, match="different parameters"):
+        load_checkpoint(path, "b")
+
+def test_run_streaming_resume_is_bit_identical(tmp_path, monkeypatch):
+    """Test that an interrupted streaming run resumes to exactly the uninterrupted result."""
+    path = str(tmp_path / "streaming.pkl")
+    arguments = (3000, NUTRIENT_LEVELS, ["AAA", "GAT"], ["CGT"])
+    expected = run_streaming(*arguments, chunk_size=400, nutrient_rng=21, stress_rng=22)["variability_results"]
+
+    update = RunningVariability.update
+    calls = []
+    def interrupted_update(self, efficiencies):
+        calls.append(1)
+        if len(calls) == 4:
+            raise KeyboardInterrupt
+        return update(self, efficiencies)
+    monkeypatch.setattr(RunningVariability, "update", interrupted_update)
+    with pytest.raises(KeyboardInterrupt):
+        run_streaming(*arguments, chunk_size=400, nutrient_rng=21, stress_rng=22, checkpoint_path=path, checkpoint_interval=0)
+    monkeypatch.setattr(RunningVariability, "update", update)
+
+    assert os.path.exists(path)
+    resumed = run_streaming(*arguments, chunk_size=400, nutrient_rng=21, stress_rng=22, checkpoint_path=path, checkpoint_interval=0,
+                            resume=True)["variability_results"]
+
+    pd.testing.assert_frame_equal(resumed, expected, check_exact=True)
+    assert not os.path.exists(path)
+
+def test_run_sweep_resume_skips_completed_points(tmp_path, monkeypatch):
+    """Test that a resumed unseeded sweep only runs the missing points and keeps their original seeds."""
+    path = str(tmp_path / "sweep.pkl")
+    grid = {"rnase_activity": [0.01, 0.05, 0.1]}
+    base_parameters = {"num_cycles": 100, "nutrient_levels": [1.0, 0.5], "robust_codons": ["AAA"],
+                       "sensitive_codons": ["CGT"]}
+
+    run_point = sweep._run_sweep_point
+    calls = []
+    def interrupted_point(task):
+        calls.append(task[0])
+        if len(calls) == 3:
+            raise KeyboardInterrupt
+        return run_point(task)
+    monkeypatch.setattr(sweep, "_run_sweep_point", interrupted_point)
+    with pytest.raises(KeyboardInterrupt):
+        sweep.run_sweep(grid, base_parameters, max_workers=1, metrics=["CV"], checkpoint_path=path,
+                        checkpoint_interval=0)
+    checkpoint = pd.read_pickle(path)
+    assert sorted(checkpoint["completed"]) == [0, 1]
+
+    calls.clear()
+    resumed = sweep.run_sweep(grid, base_parameters, max_workers=1, metrics=["CV"], checkpoint_path=path,
+                              checkpoint_interval=0, resume=True)
+
+    assert calls == [2]
+    assert resumed["point"].unique().tolist() == [0, 1, 2]
+    pd.testing.assert_frame_equal(resumed[resumed["point"] < 2],
+                                  pd.concat([checkpoint["completed"][0], checkpoint["completed"][1]], ignore_index=True))
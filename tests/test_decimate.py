@@ -0,0 +1,50 @@
+import numpy as np
+import pandas as pd
+import pytest
+from ecoliframalpha.visualization import rolling_mean, minmax_decimate, lttb_decimate
+
+def test_rolling_mean_matches_pandas():
+    """Test that the vectorized rolling mean matches pandas, including NaN handling."""
+    values = np.random.default_rng(0).random((100, 3))
+    values[40, 1] = np.nan
+    values[95:, 2] = np.nan
+
+    expected = pd.DataFrame(values).rolling(window=10).mean().bfill().to_numpy()
+
+    np.testing.assert_allclose(rolling_mean(values, window=10), expected)
+
+def test_minmax_decimate_keeps_extremes():
+    """Test that min/max binning bounds the points and keeps every extreme."""
+    y = np.random.default_rng(1).normal(size=100_000)
+    x = np.arange(len(y))
+
+    xs, ys = minmax_decimate(x, y, 500)
+
+    assert len(xs) <= 1000
+    assert np.all(np.diff(xs) > 0)
+    assert ys.max() == y.max() and ys.min() == y.min()
+
+def test_lttb_decimate_keeps_endpoints():
+    """Test that LTTB returns the requested number of ordered points, including both ends."""
+    y = np.sin(np.linspace(0, 20, 50_000))
+    x = np.arange(len(y))
+
+    xs, ys = lttb_decimate(x, y, 300)
+
+    assert len(xs) == 300
+    assert xs[0] == 0 and xs[-1] == len(y) - 1
+    assert np.all(np.diff(xs) > 0)
+    assert ys.max() > 0.99 and ys.min() < -0.99
+
+def test_decimate_short_series_unchanged():
+    """Test that series already below the point budget are returned as is."""
+    x, y = np.arange(5), np.arange(5.0)
+
+    for xs, ys in (minmax_decimate(x, y, 10), lttb_decimate(x, y, 10)):
+        np.testing.assert_array_equal(xs, x)
+        np.testing.assert_array_equal(ys, y)
+
+def test_lttb_decimate_invalid_points():
+    """Test that fewer than three points are rejected."""
+    with pytest.raises(ValueError, match="at least 3"):
+        lttb_decimate(np.arange(10), np.arange(10.0), 2)
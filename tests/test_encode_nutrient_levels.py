@@ -0,0 +1,29 @@
+import numpy as np
+from ecoliframalpha.utils import encode_nutrient_levels
+
+def test_encode_nutrient_levels_basic():
+    """Test that values are mapped to their position in the level list."""
+    codes = encode_nutrient_levels([1.0, 0.1, 0.5, 0.75], [1.0, 0.75, 0.5, 0.25, 0.1])
+
+    assert codes.tolist() == [0, 4, 2, 1]
+
+def test_encode_nutrient_levels_unknown_values():
+    """Test that values outside the level list are marked with -1."""
+    codes = encode_nutrient_levels([0.3, 2.0, 0.75], [1.0, 0.75, 0.5])
+
+    assert codes.tolist() == [-1, -1, 1]
+
+def test_encode_nutrient_levels_empty_levels():
+    """Test encoding against an empty level list."""
+    codes = encode_nutrient_levels([0.3, 0.5], [])
+
+    assert (codes == -1).all()
+
+def test_encode_nutrient_levels_preserves_shape():
+    """Test that multi-dimensional inputs keep their shape."""
+    values = np.array([[1.0, 0.5], [0.5, 1.0]])
+
+    codes = encode_nutrient_levels(values, [1.0, 0.5])
+
+    assert codes.shape == (2, 2)
+    assert codes.tolist() == [[0, 1], [1, 0]]
@@ -0,0 +1,89 @@
+import numpy as np
+import pandas as pd
+import pytest
+from ecoliframalpha.codon_variability import fit_codon_glms
+from ecoliframalpha.initialization import initialize_state
+from ecoliframalpha.fused_pipeline import run_fused_pipeline
+
+def _noisy_results(num_cycles=5_000, seed=0):
+    rng = np.random.default_rng(seed)
+    nutrient = rng.choice([1.0, 0.5, 0.1], num_cycles)
+    return pd.DataFrame({
+        "nutrient_levels": nutrient,
+        "AAA_efficiency": np.exp(0.1 + 0.3 * nutrient) * rng.gamma(50, 1 / 50, num_cycles),
+        "CGT_efficiency": np.exp(-0.7 + 0.9 * nutrient) * rng.gamma(20, 1 / 20, num_cycles),
+    })
+
+def _reference_gamma_fit(x, y, iterations=50):
+    """Unbatched IRLS on every observation of one codon."""
+    design = np.column_stack([np.ones_like(x), x])
+    coefficients = np.linalg.lstsq(design, np.log(y), rcond=None)[0]
+    for _ in range(iterations):
+        mean = np.exp(design @ coefficients)
+        working_response = design @ coefficients + (y - mean) / mean
+        coefficients = np.linalg.solve(design.T @ design, design.T @ working_response)
+    mean = np.exp(design @ coefficients)
+    dispersion = np.sum(((y - mean) / mean) ** 2) / (len(y) - 2)
+    return coefficients, np.sqrt(dispersion * np.diag(np.linalg.inv(design.T @ design)))
+
+def test_fit_codon_glms_gamma_matches_unbatched_irls():
+    """Test that batched Gamma fits match per-codon IRLS on the raw observations."""
+    data = _noisy_results()
+
+    table = fit_codon_glms(data, family="gamma")
+
+    for row, codon in enumerate(["AAA", "CGT"]):
+        coefficients, errors = _reference_gamma_fit(data["nutrient_levels"].to_numpy(), data[f"{codon}_efficiency"].to_numpy())
+        np.testing.assert_allclose(table.loc[row, ["glm_intercept", "glm_nutrient_level"]].to_numpy(float), coefficients, rtol=1e-7)
+        np.testing.assert_allclose(table.loc[row, ["glm_intercept_se", "glm_nutrient_level_se"]].to_numpy(float), errors, rtol=1e-6)
+    assert table["glm_converged"].all()
+
+def test_fit_codon_glms_gaussian_matches_least_squares():
+    """Test that Gaussian fits equal ordinary least squares."""
+    data = _noisy_results()
+
+    table = fit_codon_glms(data, family="gaussian")
+
+    slope, intercept = np.polyfit(data["nutrient_levels"], data["CGT_efficiency"], 1)
+    assert table.loc[1, "glm_intercept"] == pytest.approx(intercept)
+    assert table.loc[1, "glm_nutrient_level"] == pytest.approx(slope)
+
+def test_fit_codon_glms_reads_states_in_chunks():
+    """Test that a simulation state gives the same fit in chunks, with codon types from its registry."""
+    state = run_fused_pipeline(initialize_state(10_000, [1.0, 0.5, 0.1], ["AAA"], ["CGT"], rng=1), rng=1)
+
+    whole = fit_codon_glms(state, chunk_size=10_000)
+    chunked = fit_codon_glms(state, chunk_size=999)
+
+    pd.testing.assert_frame_equal(whole, chunked, check_exact=False, rtol=1e-9)
+    assert list(whole["codon_type"]) == ["robust", "sensitive"]
+
+def test_fit_codon_glms_single_level_unidentifiable():
+    """Test that codons seen at one nutrient level get NaN coefficients."""
+    data = pd.DataFrame({"nutrient_levels": [0.5] * 4, "AAA_efficiency": [0.9, 1.0, 1.1, 1.0]})
+
+    table = fit_codon_glms(data)
+
+    assert np.isnan(table.loc[0, "glm_nutrient_level"])
+    assert not table.loc[0, "glm_converged"]
+
+def test_fit_codon_glms_invalid_inputs():
+    """Test that unknown families and non-positive Gamma responses are rejected."""
+    data = pd.DataFrame({"nutrient_levels": [1.0, 0.5], "AAA_efficiency": [0.0, 1.0]})
+
+    with pytest.raises(ValueError, match="Unknown GLM family"):
+        fit_codon_glms(data, family="poisson")
+    with pytest.raises(ValueError, match="require positive efficiencies"):
+        fit_codon_glms(data, family="gamma")
+
+def test_fit_codon_glms_ignores_missing_efficiencies():
+    """Test that NaN efficiencies are left out of their codon's fit."""
+    data = _noisy_results(500)
+    with_missing = data.copy()
+    with_missing.loc[::7, "AAA_efficiency"] = np.nan
+
+    table = fit_codon_glms(with_missing)
+    expected = fit_codon_glms(data[with_missing["AAA_efficiency"].notna()])
+
+    assert table.loc[0, "glm_nutrient_level"] == pytest.approx(expected.loc[0, "glm_nutrient_level"])
+    assert table.loc[1, "glm_nutrient_level"] == pytest.approx(fit_codon_glms(data).loc[1, "glm_nutrient_level"])
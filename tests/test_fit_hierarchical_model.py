@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+from ecoliframalpha.hierarchical_model import fit_hierarchical_model, split_r_hat
+from ecoliframalpha.simulation_state import SimulationState, build_codon_registry
+
+def _synthetic_state(num_cycles=20_000, seed=0):
+    rng = np.random.default_rng(seed)
+    levels = [1.0, 0.5, 0.1]
+    codes = rng.integers(0, 3, num_cycles).astype(np.uint8)
+    nutrient = np.asarray(levels)[codes]
+    codon_efficiency = {
+        "AAA": {"base_efficiency": 1.0, "type": "robust"},
+        "GAT": {"base_efficiency": 1.0, "type": "robust"},
+        "CGT": {"base_efficiency": 0.5, "type": "sensitive"},
+        "CTG": {"base_efficiency": 0.5, "type": "sensitive"},
+    }
+    intercept = np.array([1.0, 0.95, 0.5, 0.45])
+    slope = np.array([0.1, 0.15, 0.8, 0.7])
+    efficiencies = intercept + slope * (nutrient[:, None] - nutrient.mean()) + rng.normal(0, 0.05, (num_cycles, 4))
+    state = SimulationState(efficiencies, codes, levels, build_codon_registry(codon_efficiency))
+    return state, intercept, slope
+
+def test_fit_hierarchical_model_recovers_parameters():
+    """Test that posterior means recover the simulated intercepts, slopes and noise, with converged chains."""
+    state, intercept, slope = _synthetic_state()
+
+    model = fit_hierarchical_model(state, num_chains=2, num_samples=300, warmup=100, rng=1, max_workers=1)
+    summary = model["codon_summary"]
+
+    np.testing.assert_allclose(summary["intercept_mean"], intercept, atol=0.01)
+    np.testing.assert_allclose(summary["slope_mean"], slope, atol=0.01)
+    np.testing.assert_allclose(np.sqrt(summary["noise_variance_mean"]), 0.05, atol=0.005)
+    assert list(summary["category"]) == ["robust", "robust", "sensitive", "sensitive"]
+    assert (summary["r_hat"] < 1.05).all()
+    assert model["draws"]["intercept"].shape == (2, 300, 4)
+
+def test_fit_hierarchical_model_parallel_chains_match_serial():
+    """Test that chains run in worker processes give the same draws as in-process chains."""
+    state, _, _ = _synthetic_state(2_000)
+
+    serial = fit_hierarchical_model(state, num_chains=2, num_samples=20, warmup=5, rng=4, max_workers=1)
+    parallel = fit_hierarchical_model(state, num_chains=2, num_samples=20, warmup=5, rng=4, max_workers=2)
+
+    np.testing.assert_array_equal(serial["draws"]["slope"], parallel["draws"]["slope"])
+
+def test_split_r_hat_detects_disagreeing_chains():
+    """Test that R-hat is near 1 for matching chains and large for chains around different values."""
+    rng = np.random.default_rng(0)
+    mixed = rng.normal(size=(4, 1000, 3))
+    separated = mixed + np.arange(4)[:, None, None] * 5
+
+    assert np.all(np.abs(split_r_hat(mixed) - 1) < 0.02)
+    assert np.all(split_r_hat(separated) > 2)
+
+def test_fit_hierarchical_model_invalid_inputs():
+    """Test that invalid inputs are rejected."""
+    state, _, _ = _synthetic_state(100)
+
+    with pytest.raises(ValueError, match="state must be a SimulationState."):
+        fit_hierarchical_model(state.to_dataframe())
+    with pytest.raises(ValueError, match="num_samples must be an integer of at least 4."):
+        fit_hierarchical_model(state, num_samples=2)
@@ -58,3 +58,44 @@ def test_generate_visualizations_missing_columns():
         generate_visualizations(variability_results, 
                                 pd.DataFrame({"nutrient_levels": [0.1, 0.2, 0.3]}), 
                                 validation_results)
+
+def test_generate_visualizations_accepts_simulation_state(tmp_path):
+    """Test that trajectory plots can be drawn from a summary of a simulation state."""
+    from ecoliframalpha.initialization import initialize_state
+
+    state = initialize_state(500, [1.0, 0.5], ["AAA"], ["CGT"])
+    variability_results = pd.DataFrame({"codon": ["AAA", "CGT"], "variance": [0.1, 0.2]})
+
+    generate_visualizations(variability_results, state, {}, str(tmp_path))
+
+    assert os.path.exists(os.path.join(str(tmp_path), "nutrient_levels.png"))
+
+def test_generate_visualizations_does_not_modify_input(tmp_path):
+    """Test that smoothing leaves the caller's DataFrame unchanged."""
+    variability_results = pd.DataFrame({"codon": ["AAA"], "variance": [0.1]})
+    stressed_results = pd.DataFrame({"nutrient_levels": [1.0] * 20, "AAA_efficiency": [0.5] * 20})
+
+    generate_visualizations(variability_results, stressed_results, {}, str(tmp_path), max_workers=1)
+
+    assert list(stressed_results.columns) == ["nutrient_levels", "AAA_efficiency"]
+
+def test_generate_visualizations_in_worker_processes(tmp_path):
+    """Test that figures rendered concurrently on a long, decimated series are all written."""
+    import numpy as np
+
+    levels = np.repeat([1.0, 0.1, 0.5], 20_000)
+    variability_results = pd.DataFrame({"codon": ["AAA"], "variance": [0.1]})
+    stressed_results = pd.DataFrame({"nutrient_levels": levels, "AAA_efficiency": levels * 0.5})
+
+    generate_visualizations(variability_results, stressed_results, {}, str(tmp_path),
+                            max_points=500, decimation="lttb", max_workers=2)
+
+    assert sorted(os.listdir(str(tmp_path))) == [
+        "codon_efficiencies_smoothed.png", "nutrient_levels.png", "variability_metrics.png"
+    ]
+
+def test_generate_visualizations_unknown_decimation(tmp_path):
+    """Test that an unknown decimation method is rejected."""
+    with pytest.raises(ValueError, match="Unknown decimation"):
+        generate_visualizations(pd.DataFrame({"codon": ["AAA"]}), pd.DataFrame({"nutrient_levels": [1.0]}),
+                                {}, str(tmp_path), decimation="every_tenth")
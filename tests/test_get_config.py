@@ -0,0 +1,50 @@
+import pytest
+from config.config import get_config, SimulationConfig
+
+def test_get_config_is_cached():
+    """Test that the configuration is built once and shared."""
+    assert get_config() is get_config()
+
+def test_get_config_is_immutable():
+    """Test that values cannot be changed and returned lists are independent copies."""
+    config = get_config()
+
+    with pytest.raises(TypeError):
+        config["rnase_activity"] = 0.5
+    with pytest.raises(AttributeError):
+        config.rnase_activity = 0.5
+
+    levels = config["nutrient_levels"]
+    levels.append(0.0)
+    assert config["nutrient_levels"] == [1.0, 0.75, 0.5, 0.25, 0.1]
+
+def test_config_with_derives_validated_copy():
+    """Test that with_ replaces parameters, leaves the original alone and validates the result."""
+    config = get_config()
+
+    derived = config.with_(rnase_activity=0.1)
+
+    assert derived["rnase_activity"] == 0.1
+    assert derived.rnase_activity == 0.1
+    assert config["rnase_activity"] == 0.05
+    with pytest.raises(ValueError, match="rnase_activity must be between 0 and 1"):
+        config.with_(rnase_activity=2.0)
+    with pytest.raises(KeyError, match="Unknown configuration parameters: rnase"):
+        config.with_(rnase=0.1)
+
+def test_config_fingerprint_is_stable():
+    """Test that the fingerprint depends only on the values."""
+    config = get_config()
+
+    assert config.fingerprint == SimulationConfig(config.to_dict()).fingerprint
+    assert config.with_(seed=1).fingerprint != config.fingerprint
+    assert config.with_(seed=1).fingerprint == config.with_(seed=1).fingerprint
+    assert len(config.fingerprint) == 64
+
+def test_config_rejects_stochastic_decay_outside_staged_mode():
+    """Test that stochastic RNA decay cannot be combined with the fused or streaming pipelines."""
+    config = get_config().with_(rna_decay_mode="stochastic")
+
+    for mode in ("fused", "streaming"):
+        with pytest.raises(ValueError, match="only supported with pipeline_mode 'staged'"):
+            config.with_(pipeline_mode=mode)
@@ -144,3 +144,37 @@ def test_get_user_inputs_invalid_file(monkeypatch):
 
     with pytest.raises(SystemExit):
         get_user_inputs()  # Should exit due to FileNotFoundError
+
+def test_get_run_options():
+    """Test that run options are parsed separately from the simulation inputs."""
+    from ecoliframalpha.input_handler import get_run_options
+
+    assert get_run_options(["--num_cycles", "10"]) == {"output_format": "csv", "resume": False, "plots": True}
+    assert get_run_options(["--resume", "--no-plots", "--output_format", "npy"]) == {
+        "output_format": "npy", "resume": True, "plots": False}
+
+def test_get_run_config_overrides_reach_stages():
+    """Test that configuration parameters on the command line build a with_() variant used by the stages."""
+    from ecoliframalpha.config.config import get_config
+    from ecoliframalpha.input_handler import get_run_config
+    from ecoliframalpha.initialization import initialize_simulation
+    from ecoliframalpha.translation_dynamics import simulate_translation
+
+    config = get_run_config(["--num_cycles", "50", "--pipeline_mode", "fused", "--seed", "3",
+                             "--max_efficiency", "2.0", "--metrics", "variance,CV", "--cache_dir", "none",
+                             "--no-plots"])
+
+    assert config == get_config().with_(pipeline_mode="fused", seed=3, max_efficiency=2.0,
+                                        metrics=["variance", "CV"])
+    assert get_config()["max_efficiency"] == 1.5  # The shared configuration is unchanged
+
+    translated = simulate_translation(initialize_simulation(10, [1.0], ["AAA"], ["CGT"], rng=0, config=config), config)
+    default = simulate_translation(initialize_simulation(10, [1.0], ["AAA"], ["CGT"], rng=0))
+    assert (translated["AAA_efficiency"] / default["AAA_efficiency"]).tolist() == pytest.approx([2.0 / 1.5] * 10)
+
+def test_get_run_config_invalid_value():
+    """Test that invalid configuration values on the command line are rejected."""
+    from ecoliframalpha.input_handler import get_run_config
+
+    with pytest.raises(ValueError, match="pipeline_mode must be"):
+        get_run_config(["--pipeline_mode", "parallel"])
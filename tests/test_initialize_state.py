@@ -0,0 +1,31 @@
+import numpy as np
+import pytest
+from ecoliframalpha.initialization import initialize_state
+
+def test_initialize_state_basic():
+    """Test that the state holds a cycles x codons array and uint8 level codes."""
+    state = initialize_state(100, [1.0, 0.75, 0.5], ["AAA", "GAT"], ["CGT", "CTG"])
+
+    assert state.efficiencies.shape == (100, 4)
+    assert state.efficiencies.flags["C_CONTIGUOUS"]
+    assert state.nutrient_codes.dtype == np.uint8
+    assert state.codons == ["AAA", "GAT", "CGT", "CTG"]
+    assert set(np.unique(state.nutrient_values)).issubset({1.0, 0.75, 0.5})
+
+def test_initialize_state_codon_registry():
+    """Test that codon types and base efficiencies are stored in the registry."""
+    state = initialize_state(10, [1.0], ["AAA"], ["CGT"])
+
+    assert state.codon_efficiency == {
+        "AAA": {"base_efficiency": 1.0, "type": "robust"},
+        "CGT": {"base_efficiency": 0.5, "type": "sensitive"},
+    }
+    assert state.column("CGT").tolist() == [0.5] * 10
+
+def test_initialize_state_invalid_inputs():
+    """Test that invalid inputs are rejected like in initialize_simulation."""
+    with pytest.raises(ValueError, match="num_cycles must be a positive integer"):
+        initialize_state(0, [1.0], ["AAA"], ["CGT"])
+
+    with pytest.raises(ValueError, match="nutrient_levels must be a list of numbers"):
+        initialize_state(10, [], ["AAA"], ["CGT"])
@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+import pytest
+from ecoliframalpha.experimental_data import load_experimental_data, align_experimental_data
+from ecoliframalpha.validation import validate_simulation
+
+def _write_benchmarks(path):
+    pd.DataFrame({
+        "codon": ["aaa", "AAA", "CGT", "CGU", "AAA", "CGT"],
+        "gene": ["lacZ", "rpoB", "lacZ", "rpoB", "lacZ", "lacZ"],
+        "condition": ["glucose"] * 4 + ["starvation"] * 2,
+        "variance": [0.002, 0.004, 0.008, 0.010, 0.003, 0.009],
+    }).to_csv(path, index=False)
+
+def test_load_experimental_data_indexes_by_codon_and_condition(tmp_path):
+    """Test that rows are keyed by normalized codon and condition, averaging repeated measurements."""
+    path = str(tmp_path / "benchmarks.csv")
+    _write_benchmarks(path)
+
+    data = load_experimental_data(path)
+
+    assert data.index.names == ["codon", "condition"]
+    assert data.loc[("AAA", "glucose"), "variance"] == pytest.approx(0.003)
+    assert data.loc[("CGU", "glucose"), "num_measurements"] == 2
+    assert "gene" not in data.columns
+
+def test_load_experimental_data_reloads_changed_file(tmp_path):
+    """Test that the parsed-table cache is invalidated when the file changes."""
+    path = str(tmp_path / "benchmarks.csv")
+    _write_benchmarks(path)
+    data = load_experimental_data(path)
+    data.loc[("AAA", "glucose"), "variance"] = 1.0  # Callers get a copy
+
+    assert load_experimental_data(path).loc[("AAA", "glucose"), "variance"] == pytest.approx(0.003)
+
+    pd.DataFrame({"codon": ["AAA"], "variance": [0.5]}).to_csv(path, index=False)
+    assert load_experimental_data(path).loc["AAA", "variance"] == 0.5
+
+def test_load_experimental_data_missing_codon_column(tmp_path):
+    """Test that a table without codons is rejected."""
+    path = str(tmp_path / "benchmarks.csv")
+    pd.DataFrame({"variance": [0.1]}).to_csv(path, index=False)
+
+    with pytest.raises(ValueError, match="Missing 'codon' column"):
+        load_experimental_data(path)
+
+def test_validate_simulation_joins_on_codon(tmp_path):
+    """Test that validation pairs rows by codon, whatever their order."""
+    variability_results = pd.DataFrame({"codon": ["AAA", "CGT", "GAT"], "variance": [0.1, 0.3, 0.2]})
+    shuffled = pd.DataFrame({"codon": ["GAU", "CTG", "AAA", "CGU"], "variance": [0.2, 0.9, 0.1, 0.3]})
+
+    result = validate_simulation(variability_results, shuffled, metrics=["variance"])
+
+    assert result["variance"]["correlation"] == pytest.approx(1.0)
+    assert result["variance"]["mean_squared_error"] == pytest.approx(0.0)
+
+def test_align_experimental_data_requires_condition(tmp_path):
+    """Test that benchmarks with several conditions need an explicit condition."""
+    path = str(tmp_path / "benchmarks.csv")
+    _write_benchmarks(path)
+    data = load_experimental_data(path)
+    variability_results = pd.DataFrame({"codon": ["CGT", "AAA", "GAT"]})
+
+    with pytest.raises(ValueError, match="several conditions"):
+        align_experimental_data(variability_results, data)
+    with pytest.raises(ValueError, match="Unknown experimental condition"):
+        align_experimental_data(variability_results, data, "heat")
+
+    aligned = align_experimental_data(variability_results, data, "starvation")
+    np.testing.assert_allclose(aligned["variance"], [0.009, 0.003, np.nan])
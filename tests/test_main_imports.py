@@ -0,0 +1,21 @@
+import os
+import subprocess
+import sys
+
+PACKAGE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "ecoliframalpha")
+
+def test_main_does_not_import_heavy_dependencies():
+    """Test that importing the entry point and running stages loads no plotting, scipy or sklearn modules."""
+    code = (
+        "import sys, main\n"
+        "from initialization import initialize_state\n"
+        "from fused_pipeline import run_fused_pipeline\n"
+        "from codon_variability import analyze_variability\n"
+        "from validation import validate_simulation\n"
+        "results = analyze_variability(run_fused_pipeline(initialize_state(100, [1.0, 0.5], ['AAA'], ['CGT'])))\n"
+        "validate_simulation(results, results)\n"
+        "print(','.join(m for m in ('matplotlib', 'seaborn', 'scipy', 'sklearn') if m in sys.modules))\n"
+    )
+    output = subprocess.run([sys.executable, "-c", code], cwd=PACKAGE_DIR, capture_output=True, text=True, check=True)
+
+    assert output.stdout.strip() == ""
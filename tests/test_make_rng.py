@@ -0,0 +1,43 @@
+import numpy as np
+from ecoliframalpha.utils import make_rng, spawn_rngs, spawn_seeds
+from ecoliframalpha.initialization import initialize_simulation
+from ecoliframalpha.nutrient_stress import apply_nutrient_stress
+
+def test_make_rng_passes_generators_through():
+    """Test that an existing Generator is reused rather than reseeded."""
+    rng = np.random.default_rng(1)
+
+    assert make_rng(rng) is rng
+
+def test_make_rng_seeded_streams_repeat():
+    """Test that the same seed gives the same draws."""
+    assert make_rng(5).random(4).tolist() == make_rng(5).random(4).tolist()
+
+def test_make_rng_none_follows_global_seed():
+    """Test that unseeded generators are reproducible through np.random.seed."""
+    np.random.seed(3)
+    first = make_rng().random(4)
+    np.random.seed(3)
+    second = make_rng().random(4)
+
+    np.testing.assert_array_equal(first, second)
+
+def test_spawn_rngs_independent_children():
+    """Test that spawned children are reproducible and distinct from each other."""
+    first = [rng.random(3).tolist() for rng in spawn_rngs(7, 3)]
+    second = [rng.random(3).tolist() for rng in spawn_rngs(np.random.SeedSequence(7), 3)]
+
+    assert first == second
+    assert first[0] != first[1]
+    assert len(spawn_seeds(7, 5)) == 5
+
+def test_seeded_stages_are_reproducible():
+    """Test that initialization and stress with explicit generators repeat exactly."""
+    levels = [1.0, 0.5, 0.1]
+    runs = []
+    for _ in range(2):
+        init_rng, stress_rng = spawn_rngs(11, 2)
+        simulation = initialize_simulation(200, levels, ["AAA"], ["CGT"], rng=init_rng)
+        runs.append(apply_nutrient_stress(simulation["simulation_data"], levels, 0.3, 0.2, rng=stress_rng))
+
+    np.testing.assert_array_equal(runs[0]["nutrient_levels"], runs[1]["nutrient_levels"])
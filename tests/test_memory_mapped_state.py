@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+from ecoliframalpha.initialization import initialize_state
+from ecoliframalpha.fused_pipeline import run_fused_pipeline
+from ecoliframalpha.codon_variability import analyze_variability
+from ecoliframalpha.simulation_state import SimulationState
+
+NUTRIENT_LEVELS = [1.0, 0.75, 0.5, 0.25, 0.1]
+
+def test_initialize_state_memory_mapped(tmp_path):
+    """Test that a memory-mapped state is created on disk with valid nutrient codes."""
+    state = initialize_state(2500, NUTRIENT_LEVELS, ["AAA"], ["CGT"], rng=1, directory=str(tmp_path))
+
+    assert state.is_memory_mapped
+    assert (tmp_path / "efficiencies.npy").exists()
+    assert state.nutrient_codes.max() < len(NUTRIENT_LEVELS)
+    np.testing.assert_array_equal(state.efficiencies[0], [1.0, 0.5])
+
+def test_memory_mapped_stages_write_through(tmp_path):
+    """Test that chunked in-place stages persist and reopen to the same values."""
+    state = initialize_state(3000, NUTRIENT_LEVELS, ["AAA", "GAT"], ["CGT"], rng=2, directory=str(tmp_path))
+    run_fused_pipeline(state, 0.2, 0.1, rng=3, chunk_size=700)
+    state.flush()
+
+    reopened = SimulationState.open(str(tmp_path))
+
+    assert reopened.codons == ["AAA", "GAT", "CGT"]
+    np.testing.assert_array_equal(reopened.efficiencies, state.efficiencies)
+    np.testing.assert_array_equal(reopened.nutrient_codes, state.nutrient_codes)
+
+def test_analyze_variability_reads_memory_mapped_state_in_chunks(tmp_path):
+    """Test that lazy chunked analysis matches analyzing the trajectory in memory."""
+    state = initialize_state(3000, NUTRIENT_LEVELS, ["AAA"], ["CGT"], rng=4, directory=str(tmp_path))
+    run_fused_pipeline(state, 0.2, 0.1, rng=5, chunk_size=1000)
+    state.flush()
+
+    lazy = analyze_variability(SimulationState.open(str(tmp_path)), chunk_size=500)
+    in_memory = analyze_variability(state.to_dataframe())
+
+    pd.testing.assert_frame_equal(lazy, in_memory, check_exact=False, rtol=1e-9)
+
+def test_memory_mapped_state_matches_in_memory_state(tmp_path):
+    """Test that nutrient codes drawn in chunks (not a multiple of 4 cycles) match one in-memory draw."""
+    from ecoliframalpha.config.config import get_config
+
+    config = get_config().with_(chunk_size=1001)
+    memory_mapped = initialize_state(3000, NUTRIENT_LEVELS, ["AAA"], ["CGT"], rng=3, directory=str(tmp_path),
+                                     config=config)
+    in_memory = initialize_state(3000, NUTRIENT_LEVELS, ["AAA"], ["CGT"], rng=3, config=config)
+
+    np.testing.assert_array_equal(memory_mapped.nutrient_codes, in_memory.nutrient_codes)
@@ -0,0 +1,92 @@
+import numpy as np
+import pytest
+from ecoliframalpha.nutrient_stress import (NutrientMarkovChain, build_alias_tables, default_transition_matrix,
+                                            sample_chain_codes)
+
+def test_default_transition_matrix_matches_stress_step():
+    """Test that the default matrix encodes drop, recovery and clamping at the list ends."""
+    matrix = default_transition_matrix(3, stress_probability=0.2, recovery_probability=0.5)
+
+    np.testing.assert_allclose(matrix, [[0.8, 0.2, 0.0],
+                                        [0.4, 0.4, 0.2],
+                                        [0.0, 0.4, 0.6]])
+
+def test_sample_chain_codes_matches_sequential_sampling():
+    """Test that blocked sampling reproduces the step-by-step alias-table recursion."""
+    rng = np.random.default_rng(1)
+    matrix = rng.random((4, 4))
+    matrix /= matrix.sum(axis=1, keepdims=True)
+    probability, alias = build_alias_tables(matrix)
+    uniforms = rng.random(1003)
+
+    state, expected = 2, []
+    for u in uniforms:
+        column = min(int(u * 4), 3)
+        state = column if u * 4 - column < probability[state, column] else alias[state, column]
+        expected.append(state)
+
+    assert sample_chain_codes(probability, alias, uniforms, 2).tolist() == expected
+
+def test_nutrient_markov_chain_transition_frequencies():
+    """Test that empirical transition frequencies match a user-supplied matrix."""
+    np.random.seed(3)
+    matrix = np.array([[0.7, 0.3, 0.0], [0.1, 0.6, 0.3], [0.5, 0.0, 0.5]])
+
+    codes = NutrientMarkovChain(matrix).sample(200000)
+
+    counts = np.zeros((3, 3))
+    np.add.at(counts, (codes[:-1], codes[1:]), 1)
+    np.testing.assert_allclose(counts / counts.sum(axis=1, keepdims=True), matrix, atol=0.01)
+
+def test_nutrient_markov_chain_chunks_resume():
+    """Test that sampling in chunks continues the chain exactly where it stopped."""
+    matrix = default_transition_matrix(5, 0.1, 0.05)
+
+    np.random.seed(7)
+    whole = NutrientMarkovChain(matrix).sample(10000)
+    np.random.seed(7)
+    chunks = np.concatenate(list(NutrientMarkovChain(matrix).iter_chunks(10000, chunk_size=999)))
+
+    np.testing.assert_array_equal(whole, chunks)
+
+def test_nutrient_markov_chain_invalid_matrix():
+    """Test that matrices whose rows do not sum to one are rejected."""
+    with pytest.raises(ValueError, match="must sum to 1"):
+        NutrientMarkovChain([[0.5, 0.4], [0.5, 0.5]])
+
+def test_initialize_simulation_markov_process():
+    """Test that the Markov nutrient process produces persistent stress episodes."""
+    from ecoliframalpha.config.config import get_config
+    from ecoliframalpha.initialization import initialize_simulation
+
+    config = get_config().with_(nutrient_process="markov", transition_matrix=[[0.99, 0.01], [0.01, 0.99]])
+
+    result = initialize_simulation(5000, [1.0, 0.1], ["AAA"], ["CGT"], config=config)
+
+    levels = result["simulation_data"]["nutrient_levels"].to_numpy()
+    assert (levels[1:] != levels[:-1]).mean() < 0.05  # Level changes are rare
+
+def test_initialize_simulation_markov_uses_cli_probabilities(monkeypatch):
+    """Test that stress/recovery probabilities given on the command line drive the default Markov chain."""
+    from ecoliframalpha.initialization import initialize_simulation
+    from ecoliframalpha.input_handler import get_run_config, get_user_inputs
+
+    monkeypatch.setattr("sys.argv", ["main.py", "--num_cycles", "20000", "--nutrient_levels", "1.0,0.1",
+                                     "--robust_codons", "AAA", "--sensitive_codons", "CGT",
+                                     "--stress_probability", "0.5", "--recovery_probability", "0.05",
+                                     "--nutrient_process", "markov"])
+    config = get_run_config()
+    user_inputs = get_user_inputs(config)
+
+    def levels(stress_probability, recovery_probability):
+        result = initialize_simulation(user_inputs["num_cycles"], user_inputs["nutrient_levels"], ["AAA"], ["CGT"],
+                                       rng=5, stress_probability=stress_probability,
+                                       recovery_probability=recovery_probability, config=config)
+        return result["simulation_data"]["nutrient_levels"].to_numpy()
+
+    cli_levels = levels(user_inputs["stress_probability"], user_inputs["recovery_probability"])
+    default_levels = levels(None, None)
+
+    assert not np.array_equal(cli_levels, default_levels)
+    drops = (cli_levels[:-1] == 1.0) & (cli_levels[1:] == 0.1)
+    assert drops.sum() / (cli_levels[:-1] == 1.0).sum() == pytest.approx(0.5, abs=0.05)
@@ -0,0 +1,60 @@
+import numpy as np
+import pytest
+from ecoliframalpha.plot_summary import PlotSummary
+from ecoliframalpha.initialization import initialize_state
+from ecoliframalpha.fused_pipeline import run_fused_pipeline
+from ecoliframalpha.streaming import run_streaming
+
+def _state(num_cycles=10_000, seed=0):
+    state = initialize_state(num_cycles, [1.0, 0.5, 0.1], ["AAA"], ["CGT"], rng=seed)
+    return run_fused_pipeline(state, rng=seed)
+
+def test_plot_summary_matches_full_trajectory():
+    """Test that binned statistics, occupancy and histograms match the full trajectory."""
+    state = _state()
+    summary = PlotSummary.from_state(state, chunk_size=777, num_bins=100, histogram_bins=20)
+
+    frame = state.to_dataframe()
+    buckets = frame.index // summary.bucket_size
+    expected = frame["AAA_efficiency"].groupby(buckets).agg(["min", "mean", "max"])
+    binned = summary.binned("AAA_efficiency")
+    np.testing.assert_allclose(binned[["min", "mean", "max"]].to_numpy(), expected.to_numpy())
+
+    expected_counts = [np.sum(frame["nutrient_levels"] == level) for level in (1.0, 0.5, 0.1)]
+    np.testing.assert_array_equal(summary.level_occupancy()["cycles"], expected_counts)
+
+    counts, _ = np.histogram(frame["CGT_efficiency"], bins=summary.histogram_edges)
+    np.testing.assert_array_equal(summary.histograms[summary.codons.index("CGT")], counts)
+
+def test_plot_summary_independent_of_chunking():
+    """Test that summaries built from different chunk sizes, or merged from halves, are identical."""
+    state = _state()
+    whole = PlotSummary.from_state(state, chunk_size=state.num_cycles, num_bins=64)
+    chunked = PlotSummary.from_state(state, chunk_size=333, num_bins=64)
+
+    first, second = PlotSummary.for_state(state, num_bins=64), PlotSummary.for_state(state, num_bins=64)
+    first.update(state.chunk(0, 4_000), 0)
+    second.update(state.chunk(4_000, state.num_cycles), 4_000)
+    merged = first.merge(second)
+
+    for summary in (chunked, merged):
+        np.testing.assert_allclose(summary.total, whole.total)
+        np.testing.assert_array_equal(summary.minimum, whole.minimum)
+        np.testing.assert_array_equal(summary.maximum, whole.maximum)
+        np.testing.assert_array_equal(summary.histograms, whole.histograms)
+
+def test_plot_summary_rejects_out_of_range_chunk():
+    """Test that a chunk beyond the summarized cycles is rejected."""
+    state = _state(100)
+    summary = PlotSummary.for_state(state)
+
+    with pytest.raises(ValueError, match="outside the summarized cycles"):
+        summary.update(state, 50)
+
+def test_run_streaming_returns_plot_summary():
+    """Test that streaming runs summarize every cycle for plotting."""
+    results = run_streaming(5_000, [1.0, 0.5], ["AAA"], ["CGT"], chunk_size=1_000, nutrient_rng=3, stress_rng=4)
+
+    summary = results["plot_summary"]
+    assert summary.level_counts.sum() == 5_000
+    assert summary.count[:, 0].sum() == 5_000
@@ -100,3 +100,69 @@ def test_process_rna_does_not_modify_original():
     process_rna(stressed_results, codon_efficiency)
 
     pd.testing.assert_frame_equal(stressed_results, original_copy)  # Ensure original is unchanged
+
+def test_process_rna_matches_per_codon_decay():
+    """Test that the broadcast decay matches the exponential model codon by codon."""
+    import numpy as np
+
+    stressed_results = pd.DataFrame({
+        "nutrient_levels": [1.0, 0.5, 0.2],
+        "AAA_efficiency": [1.0, 0.8, 0.6],
+        "GGG_efficiency": [0.9, 0.7, 0.5]
+    })
+    codon_efficiency = {"AAA": {"base_efficiency": 0.9}, "GGG": {"base_efficiency": 0.5}}
+
+    result = process_rna(stressed_results, codon_efficiency, rnase_activity=0.05, decay_variability=0.1)
+
+    for codon, base in [("AAA", 0.9), ("GGG", 0.5)]:
+        rate = 0.05 * (1 + 0.1 * (1 - base))
+        expected = stressed_results[f"{codon}_efficiency"] * np.exp(-rate * (1 + stressed_results["nutrient_levels"] * 0.1))
+        assert result[f"{codon}_efficiency"].tolist() == pytest.approx(expected.tolist())
+
+def test_process_rna_inplace():
+    """Test that in-place mode updates and returns the input DataFrame."""
+    stressed_results = pd.DataFrame({
+        "nutrient_levels": [1.0, 0.5, 0.2],
+        "AAA_efficiency": [1.0, 0.8, 0.6]
+    })
+    codon_efficiency = {"AAA": {"base_efficiency": 0.9}}
+
+    result = process_rna(stressed_results, codon_efficiency, inplace=True)
+
+    assert result is stressed_results
+    assert (stressed_results["AAA_efficiency"] < [1.0, 0.8, 0.6]).all()
+
+def test_process_rna_float32():
+    """Test that float32 mode stays within tolerance of the float64 results."""
+    import numpy as np
+
+    stressed_results = pd.DataFrame({
+        "nutrient_levels": [1.0, 0.5, 0.2],
+        "AAA_efficiency": [1.0, 0.8, 0.6]
+    })
+    codon_efficiency = {"AAA": {"base_efficiency": 0.9}}
+
+    result64 = process_rna(stressed_results, codon_efficiency)
+    result32 = process_rna(stressed_results, codon_efficiency, dtype=np.float32)
+
+    assert result32["AAA_efficiency"].dtype == np.float32
+    assert result32["AAA_efficiency"].tolist() == pytest.approx(result64["AAA_efficiency"].tolist(), rel=1e-6)
+
+def test_process_rna_inplace_shares_memory():
+    """Test that in-place mode decays the existing column buffers instead of replacing them."""
+    import numpy as np
+
+    stressed_results = pd.DataFrame({
+        "nutrient_levels": [1.0, 0.5, 0.2] * 5,
+        "AAA_efficiency": [1.0, 0.8, 0.6] * 5,
+        "CGT_efficiency": [0.5, 0.4, 0.3] * 5,
+    })
+    codon_efficiency = {"AAA": {"base_efficiency": 0.9}, "CGT": {"base_efficiency": 0.5}}
+    buffers = {column: stressed_results[column].to_numpy() for column in ("AAA_efficiency", "CGT_efficiency")}
+    expected = process_rna(stressed_results.copy(), codon_efficiency)
+
+    result = process_rna(stressed_results, codon_efficiency, inplace=True, chunk_size=4)
+
+    for column, buffer in buffers.items():
+        assert np.shares_memory(result[column].to_numpy(), buffer)
+        np.testing.assert_allclose(result[column], expected[column])
@@ -0,0 +1,72 @@
+import numpy as np
+import pandas as pd
+import pytest
+from ecoliframalpha.rna_processing import process_rna_stochastic, simulate_mrna_copies
+
+def test_simulate_mrna_copies_ssa_stationary_distribution():
+    """Test that small pools simulated with exact SSA reach the Poisson(birth/death) steady state."""
+    np.random.seed(2)
+    copies = simulate_mrna_copies(np.full((2000, 50), 0.5), [2.0] * 50, initial_copies=4, ssa_threshold=1000)
+
+    steady = copies[50:]
+    assert steady.mean() == pytest.approx(4.0, rel=0.05)
+    assert steady.var() / steady.mean() == pytest.approx(1.0, rel=0.1)  # Poisson Fano factor
+
+def test_simulate_mrna_copies_tau_leaping_mean():
+    """Test that large pools advanced by tau-leaping fluctuate around the balanced copy number."""
+    np.random.seed(3)
+    death_probability = -np.expm1(-0.05)
+    copies = simulate_mrna_copies(np.full((5000, 3), 0.05), [5.0] * 3, initial_copies=100, ssa_threshold=0)
+
+    assert copies.min() >= 0
+    assert copies[500:].mean() == pytest.approx(5.0 / death_probability, rel=0.05)
+
+def test_simulate_mrna_copies_leaped_and_tracked_lanes_agree():
+    """Test that dense pools leaped cycle by cycle and sparse pools tracked per molecule share the tau-leap mean."""
+    np.random.seed(5)
+    death_probability = -np.expm1(-0.05)
+    copies = simulate_mrna_copies(np.full((4000, 2), 0.05), [40.0, 4.0], initial_copies=100, ssa_threshold=0)
+
+    steady = copies[500:].mean(axis=0)
+    np.testing.assert_allclose(steady, np.array([40.0, 4.0]) / death_probability, rtol=0.05)
+
+def test_process_rna_stochastic_replicates():
+    """Test that replicates are simulated in one batch and differ from each other."""
+    np.random.seed(4)
+    stressed_results = pd.DataFrame({
+        "nutrient_levels": [1.0, 0.5, 0.2] * 100,
+        "AAA_efficiency": [1.0, 0.8, 0.6] * 100
+    })
+    codon_efficiency = {"AAA": {"base_efficiency": 0.9}}
+
+    results = process_rna_stochastic(stressed_results, codon_efficiency, initial_copies=20, num_replicates=3)
+
+    assert len(results) == 3
+    assert all(len(result) == len(stressed_results) for result in results)
+    assert (results[0]["AAA_efficiency"] >= 0).all()
+    assert not results[0]["AAA_efficiency"].equals(results[1]["AAA_efficiency"])
+
+def test_process_rna_stochastic_invalid_inputs():
+    """Test that invalid inputs are rejected like in process_rna."""
+    stressed_results = pd.DataFrame({"nutrient_levels": [1.0], "AAA_efficiency": [1.0]})
+
+    with pytest.raises(ValueError, match="Missing 'base_efficiency' for codon: AAA"):
+        process_rna_stochastic(stressed_results, {"AAA": {}})
+
+    with pytest.raises(ValueError, match="initial_copies must be a positive integer"):
+        process_rna_stochastic(stressed_results, {"AAA": {"base_efficiency": 0.9}}, initial_copies=0)
+
+def test_process_rna_stochastic_stationary_mean_under_nutrient_load():
+    """Test that copy numbers stay around initial_copies when nutrients raise the decay rate."""
+    np.random.seed(6)
+    stressed_results = pd.DataFrame({
+        "nutrient_levels": [1.0, 0.5] * 2000,
+        "AAA_efficiency": [1.0] * 4000,
+    })
+    codon_efficiency = {"AAA": {"base_efficiency": 0.5}}
+
+    results = process_rna_stochastic(stressed_results, codon_efficiency, rnase_activity=0.1, decay_variability=0.8,
+                                     initial_copies=50, num_replicates=4)
+
+    steady = np.concatenate([result["AAA_efficiency"].to_numpy()[500:] for result in results])
+    assert steady.mean() == pytest.approx(1.0, rel=0.03)
@@ -0,0 +1,92 @@
+import numpy as np
+import pandas as pd
+import pytest
+from ecoliframalpha.ensemble import run_ensemble, simulate_ensemble
+
+def test_run_ensemble_basic():
+    """Test that per-replicate metrics and the ensemble summary are returned."""
+    np.random.seed(0)
+    result = run_ensemble(20, 200, [1.0, 0.75, 0.5, 0.25, 0.1], ["AAA"], ["CGT"])
+
+    replicates = result["replicates"]
+    summary = result["summary"]
+    assert len(replicates) == 20 * 2
+    assert set(replicates.columns) == {"replicate", "codon", "variance", "Fano_factor", "CV", "CRI"}
+    assert len(summary) == 2 * 4
+    assert (summary["interval_lower"] <= summary["mean"]).all()
+    assert (summary["mean"] <= summary["interval_upper"]).all()
+
+def test_run_ensemble_batches_cover_all_replicates():
+    """Test that batching replicates still yields one row per replicate and codon."""
+    result = run_ensemble(7, 50, [1.0, 0.5], ["AAA"], ["CGT"], metrics=["CV"], batch_size=3)
+
+    assert result["replicates"]["replicate"].tolist() == [r for r in range(7) for _ in range(2)]
+    assert "variance" not in result["replicates"].columns
+
+def test_simulate_ensemble_shapes():
+    """Test the shapes and value ranges of the batched simulation."""
+    codon_efficiency = {"AAA": {"base_efficiency": 1.0, "type": "robust"},
+                        "CGT": {"base_efficiency": 0.5, "type": "sensitive"}}
+
+    batch = simulate_ensemble(4, 30, [1.0, 0.5, 0.1], codon_efficiency)
+
+    assert batch["efficiencies"].shape == (4, 30, 2)
+    assert batch["nutrient_codes"].shape == (4, 30)
+    assert batch["nutrient_codes"].max() <= 2
+    assert (batch["efficiencies"] >= 0).all()
+
+def test_run_ensemble_invalid_inputs():
+    """Test that invalid ensemble parameters are rejected."""
+    with pytest.raises(ValueError, match="num_replicates must be a positive integer"):
+        run_ensemble(0, 10, [1.0], ["AAA"], ["CGT"])
+
+    with pytest.raises(ValueError, match="confidence must be between 0 and 1"):
+        run_ensemble(2, 10, [1.0], ["AAA"], ["CGT"], confidence=1.5)
+
+def test_run_ensemble_seeded_results_independent_of_batching():
+    """Test that per-replicate streams make seeded results identical for any batch size."""
+    whole = run_ensemble(6, 80, [1.0, 0.5, 0.1], ["AAA"], ["CGT"], rng=9)
+    batched = run_ensemble(6, 80, [1.0, 0.5, 0.1], ["AAA"], ["CGT"], batch_size=4, rng=9)
+
+    pd.testing.assert_frame_equal(whole["replicates"], batched["replicates"], check_exact=True)
+
+def test_simulate_ensemble_follows_config():
+    """Test that the nutrient process, translation timing and RNA decay mode of the config are honoured."""
+    from ecoliframalpha.config.config import get_config
+
+    codon_efficiency = {"AAA": {"base_efficiency": 1.0, "type": "robust"},
+                        "CGT": {"base_efficiency": 0.5, "type": "sensitive"}}
+    config = get_config()
+    def simulate(run_config):
+        return simulate_ensemble(3, 2000, [1.0, 0.1], codon_efficiency, 0.01, 0.01, rng=4, config=run_config)
+
+    default = simulate(config)
+    markov = simulate(config.with_(nutrient_process="markov"))
+    levels_changed = (markov["nutrient_codes"][:, 1:] != markov["nutrient_codes"][:, :-1]).mean()
+    assert levels_changed < 0.05 < (default["nutrient_codes"][:, 1:] != default["nutrient_codes"][:, :-1]).mean()
+
+    after_stress = simulate(config.with_(translate_after_stress=True))
+    np.testing.assert_array_equal(after_stress["nutrient_codes"], default["nutrient_codes"])
+    assert not np.array_equal(after_stress["efficiencies"], default["efficiencies"])
+
+    stochastic = simulate(config.with_(rna_decay_mode="stochastic", initial_mrna_copies=20))
+    np.testing.assert_array_equal(stochastic["nutrient_codes"], default["nutrient_codes"])
+    assert stochastic["efficiencies"].std(axis=1).mean() > default["efficiencies"].std(axis=1).mean()
+
+def test_run_ensemble_confidence_interval_of_the_mean():
+    """Test that the t-based interval covers the ensemble mean at its nominal rate and shrinks with replicates."""
+    arguments = (200, [1.0, 0.5, 0.1], ["AAA"], [])
+    true_mean = run_ensemble(4000, *arguments, metrics=["CV"], rng=0)["summary"]["mean"].iloc[0]
+
+    covered = []
+    for seed in range(1, 201):
+        summary = run_ensemble(10, *arguments, metrics=["CV"], rng=seed)["summary"].iloc[0]
+        assert summary["interval_lower"] <= summary["mean"] <= summary["interval_upper"]
+        covered.append(summary["ci_lower"] <= true_mean <= summary["ci_upper"])
+    assert 0.9 <= np.mean(covered) <= 0.99
+
+    def width(num_replicates):
+        summary = run_ensemble(num_replicates, *arguments, metrics=["CV"], rng=1)["summary"].iloc[0]
+        return summary["ci_upper"] - summary["ci_lower"]
+    assert width(160) < width(40) < width(10)
+    assert np.isnan(run_ensemble(1, *arguments, metrics=["CV"], rng=1)["summary"]["ci_lower"].iloc[0])
@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+from ecoliframalpha.initialization import initialize_state
+from ecoliframalpha.translation_dynamics import simulate_translation, translation_efficiency_matrix
+from ecoliframalpha.nutrient_stress import apply_nutrient_stress
+from ecoliframalpha.rna_processing import process_rna
+from ecoliframalpha.fused_pipeline import run_fused_pipeline
+
+NUTRIENT_LEVELS = [1.0, 0.75, 0.5, 0.25, 0.1]
+
+def test_run_fused_pipeline_matches_staged_pipeline():
+    """Test that the fused kernel reproduces translation, stress and RNA decay run stage by stage."""
+    state = initialize_state(500, NUTRIENT_LEVELS, ["AAA", "GAT"], ["CGT"])
+    codon_efficiency = state.codon_efficiency
+
+    np.random.seed(11)
+    translation_results = simulate_translation({"simulation_data": state.to_dataframe(),
+                                                "codon_efficiency": codon_efficiency,
+                                                "nutrient_levels": NUTRIENT_LEVELS})
+    stressed_results = apply_nutrient_stress(translation_results, NUTRIENT_LEVELS, 0.3, 0.2)
+    expected = process_rna(stressed_results, codon_efficiency, 0.05, 0.1)
+
+    np.random.seed(11)
+    run_fused_pipeline(state, 0.3, 0.2, 0.05, 0.1)
+
+    np.testing.assert_allclose(state.nutrient_values, expected["nutrient_levels"])
+    for codon in state.codons:
+        np.testing.assert_allclose(state.column(codon), expected[f"{codon}_efficiency"])
+
+def test_run_fused_pipeline_translate_after_stress():
+    """Test that efficiencies can follow the post-stress nutrient level."""
+    state = initialize_state(200, NUTRIENT_LEVELS, ["AAA"], ["CGT"])
+
+    run_fused_pipeline(state, 0.5, 0.5, rnase_activity=0.0, decay_variability=0.0, translate_after_stress=True)
+
+    expected = translation_efficiency_matrix(state.nutrient_values, state.codon_efficiency, 1.5, 0.1, 2, 0.5)
+    np.testing.assert_allclose(state.efficiencies, expected)
+
+def test_run_fused_pipeline_invalid_parameters():
+    """Test that out-of-range parameters are rejected before any buffer is touched."""
+    state = initialize_state(10, NUTRIENT_LEVELS, ["AAA"], ["CGT"])
+    original = state.efficiencies.copy()
+
+    with pytest.raises(ValueError, match="rnase_activity must be between 0 and 1"):
+        run_fused_pipeline(state, rnase_activity=2.0)
+
+    np.testing.assert_array_equal(state.efficiencies, original)
+
+def test_run_fused_pipeline_chunk_size_does_not_change_results():
+    """Test that chunked and unchunked runs with the same seed produce identical trajectories."""
+    whole = run_fused_pipeline(initialize_state(1003, NUTRIENT_LEVELS, ["AAA"], ["CGT"], rng=4), 0.3, 0.2, rng=9)
+    chunked = run_fused_pipeline(initialize_state(1003, NUTRIENT_LEVELS, ["AAA"], ["CGT"], rng=4), 0.3, 0.2, rng=9,
+                                 chunk_size=100)
+
+    np.testing.assert_array_equal(chunked.nutrient_codes, whole.nutrient_codes)
+    np.testing.assert_array_equal(chunked.efficiencies, whole.efficiencies)
@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+import pytest
+from ecoliframalpha.streaming import iter_simulation_chunks, run_streaming
+from ecoliframalpha.codon_variability import analyze_variability
+
+NUTRIENT_LEVELS = [1.0, 0.75, 0.5, 0.25, 0.1]
+
+def test_iter_simulation_chunks_sizes():
+    """Test that chunks cover every cycle with at most chunk_size cycles each."""
+    sizes = [chunk.num_cycles for chunk in iter_simulation_chunks(2500, NUTRIENT_LEVELS, ["AAA"], ["CGT"],
+                                                                  chunk_size=1000)]
+
+    assert sizes == [1000, 1000, 500]
+
+def test_run_streaming_matches_in_memory_metrics():
+    """Test that metrics from running accumulators match analyzing all chunks in memory."""
+    np.random.seed(5)
+    chunks = [chunk.efficiencies.copy() for chunk in iter_simulation_chunks(
+        5000, NUTRIENT_LEVELS, ["AAA", "GAT"], ["CGT"], chunk_size=700)]
+    in_memory = analyze_variability(pd.DataFrame(np.vstack(chunks), columns=[
+        "AAA_efficiency", "GAT_efficiency", "CGT_efficiency"]))
+
+    np.random.seed(5)
+    streamed = run_streaming(5000, NUTRIENT_LEVELS, ["AAA", "GAT"], ["CGT"], chunk_size=700)["variability_results"]
+
+    pd.testing.assert_frame_equal(streamed.set_index("codon").sort_index(axis=1),
+                                  in_memory.set_index("codon").sort_index(axis=1), check_exact=False, rtol=1e-9)
+
+def test_run_streaming_matches_fused_pipeline():
+    """Test that streaming with the fused pipeline's random streams reproduces its metrics at any chunk size."""
+    from ecoliframalpha.initialization import initialize_state
+    from ecoliframalpha.fused_pipeline import run_fused_pipeline
+
+    state = initialize_state(5000, NUTRIENT_LEVELS, ["AAA", "GAT"], ["CGT"], rng=np.random.default_rng(1))
+    run_fused_pipeline(state, 0.2, 0.1, rng=np.random.default_rng(2))
+    fused = analyze_variability(state)
+
+    streamed = run_streaming(5000, NUTRIENT_LEVELS, ["AAA", "GAT"], ["CGT"], 0.2, 0.1, chunk_size=1001,
+                             nutrient_rng=np.random.default_rng(1), stress_rng=np.random.default_rng(2))
+
+    pd.testing.assert_frame_equal(streamed["variability_results"].set_index("codon").sort_index(axis=1),
+                                  fused.set_index("codon").sort_index(axis=1), check_exact=False, rtol=1e-9)
+
+def test_run_streaming_keeps_first_chunk_sample():
+    """Test that the first chunk is kept as an independent copy."""
+    result = run_streaming(300, NUTRIENT_LEVELS, ["AAA"], ["CGT"], chunk_size=100)
+
+    assert result["sample"].num_cycles == 100
+    assert result["accumulator"].count.tolist() == [300, 300]
+
+def test_run_streaming_invalid_chunk_size():
+    """Test that non-positive chunk sizes are rejected."""
+    with pytest.raises(ValueError, match="chunk_size must be a positive integer"):
+        run_streaming(100, NUTRIENT_LEVELS, ["AAA"], ["CGT"], chunk_size=-1)
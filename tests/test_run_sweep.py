@@ -0,0 +1,95 @@
+import os
+import pandas as pd
+import pytest
+from ecoliframalpha.sweep import run_sweep, expand_grid, parse_sweep_arguments
+
+BASE_PARAMETERS = {"num_cycles": 100, "nutrient_levels": [1.0, 0.5, 0.1],
+                   "robust_codons": ["AAA"], "sensitive_codons": ["CGT"]}
+
+def test_expand_grid_all_combinations():
+    """Test that the grid is expanded into every parameter combination."""
+    points = expand_grid({"stress_probability": [0.1, 0.2], "rnase_activity": [0.01, 0.05, 0.1]})
+
+    assert len(points) == 6
+    assert points[0] == {"stress_probability": 0.1, "rnase_activity": 0.01}
+
+def test_expand_grid_unknown_parameter():
+    """Test that parameters outside the sweepable set are rejected."""
+    with pytest.raises(ValueError, match="Unknown sweep parameters: num_cycles"):
+        expand_grid({"num_cycles": [10, 20]})
+
+def test_run_sweep_tidy_table():
+    """Test that an in-process sweep returns one tidy row per point, codon and metric."""
+    result = run_sweep({"rnase_activity": [0.01, 0.1]}, BASE_PARAMETERS, max_workers=1, metrics=["variance", "CV"])
+
+    assert list(result.columns[:5]) == ["point", "stress_probability", "recovery_probability",
+                                        "rnase_activity", "decay_variability"]
+    assert len(result) == 2 * 2 * 2
+    assert set(result["metric"]) == {"variance", "CV"}
+    assert sorted(result["rnase_activity"].unique()) == [0.01, 0.1]
+
+def test_run_sweep_process_pool():
+    """Test that points fanned out to worker processes are all collected."""
+    result = run_sweep({"stress_probability": [0.0, 0.5], "recovery_probability": [0.0, 0.5]},
+                       BASE_PARAMETERS, max_workers=2, metrics=["CV"])
+
+    assert sorted(result["point"].unique()) == [0, 1, 2, 3]
+
+def test_run_sweep_with_validation():
+    """Test that validation statistics are appended when benchmarks are given."""
+    experimental_data = pd.DataFrame({"codon": ["AAA", "CGT", "GAT"], "CV": [0.1, 0.3, 0.2]})
+    base_parameters = {**BASE_PARAMETERS, "robust_codons": ["AAA", "GAT"]}
+
+    result = run_sweep({"rnase_activity": [0.05]}, base_parameters, max_workers=1, metrics=["CV"],
+                       experimental_data=experimental_data)
+
+    assert {"CV_correlation", "CV_mean_squared_error"}.issubset(set(result["metric"]))
+
+def test_parse_sweep_arguments():
+    """Test parsing of comma-separated sweep values and fixed parameters."""
+    options = parse_sweep_arguments(["--rnase_activity", "0.01,0.05", "--num_cycles", "500", "--max_workers", "2"])
+
+    assert options["grid"] == {"rnase_activity": [0.01, 0.05]}
+    assert options["base_parameters"] == {"num_cycles": 500}
+    assert options["max_workers"] == 2
+
+def test_run_sweep_seeded_results_independent_of_workers():
+    """Test that a seeded sweep gives identical results in-process and across a process pool."""
+    grid = {"stress_probability": [0.1, 0.3], "rnase_activity": [0.01, 0.1]}
+    base_parameters = {**BASE_PARAMETERS, "num_replicates": 2, "seed": 123}
+
+    serial = run_sweep(grid, base_parameters, max_workers=1, metrics=["variance"])
+    parallel = run_sweep(grid, base_parameters, max_workers=3, metrics=["variance"])
+
+    pd.testing.assert_frame_equal(serial, parallel, check_exact=True)
+
+def test_run_sweep_reuses_cached_points(tmp_path):
+    """Test that a seeded sweep reruns from the stage cache with identical results."""
+    grid = {"rnase_activity": [0.01, 0.1]}
+    base_parameters = {**BASE_PARAMETERS, "seed": 5}
+
+    first = run_sweep(grid, base_parameters, max_workers=1, metrics=["CV"], cache_dir=str(tmp_path))
+    assert len(os.listdir(str(tmp_path))) == 2
+    second = run_sweep(grid, base_parameters, max_workers=1, metrics=["CV"], cache_dir=str(tmp_path))
+
+    pd.testing.assert_frame_equal(first, second, check_exact=True)
+
+def test_run_sweep_cache_follows_simulation_settings(tmp_path):
+    """Test that config overrides the ensemble honours change results, while unrelated ones reuse the cache."""
+    from ecoliframalpha.input_handler import get_run_config
+
+    grid = {"rnase_activity": [0.05]}
+    base_parameters = {**BASE_PARAMETERS, "num_cycles": 2000, "stress_probability": 0.01,
+                       "recovery_probability": 0.01, "seed": 5}
+    def sweep(*overrides):
+        return run_sweep(grid, base_parameters, max_workers=1, metrics=["CV"], cache_dir=str(tmp_path),
+                         config=get_run_config(list(overrides)))
+
+    default = sweep()
+    markov = sweep("--nutrient_process", "markov")
+    assert not markov["value"].equals(default["value"])
+    assert len(os.listdir(str(tmp_path))) == 2
+
+    plotted = sweep("--pipeline_mode", "fused", "--plot_bins", "10")
+    pd.testing.assert_frame_equal(plotted, default, check_exact=True)
+    assert len(os.listdir(str(tmp_path))) == 2
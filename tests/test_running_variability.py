@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+import pytest
+from ecoliframalpha.codon_variability import RunningVariability, analyze_variability
+
+def test_running_variability_matches_analyze_variability():
+    """Test that chunked updates give the same metrics as analyzing the full columns."""
+    rng = np.random.default_rng(0)
+    values = rng.random((1000, 3))
+    values[::7, 1] = np.nan
+
+    accumulator = RunningVariability(["AAA", "GGG", "CGT"])
+    for chunk in np.array_split(values, 9):
+        accumulator.update(chunk)
+
+    expected = analyze_variability(pd.DataFrame(values, columns=["AAA_efficiency", "GGG_efficiency", "CGT_efficiency"]))
+    result = accumulator.finalize()
+    for metric in ["variance", "Fano_factor", "CV", "CRI"]:
+        np.testing.assert_allclose(result[metric], expected[metric])
+
+def test_running_variability_empty_codon():
+    """Test that codons without any values finalize to NaN."""
+    accumulator = RunningVariability(["AAA"])
+    accumulator.update(np.full((4, 1), np.nan))
+
+    result = accumulator.finalize(["variance", "CV"])
+
+    assert result["variance"].isna().all()
+    assert result["CV"].isna().all()
+
+def test_running_variability_invalid_metrics():
+    """Test that unknown metrics are rejected."""
+    with pytest.raises(ValueError, match="Metrics must be chosen from"):
+        RunningVariability(["AAA"]).finalize(["accuracy"])
+
+def test_running_variability_merge_is_exact():
+    """Test that merging partial accumulators equals accumulating all data at once."""
+    from ecoliframalpha.codon_variability import merge_accumulators
+
+    rng = np.random.default_rng(4)
+    values = 1e6 + rng.random((3000, 2))  # Large offset stresses numerical stability
+    whole = RunningVariability.from_efficiencies(["AAA", "CGT"], values)
+
+    parts = [RunningVariability.from_efficiencies(["AAA", "CGT"], part) for part in np.array_split(values, 5)]
+    merged = merge_accumulators(parts[::-1])
+
+    np.testing.assert_array_equal(merged.count, whole.count)
+    np.testing.assert_allclose(merged.mean, whole.mean, rtol=1e-14)
+    np.testing.assert_allclose(merged.m2, whole.m2, rtol=1e-9)
+    np.testing.assert_array_equal(merged.min, whole.min)
+    np.testing.assert_array_equal(merged.max, whole.max)
+
+def test_running_variability_merge_aligns_codons():
+    """Test that accumulators with different codon orders and sets are matched by name."""
+    left = RunningVariability.from_efficiencies(["AAA", "CGT"], [[1.0, 2.0], [3.0, 4.0]])
+    right = RunningVariability.from_efficiencies(["CGT", "GAT"], [[6.0, 1.0], [8.0, 2.0]])
+
+    left.merge(right)
+
+    assert left.codons == ["AAA", "CGT", "GAT"]
+    assert left.codon_statistics("CGT") == {"count": 4, "mean": 5.0, "m2": 20.0, "min": 2.0, "max": 8.0}
+    assert left.codon_statistics("GAT")["count"] == 2
+
+def test_running_variability_dict_round_trip():
+    """Test that the accumulator state survives conversion to plain lists."""
+    accumulator = RunningVariability.from_efficiencies(["AAA"], [[0.5], [0.7], [0.9]])
+
+    restored = RunningVariability.from_dict(accumulator.to_dict())
+
+    pd.testing.assert_frame_equal(restored.finalize(), accumulator.finalize())
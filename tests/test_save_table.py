@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+import pytest
+from ecoliframalpha.utils import save_table, load_table, load_columns
+
+def make_trajectory(num_cycles=1000):
+    return pd.DataFrame({
+        "cycle": np.arange(1, num_cycles + 1),
+        "nutrient_levels": np.tile([1.0, 0.5], num_cycles // 2),
+        "AAA_efficiency": np.linspace(0, 1, num_cycles),
+    })
+
+@pytest.mark.parametrize("output_format", ["csv", "npz", "npy"])
+def test_save_table_round_trip(tmp_path, output_format):
+    """Test that every built-in format reloads the same table."""
+    trajectory = make_trajectory()
+
+    path = save_table(trajectory, "trajectory", str(tmp_path), output_format)
+
+    pd.testing.assert_frame_equal(load_table(path), trajectory)
+
+def test_save_table_npy_columns_are_memory_mapped(tmp_path):
+    """Test that npy columns are memory-mapped rather than read into memory."""
+    path = save_table(make_trajectory(), "trajectory", str(tmp_path), "npy")
+
+    columns = load_columns(path)
+
+    assert list(columns) == ["cycle", "nutrient_levels", "AAA_efficiency"]
+    assert isinstance(columns["AAA_efficiency"], np.memmap)
+
+def test_save_table_string_columns(tmp_path):
+    """Test that string columns are stored without pickling."""
+    table = pd.DataFrame({"codon": ["AAA", "CGT"], "CV": [0.1, 0.2]})
+
+    path = save_table(table, "variability", str(tmp_path), "npz")
+
+    assert load_table(path)["codon"].tolist() == ["AAA", "CGT"]
+
+def test_save_table_rejects_object_columns(tmp_path):
+    """Test that columns of arbitrary objects are rejected by the numpy formats."""
+    table = pd.DataFrame({"codon": ["AAA", None], "value": [1.0, 2.0]})
+
+    with pytest.raises(ValueError, match="Column 'codon' cannot be stored"):
+        save_table(table, "results", str(tmp_path), "npy")
+
+def test_save_table_parquet(tmp_path):
+    """Test the Parquet round trip when pyarrow is installed."""
+    pytest.importorskip("pyarrow")
+    trajectory = make_trajectory()
+
+    path = save_table(trajectory, "trajectory", str(tmp_path), "parquet")
+
+    pd.testing.assert_frame_equal(load_table(path), trajectory)
+
+def test_save_table_unknown_format(tmp_path):
+    """Test that unknown formats are rejected."""
+    with pytest.raises(ValueError, match="output_format must be one of"):
+        save_table(make_trajectory(), "trajectory", str(tmp_path), "xlsx")
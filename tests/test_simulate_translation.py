@@ -31,3 +31,61 @@ def test_simulate_translation_missing_keys():
                               "codon_efficiency": {"AAA": {"base_efficiency": 1.0, "type": "robust"}}})#Missing 'nutrient_levels'
         simulate_translation({"simulation_data": pd.DataFrame({"nutrient_level": [0.2, 0.5, 0.8]}), 
                               "codon_efficiency": {"AAA": {"base_efficiency": 1.0}}})#Missing codon type
+
+def test_simulate_translation_matches_reference_values():
+    """Test that the broadcast engine matches the per-cycle Hill response."""
+    from scipy.special import expit
+
+    nutrient_values = [1.0, 0.75, 0.5, 0.25, 0.1]
+    simulation_data = pd.DataFrame({"nutrient_levels": nutrient_values})
+    codon_efficiency = {
+        "AAA": {"base_efficiency": 1.0, "type": "robust"},
+        "CGT": {"base_efficiency": 0.5, "type": "sensitive"},
+    }
+    initialization_results = {"simulation_data": simulation_data,
+                              "codon_efficiency": codon_efficiency,
+                              "nutrient_levels": nutrient_values
+                              }
+
+    result = simulate_translation(initialization_results)
+
+    for nutrient_level, robust, sensitive in zip(nutrient_values, result["AAA_efficiency"], result["CGT_efficiency"]):
+        response = 1.5 * expit(2 * (nutrient_level - 0.5))
+        assert robust == pytest.approx(max(response * 1.0, 0.1))
+        assert sensitive == pytest.approx(max(response * 0.5 * nutrient_level, 0.1))
+
+def test_simulate_translation_lookup_matches_broadcast():
+    """Test that the per-level lookup table gives the same efficiencies as direct computation."""
+    from ecoliframalpha.translation_dynamics import translation_efficiency_matrix
+
+    nutrient_levels = [1.0, 0.75, 0.5, 0.25, 0.1]
+    simulation_data = pd.DataFrame({"nutrient_levels": [0.1, 1.0, 0.5, 0.5, 0.25, 0.75]})
+    codon_efficiency = {
+        "AAA": {"base_efficiency": 1.0, "type": "robust"},
+        "GAT": {"base_efficiency": 1.0, "type": "robust"},
+        "CGT": {"base_efficiency": 0.5, "type": "sensitive"},
+    }
+    expected = translation_efficiency_matrix(simulation_data["nutrient_levels"], codon_efficiency, 1.5, 0.1, 2, 0.5)
+
+    result = simulate_translation({"simulation_data": simulation_data,
+                                   "codon_efficiency": codon_efficiency,
+                                   "nutrient_levels": nutrient_levels})
+
+    for position, codon in enumerate(codon_efficiency):
+        assert result[f"{codon}_efficiency"].tolist() == pytest.approx(expected[:, position].tolist())
+
+def test_hill_response_table_is_cached():
+    """Test that identical Hill parameters reuse the cached table and new ones rebuild it."""
+    from ecoliframalpha.translation_dynamics import hill_response_table, _cached_response_table, clear_response_tables
+
+    clear_response_tables()
+    codon_efficiency = {"AAA": {"base_efficiency": 1.0, "type": "robust"}}
+
+    first = hill_response_table([1.0, 0.5], codon_efficiency, 1.5, 0.1, 2, 0.5)
+    hill_response_table([1.0, 0.5], codon_efficiency, 1.5, 0.1, 2, 0.5)
+    assert _cached_response_table.cache_info().hits == 1
+
+    changed = hill_response_table([1.0, 0.5], codon_efficiency, 1.5, 0.1, 4, 0.5)
+    assert _cached_response_table.cache_info().misses == 2
+    assert first.shape == changed.shape == (2, 1)
+    assert not (first == changed).all()
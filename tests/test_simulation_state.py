@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+from ecoliframalpha.initialization import initialize_state
+from ecoliframalpha.translation_dynamics import translate_state, simulate_translation
+from ecoliframalpha.simulation_state import SimulationState
+
+def test_simulation_state_dataframe_round_trip():
+    """Test that the DataFrame view can be converted back into an identical state."""
+    state = initialize_state(20, [1.0, 0.5, 0.1], ["AAA"], ["CGT"])
+
+    frame = state.to_dataframe()
+    restored = SimulationState.from_dataframe(frame, state.codon_efficiency, [1.0, 0.5, 0.1])
+
+    assert list(frame.columns) == ["cycle", "nutrient_levels", "AAA_efficiency", "CGT_efficiency"]
+    np.testing.assert_array_equal(restored.efficiencies, state.efficiencies)
+    np.testing.assert_array_equal(restored.nutrient_codes, state.nutrient_codes)
+
+def test_simulation_state_unknown_codon():
+    """Test that looking up a missing codon raises a KeyError."""
+    state = initialize_state(5, [1.0], ["AAA"], [])
+
+    with pytest.raises(KeyError, match="GGG"):
+        state.column("GGG")
+
+def test_translate_state_matches_dataframe_translation():
+    """Test that in-place state translation matches the DataFrame stage."""
+    nutrient_levels = [1.0, 0.75, 0.5, 0.25, 0.1]
+    state = initialize_state(50, nutrient_levels, ["AAA", "GAT"], ["CGT"])
+    frame = state.to_dataframe()
+
+    translate_state(state)
+    expected = simulate_translation({"simulation_data": frame,
+                                     "codon_efficiency": state.codon_efficiency,
+                                     "nutrient_levels": nutrient_levels})
+
+    for codon in state.codons:
+        np.testing.assert_allclose(state.column(codon), expected[f"{codon}_efficiency"])
+
+def test_process_rna_state_matches_dataframe_decay():
+    """Test that in-place state decay matches process_rna on the DataFrame view."""
+    from ecoliframalpha.rna_processing import process_rna, process_rna_state
+
+    state = initialize_state(40, [1.0, 0.5, 0.1], ["AAA"], ["CGT"])
+    translate_state(state)
+    expected = process_rna(state.to_dataframe(), state.codon_efficiency, 0.05, 0.1)
+
+    process_rna_state(state, 0.05, 0.1)
+
+    for codon in state.codons:
+        np.testing.assert_allclose(state.column(codon), expected[f"{codon}_efficiency"])
+
+def test_simulation_state_keeps_long_codon_names():
+    """Test that long codon names sharing a prefix are neither truncated nor merged."""
+    from ecoliframalpha.codon_variability import analyze_variability
+
+    codons = ["AAA_gene0001", "AAA_gene0002"]
+    state = initialize_state(10, [1.0, 0.5], codons, ["CGT"])
+
+    assert state.codons == codons + ["CGT"]
+    assert list(state.to_dataframe().columns[2:]) == [f"{codon}_efficiency" for codon in codons + ["CGT"]]
+    assert analyze_variability(state)["codon"].tolist() == codons + ["CGT"]
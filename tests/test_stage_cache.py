@@ -0,0 +1,47 @@
+import os
+import pandas as pd
+import pytest
+from ecoliframalpha.stage_cache import StageCache, run_stage, stage_key
+
+def test_stage_key_chains_parent_and_parameters():
+    """Test that keys change with parameters and with the upstream key."""
+    key = stage_key("rna", {"rnase_activity": 0.05, "seed": 1}, "parent")
+
+    assert key == stage_key("rna", {"seed": 1, "rnase_activity": 0.05}, "parent")
+    assert key != stage_key("rna", {"rnase_activity": 0.1, "seed": 1}, "parent")
+    assert key != stage_key("rna", {"rnase_activity": 0.05, "seed": 1}, "other")
+
+def test_run_stage_reuses_cached_output(tmp_path):
+    """Test that a stage is computed once and then loaded from the cache."""
+    cache = StageCache(str(tmp_path))
+    calls = []
+    def compute():
+        calls.append(1)
+        return pd.DataFrame({"value": [1.0, 2.0]})
+
+    first, key = run_stage(cache, "example", {"size": 2}, compute)
+    second, second_key = run_stage(cache, "example", {"size": 2}, compute)
+
+    assert len(calls) == 1
+    assert key == second_key
+    pd.testing.assert_frame_equal(first, second)
+
+def test_stage_cache_evicts_least_recently_used(tmp_path):
+    """Test that the oldest unread entries are evicted beyond the size limit."""
+    cache = StageCache(str(tmp_path))
+    for name in ["a", "b", "c"]:
+        cache.put(name, bytes(1000))
+    os.utime(os.path.join(str(tmp_path), "a.pkl"), ns=(0, 0))
+    os.utime(os.path.join(str(tmp_path), "b.pkl"), ns=(1, 1))
+    cache.get("a")  # "a" becomes the most recently used entry
+
+    cache.max_bytes = 2500
+    assert cache.evict() == 1
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+
+def test_stage_cache_invalid_size(tmp_path):
+    """Test that non-positive size limits are rejected."""
+    with pytest.raises(ValueError, match="max_bytes must be a positive integer"):
+        StageCache(str(tmp_path), max_bytes=0)
@@ -89,3 +89,41 @@ def test_validate_simulation_all_metrics():
         assert metric in result
         assert "correlation" in result[metric]
         assert "mean_squared_error" in result[metric]
+
+def test_validate_simulation_bootstrap_intervals():
+    """Test that bootstrap intervals bracket the point estimates and permutation p-values are valid."""
+    rng = np.random.default_rng(0)
+    simulated = rng.random(30)
+    variability_results = pd.DataFrame({"variance": simulated})
+    experimental_data = pd.DataFrame({"variance": simulated + rng.normal(0, 0.05, 30)})
+
+    result = validate_simulation(variability_results, experimental_data, metrics=["variance"],
+                                 n_bootstrap=2000, n_permutations=2000, rng=1)["variance"]
+
+    low, high = result["correlation_ci"]
+    assert low <= result["correlation"] <= high
+    low, high = result["mean_squared_error_ci"]
+    assert low <= result["mean_squared_error"] <= high
+    assert result["correlation_p_value"] == 1 / 2001  # Strong correlation beats every random pairing
+    assert 0 < result["mean_squared_error_p_value"] <= 1
+
+def test_validate_simulation_resampling_reproducible():
+    """Test that resampling with the same seed gives the same intervals."""
+    variability_results = pd.DataFrame({"variance": [0.1, 0.2, 0.3, 0.5], "CV": [0.4, 0.1, 0.3, 0.2]})
+    experimental_data = pd.DataFrame({"variance": [0.15, 0.25, 0.3, 0.4], "CV": [0.3, 0.2, 0.3, 0.1]})
+
+    first = validate_simulation(variability_results, experimental_data, metrics=["variance", "CV"], n_bootstrap=500, rng=7)
+    second = validate_simulation(variability_results, experimental_data, metrics=["variance", "CV"], n_bootstrap=500, rng=7)
+
+    assert first == second
+    assert "correlation_p_value" not in first["variance"]
+
+def test_validate_simulation_invalid_resampling():
+    """Test that invalid resampling parameters are rejected."""
+    import pytest
+
+    data = pd.DataFrame({"variance": [0.1, 0.2, 0.3]})
+    with pytest.raises(ValueError, match="n_bootstrap must be a non-negative integer."):
+        validate_simulation(data, data, metrics=["variance"], n_bootstrap=-1)
+    with pytest.raises(ValueError, match="confidence_level must be between 0 and 1."):
+        validate_simulation(data, data, metrics=["variance"], n_bootstrap=10, confidence_level=1.5)